@@ -8,6 +8,8 @@ import time
 import argparse
 import sys
 import ctypes # Import ctypes for Windows API interaction
+import multiprocessing
+import atexit
 
 # Import functions and configurations from refactored files
 from launchbox_utils import (
@@ -19,7 +21,13 @@ from launchbox_utils import (
     get_game_details,
     apply_playlist_banner_image,
     get_playlist_banner_image_path,
-    LAUNCHBOX_PATH # Import LAUNCHBOX_PATH
+    LAUNCHBOX_PATH, # Import LAUNCHBOX_PATH
+    GAME_CATALOG,
+    ROM_VERIFIER,
+    ROM_HASHER,
+    PLAYLIST_CATALOG,
+    SMART_PLAYLISTS,
+    flush_playlist_writes
 )
 from filesystem_utils import (
     is_path_safe,
@@ -38,7 +46,7 @@ from image_utils import (
 )
 from udp_broadcast import udp_broadcast_loop # Import the broadcast loop function
 # --- Configuration ---
-AGENT_VERSION = "2.1.69"
+AGENT_VERSION = "2.1.94"
 MACHINE_TYPE = "arcade"
 LAYOUT_FILE = "control-layout.json" # Keep config needed in this file
 LOG_FILE = "agent.log" # Keep config needed in this file
@@ -86,6 +94,9 @@ def handle_exception(e):
 
 
 if __name__ == "__main__":
+    # Required for the platform parsing process pool in the PyInstaller-frozen executable
+    multiprocessing.freeze_support()
+
     # Hide the console window if running as a bundled executable
     if getattr(sys, 'frozen', False):
         try:
@@ -116,9 +127,26 @@ if __name__ == "__main__":
         start_bigbox_api,
         stop_bigbox_api,
         get_games_api,
+        search_games_api,
+        get_game_facets_api,
         get_playlists_api,
+        repair_playlists_api,
+        playlist_batch_api,
+        flush_playlists_api,
+        get_smart_playlists_api,
+        set_smart_playlist_api,
+        delete_smart_playlist_api,
+        update_smart_playlists_api,
+        get_dangling_entries_api,
+        remove_dangling_entries_api,
         get_orphaned_games_api,
+        get_changes_api,
         get_game_details_api,
+        get_game_full_api,
+        get_missing_roms_api,
+        get_game_playlists_api,
+        get_rom_hashes_api,
+        get_rom_hash_progress_api,
         add_to_playlist_api,
         check_update_api,
         trigger_update_api,
@@ -160,10 +188,27 @@ if __name__ == "__main__":
     app.route("/api/launchbox/start_bigbox", methods=["POST"])(start_bigbox_api)
     app.route("/api/launchbox/stop_bigbox", methods=["POST"])(stop_bigbox_api)
     app.route("/api/launchbox/games", methods=["GET"])(get_games_api)
+    app.route("/api/launchbox/games/search", methods=["GET"])(search_games_api)
+    app.route("/api/launchbox/games/facets", methods=["GET"])(get_game_facets_api)
     app.route("/api/launchbox/playlists", methods=["GET"])(get_playlists_api)
     app.route("/api/launchbox/orphaned_games", methods=["GET"])(get_orphaned_games_api)
+    app.route("/api/launchbox/changes", methods=["GET"])(get_changes_api)
     app.route("/api/launchbox/games/details", methods=["POST"])(get_game_details_api)
+    app.route("/api/launchbox/games/<game_id>/full", methods=["GET"])(get_game_full_api)
+    app.route("/api/launchbox/games/missing_roms", methods=["GET"])(get_missing_roms_api)
+    app.route("/api/launchbox/games/<game_id>/playlists", methods=["GET"])(get_game_playlists_api)
+    app.route("/api/launchbox/roms/hashes", methods=["GET"])(get_rom_hashes_api)
+    app.route("/api/launchbox/roms/hashes/progress", methods=["GET"])(get_rom_hash_progress_api)
     app.route("/api/launchbox/playlists/add", methods=["POST"])(add_to_playlist_api)
+    app.route("/api/launchbox/playlists/repair", methods=["GET", "POST"])(repair_playlists_api)
+    app.route("/api/launchbox/playlists/batch", methods=["POST"])(playlist_batch_api)
+    app.route("/api/launchbox/playlists/flush", methods=["POST"])(flush_playlists_api)
+    app.route("/api/launchbox/playlists/smart", methods=["GET"])(get_smart_playlists_api)
+    app.route("/api/launchbox/playlists/smart/update", methods=["POST"])(update_smart_playlists_api)
+    app.route("/api/launchbox/playlists/smart/<path:playlist_name>", methods=["PUT"])(set_smart_playlist_api)
+    app.route("/api/launchbox/playlists/smart/<path:playlist_name>", methods=["DELETE"])(delete_smart_playlist_api)
+    app.route("/api/launchbox/playlists/dangling", methods=["GET"])(get_dangling_entries_api)
+    app.route("/api/launchbox/playlists/dangling/cleanup", methods=["POST"])(remove_dangling_entries_api)
     app.route("/api/launchbox/playlists/<path:playlist_name>", methods=["DELETE"])(delete_playlist_api)
     app.route("/api/launchbox/delete_cache", methods=["POST"])(delete_cache_api)
     app.route("/api/generate-image", methods=["GET"])(generate_image_api)
@@ -187,6 +232,37 @@ if __name__ == "__main__":
     # --- Create temporary image directory ---
     create_temp_image_directory()
 
+    # --- Warm up the game catalog ---
+    # Serve from the binary snapshot right away, then re-parse only the platform files changed since it was written
+    GAME_CATALOG.load_snapshot()
+    catalog_thread = threading.Thread(target=GAME_CATALOG.refresh, kwargs={"force": True}, daemon=True)
+    catalog_thread.start()
+    log("Game catalog warm-up thread started.")
+
+    # --- Check ROM paths in the background ---
+    # The first run waits for the catalog warm-up; later runs only re-list ROM folders whose mtime changed
+    ROM_VERIFIER.start(GAME_CATALOG.get_games)
+    log("ROM verifier thread started.")
+
+    # --- Hash ROM files in the background ---
+    # Only files that are new or changed since the cached checksums are read, at a capped rate
+    ROM_HASHER.start(GAME_CATALOG.get_games)
+    log("ROM hasher thread started.")
+
+    # --- Repair malformed playlist files in the background ---
+    # Reading playlists never writes; this job rewrites the flagged files atomically
+    PLAYLIST_CATALOG.start_repair_job()
+    log("Playlist repair thread started.")
+
+    # --- Keep the smart playlists up to date in the background ---
+    # Only the games changed since the last update are tested against the rules again
+    SMART_PLAYLISTS.load_rules()
+    SMART_PLAYLISTS.start()
+    log("Smart playlist thread started.")
+
+    # Queued playlist adds must reach the disk before the agent exits
+    atexit.register(flush_playlist_writes)
+
     # --- Startup Check for Update Batch File ---
     update_batch_file = "update.bat"
     if os.path.exists(update_batch_file):
@@ -6,6 +6,7 @@ import os
 import psutil
 import time
 import json
+import hashlib
 import uuid
 import shutil
 import socket # Added missing import
@@ -16,11 +17,37 @@ import glob # Added missing import
 # Import functions from other refactored files
 from launchbox_utils import (
     get_all_games,
+    get_games_page,
+    search_games,
+    get_game_facets,
+    FACETS,
+    iter_games,
+    iter_orphaned_games,
+    GAME_RESPONSE_FIELDS,
+    get_games_etag,
+    get_missing_roms,
+    get_rom_hashes_page,
+    get_rom_hash_progress,
+    get_playlists_etag,
+    get_orphaned_games_etag,
+    get_changes,
     get_playlists_data,
+    get_playlist_repair_status,
+    repair_playlists,
+    apply_playlist_batch,
+    get_game_playlists,
+    find_dangling_entries,
+    remove_dangling_entries,
+    flush_playlist_writes,
+    get_smart_playlists,
+    set_smart_playlist,
+    delete_smart_playlist,
+    update_smart_playlists,
     find_orphaned_games,
     add_games_to_playlist,
     delete_playlist,
     get_game_details,
+    get_game_full,
     apply_playlist_banner_image,
     get_playlist_banner_image_path
 )
@@ -174,6 +201,7 @@ def update_layout_api():
 
 def start_bigbox_api():
     log("Received request to start BigBox")
+    flush_playlist_writes()  # BigBox reads the playlist files on startup
     if not os.path.exists(BIGBOX_EXE_PATH):
         log(f"BigBox.exe not found at expected path: {BIGBOX_EXE_PATH}", level=logging.ERROR)
         return jsonify(error="BigBox.exe not found"), 404
@@ -220,35 +248,240 @@ def stop_bigbox_api():
         log(f"Error iterating processes to stop BigBox: {e}", level=logging.ERROR)
         return jsonify(error=f"Error stopping BigBox: {e}"), 500
 
+# --- Conditional Requests ---
+def not_modified(etag):
+    """Returns a 304 response if the request's If-None-Match matches etag, else None."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.vary.add("Accept")
+        return response
+    return None
+
+def with_etag(response, etag):
+    response.set_etag(etag)
+    response.vary.add("Accept")  # JSON and NDJSON bodies of one URL carry different ETags
+    return response
+
+def representation_etag(etag):
+    """Qualifies a data ETag with the response format and query parameters (page, fields, platform, ...).
+
+    The JSON array, NDJSON stream and every page or projection are different bodies, so each
+    gets its own ETag and a validator of one is never answered with 304 for another.
+    """
+    variant = "ndjson" if wants_ndjson() else "json"
+    args = "&".join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+    return f"{etag}-{hashlib.sha1(f'{variant}?{args}'.encode('utf-8')).hexdigest()[:12]}"
+
+# --- NDJSON Streaming ---
+NDJSON_MIMETYPE = "application/x-ndjson"
+NDJSON_BATCH_SIZE = 256 # Records joined into one chunk, to avoid one socket write per game
+
+def wants_ndjson():
+    """True when the client asked for a streamed newline-delimited JSON response."""
+    if request.args.get("stream") in ("1", "true"):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+def ndjson_response(records, etag=None):
+    """Streams records one JSON document per line, without building the whole body in memory."""
+    def generate():
+        batch = []
+        for record in records:
+            batch.append(json.dumps(record))
+            if len(batch) >= NDJSON_BATCH_SIZE:
+                yield "\n".join(batch) + "\n"
+                batch = []
+        if batch:
+            yield "\n".join(batch) + "\n"
+    response = Response(generate(), mimetype=NDJSON_MIMETYPE)
+    response.headers['X-Accel-Buffering'] = 'no'
+    if etag:
+        with_etag(response, etag)
+    return response
+
 def get_games_api():
+    """Lists games. Without query parameters the full list is returned as a JSON array.
+
+    With `limit`, `cursor`, `fields` (comma separated) or `platform`, one page is returned
+    as {"games", "total", "next_cursor", "generation"} instead. With `Accept: application/x-ndjson`
+    or `?stream=1`, every (filtered, projected) game is streamed as one JSON object per line.
+    """
     log("/api/launchbox/games")
-    games = get_all_games()
-    log(f"Returned {len(games)} total games from all platform XML files.")
-    return jsonify(games)
+    etag = representation_etag(get_games_etag())
+    cached = not_modified(etag)
+    if cached:
+        log("/api/launchbox/games not modified", level=logging.DEBUG)
+        return cached
+
+    if wants_ndjson():
+        fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+        unknown = [f for f in fields if f not in GAME_RESPONSE_FIELDS]
+        if unknown:
+            return jsonify(error=f"Unknown fields: {', '.join(unknown)}"), 400
+        log("Streaming games as NDJSON", level=logging.DEBUG)
+        return ndjson_response(iter_games(fields=fields or None, platform=request.args.get("platform")), etag)
+
+    if not any(arg in request.args for arg in ("limit", "cursor", "fields", "platform")):
+        games = get_all_games()
+        log(f"Returned {len(games)} total games from all platform XML files.")
+        return with_etag(jsonify(games), etag)
+
+    try:
+        limit = int(request.args.get("limit", 100))
+    except ValueError:
+        return jsonify(error="limit must be an integer"), 400
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+    page, error = get_games_page(
+        limit,
+        cursor=request.args.get("cursor"),
+        fields=fields or None,
+        platform=request.args.get("platform")
+    )
+    if error:
+        return jsonify(error=error), 400
+    log(f"Returned page of {len(page['games'])} games out of {page['total']}.", level=logging.DEBUG)
+    return with_etag(jsonify(page), etag)
+
+def search_games_api():
+    """Ranked title search: /api/launchbox/games/search?q=<text>&limit=<n>."""
+    query = request.args.get("q", "")
+    log(f"/api/launchbox/games/search q={query}", level=logging.DEBUG)
+    try:
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        return jsonify(error="limit must be an integer"), 400
+    result, error = search_games(query, limit=limit)
+    if error:
+        return jsonify(error=error), 400
+    return jsonify(result)
+
+def get_game_facets_api():
+    """Faceted filtering, e.g. /api/launchbox/games/facets?decade=1990s&publisher=Capcom&genre=Fighting.
+
+    Repeat a facet parameter to accept several values for it. Also takes `limit` and `fields`.
+    """
+    log(f"/api/launchbox/games/facets {dict(request.args.lists())}", level=logging.DEBUG)
+    filters = {facet: request.args.getlist(facet) for facet in FACETS if request.args.getlist(facet)}
+    try:
+        limit = int(request.args.get("limit", 50))
+    except ValueError:
+        return jsonify(error="limit must be an integer"), 400
+    fields = [f.strip() for f in request.args.get("fields", "").split(",") if f.strip()]
+    result, error = get_game_facets(filters, limit=limit, fields=fields or None)
+    if error:
+        return jsonify(error=error), 400
+    return jsonify(result)
 
 def get_playlists_api():
     log("/api/launchbox/playlists")
+    etag = get_playlists_etag()
+    cached = not_modified(etag)
+    if cached:
+        log("/api/launchbox/playlists not modified", level=logging.DEBUG)
+        return cached
     playlists = get_playlists_data()
-    return jsonify(playlists)
+    return with_etag(jsonify(playlists), etag)
+
+def repair_playlists_api():
+    """GET lists the malformed playlist files ({"pending", "unparseable"}); POST repairs them.
+
+    POST returns {"checked", "repaired", "failed", "unparseable"}. Files are rewritten atomically.
+    """
+    if request.method == "GET":
+        log("/api/launchbox/playlists/repair", level=logging.DEBUG)
+        return jsonify(get_playlist_repair_status())
+    log("/api/launchbox/playlists/repair: repairing playlists")
+    return jsonify(repair_playlists())
 
 def get_orphaned_games_api():
     log("/api/launchbox/orphaned_games")
+    etag = representation_etag(get_orphaned_games_etag())
+    cached = not_modified(etag)
+    if cached:
+        log("/api/launchbox/orphaned_games not modified", level=logging.DEBUG)
+        return cached
+    if wants_ndjson():
+        log("Streaming orphaned games as NDJSON", level=logging.DEBUG)
+        return ndjson_response(iter_orphaned_games(), etag)
     orphaned = find_orphaned_games()
-    return jsonify(orphaned)
+    return with_etag(jsonify(orphaned), etag)
+
+def get_game_playlists_api(game_id):
+    """Names of the playlists that list one game: {"id", "playlists"}."""
+    log(f"/api/launchbox/games/{game_id}/playlists", level=logging.DEBUG)
+    return jsonify(get_game_playlists(game_id))
+
+def get_missing_roms_api():
+    """Games whose ApplicationPath does not exist, from the last background ROM check.
+
+    Returns {"running", "last_run", "games"}; `last_run` is null until the first check completed.
+    """
+    log("/api/launchbox/games/missing_roms", level=logging.DEBUG)
+    result = get_missing_roms()
+    log(f"Returning {len(result['games'])} games with missing ROMs.", level=logging.DEBUG)
+    return jsonify(result)
+
+def get_rom_hashes_api():
+    """CRC32/SHA1 checksums of the ROM files, one page at a time: ?limit=<n>&cursor=<next_cursor>.
+
+    Returns {"hashes", "total", "next_cursor"}; each entry holds the path, size, crc32, sha1
+    and the IDs of the games using the file. Files not hashed yet are left out.
+    """
+    log("/api/launchbox/roms/hashes", level=logging.DEBUG)
+    try:
+        limit = int(request.args.get("limit", 100))
+    except ValueError:
+        return jsonify(error="limit must be an integer"), 400
+    page, error = get_rom_hashes_page(limit, cursor=request.args.get("cursor"))
+    if error:
+        return jsonify(error=error), 400
+    return jsonify(page)
+
+def get_rom_hash_progress_api():
+    """Progress of the current (or last) ROM hashing run."""
+    log("/api/launchbox/roms/hashes/progress", level=logging.DEBUG)
+    return jsonify(get_rom_hash_progress())
+
+def get_changes_api():
+    """Change feed: /api/launchbox/changes?since=<generation>&instance=<instance>.
+
+    Returns {"instance", "generation", "resync", "changes"}. Clients keep the returned
+    instance and generation and pass them back on the next call; `resync: true` means
+    games and playlists have to be reloaded in full first.
+    """
+    since = request.args.get("since")
+    log(f"/api/launchbox/changes since={since}", level=logging.DEBUG)
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify(error="since must be an integer"), 400
+    result = get_changes(since, instance=request.args.get("instance"))
+    return jsonify(result)
 
 def get_game_details_api():
-    """Fetches full details for a list of provided game IDs."""
+    """Fetches full details for a list of provided game IDs.
+
+    Returns {"games": [...], "missing": [...]}, where `missing` lists the requested IDs
+    that are not in any platform file.
+    """
     data = request.get_json()
     game_ids_to_find = data.get("ids", [])
     log(f"Received request for game details for {len(game_ids_to_find)} IDs: {game_ids_to_find[:10]}...", level=logging.DEBUG)
 
-    if not game_ids_to_find:
-        return jsonify([]) # Return empty list if no IDs provided
+    result = get_game_details(game_ids_to_find)
 
-    found_games = get_game_details(game_ids_to_find)
+    log(f"Returning details for {len(result['games'])} games, {len(result['missing'])} missing.", level=logging.DEBUG)
+    return jsonify(result)
 
-    log(f"Returning details for {len(found_games)} games.", level=logging.DEBUG)
-    return jsonify(found_games)
+def get_game_full_api(game_id):
+    """Every field of one game (Notes, Rating, emulator settings, ...), read from its platform file on demand."""
+    log(f"/api/launchbox/games/{game_id}/full", level=logging.DEBUG)
+    game = get_game_full(game_id)
+    if game is None:
+        return jsonify(error=f"Game not found: {game_id}"), 404
+    return jsonify(game)
 
 def add_to_playlist_api():
     data = request.get_json()
@@ -268,6 +501,85 @@ def add_to_playlist_api():
     else:
         return jsonify(result)
 
+def playlist_batch_api():
+    """Applies {"operations": [...]} to the playlists: add, remove, create, delete and rename.
+
+    Each touched playlist file is read once and written once, atomically; a file's operations
+    are all applied or none are. Returns {"applied", "results"} with one result per operation.
+    """
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+    log(f"/api/launchbox/playlists/batch with {len(operations) if isinstance(operations, list) else 0} operations")
+    result, error = apply_playlist_batch(operations)
+    if error:
+        return jsonify(error=error), 400
+    return jsonify(result)
+
+def get_dangling_entries_api():
+    """Playlist entries whose game ID is not in any platform file: {"playlists": [{"name", "game_ids"}], "total"}."""
+    log("/api/launchbox/playlists/dangling", level=logging.DEBUG)
+    return jsonify(find_dangling_entries())
+
+def remove_dangling_entries_api():
+    """Removes the dangling entries, from every playlist or only from the optional {"playlists": [names]}.
+
+    Returns {"removed", "results"} with the batch result of every rewritten playlist.
+    """
+    data = request.get_json(silent=True) or {}
+    playlist_names = data.get("playlists")
+    if playlist_names is not None and not isinstance(playlist_names, list):
+        return jsonify(error="playlists must be a list of playlist names"), 400
+    log("/api/launchbox/playlists/dangling/cleanup")
+    result, error = remove_dangling_entries(playlist_names)
+    if error:
+        return jsonify(error=error), 409
+    return jsonify(result)
+
+def flush_playlists_api():
+    """Writes the queued playlist adds to disk now: {"written": {playlist name: number of games}, "failed": {playlist name: error}}."""
+    log("/api/launchbox/playlists/flush")
+    return jsonify(flush_playlist_writes())
+
+def get_smart_playlists_api():
+    """Smart playlist rules: {"playlists": [{"name", "rule", "game_count"}]}."""
+    log("/api/launchbox/playlists/smart", level=logging.DEBUG)
+    return jsonify(get_smart_playlists())
+
+def set_smart_playlist_api(playlist_name):
+    """Creates or replaces the rule of a smart playlist from the JSON body and writes the playlist.
+
+    The rule combines "platform", "title" (regular expression), "facets" ({facet: values}) and
+    "orphan" (true/false). Returns {"name", "rule", "game_count", "added", "removed"}. An existing
+    regular playlist is only taken over with "replace": true in the body; otherwise the answer is
+    409 with the entries the rule would remove ("would_remove").
+    """
+    decoded_name = urllib.parse.unquote(playlist_name)
+    rule = request.get_json(silent=True)
+    replace = False
+    if isinstance(rule, dict):
+        rule = dict(rule)
+        replace = rule.pop("replace", False) is True
+    log(f"/api/launchbox/playlists/smart: setting the rule of '{decoded_name}'")
+    result, error = set_smart_playlist(decoded_name, rule, replace=replace)
+    if error:
+        if result is not None:
+            return jsonify(error=error, **result), 409
+        return jsonify(error=error), 400
+    return jsonify(result)
+
+def delete_smart_playlist_api(playlist_name):
+    """Removes the rule of a smart playlist; the playlist itself is kept as a regular playlist."""
+    decoded_name = urllib.parse.unquote(playlist_name)
+    log(f"/api/launchbox/playlists/smart: removing the rule of '{decoded_name}'")
+    if not delete_smart_playlist(decoded_name):
+        return jsonify(status="smart playlist not found"), 404
+    return jsonify(status="deleted")
+
+def update_smart_playlists_api():
+    """Updates the smart playlists now: {"updated": {playlist name: {"added", "removed"}}}."""
+    log("/api/launchbox/playlists/smart/update")
+    return jsonify(update_smart_playlists())
+
 def delete_playlist_api(playlist_name):
     decoded_name = urllib.parse.unquote(playlist_name)
     log(f"Received request to DELETE playlist: {decoded_name}")
@@ -495,6 +807,7 @@ def reboot_agent_api():
     try:
         # In a real application, you might want to check if the agent is busy here
         # before initiating the reboot.
+        flush_playlist_writes()  # initiate_reboot() exits from this thread, so queued adds are written first
         initiate_reboot()
         return jsonify(status="Reboot initiated")
     except Exception as e:
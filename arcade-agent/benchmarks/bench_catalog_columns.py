@@ -0,0 +1,67 @@
+"""Compares the list comprehension orphan filter with the columnar (NumPy) catalog at 10k/100k/500k games.
+
+Times orphan detection (games in no playlist) on a synthetic library, with playlists
+referencing 2%, 10% and 30% of the games.
+Requires NumPy for the columnar side; without it only the list comprehension timings are printed.
+
+Usage: python benchmarks/bench_catalog_columns.py [game count ...]   (default: 10000 100000 500000)
+"""
+import os
+import sys
+import time
+import uuid
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from catalog_columns import CatalogColumns, columns_available
+from platform_reader import GameRecord
+
+PLATFORMS = [f"Platform {i:02d}" for i in range(40)]
+REFERENCED_SHARES = [0.02, 0.1, 0.3]
+REPEATS = 5
+
+
+def build_games(count):
+    rng = random.Random(42)
+    return [
+        GameRecord(f"Game {i:07d}", str(uuid.UUID(int=rng.getrandbits(128))), rng.choice(PLATFORMS), f"roms\\game{i}.zip")
+        for i in range(count)
+    ]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - start) / REPEATS * 1000, len(result)
+
+
+def main(counts):
+    if not columns_available():
+        print("NumPy is not installed: only the list comprehension path is timed.")
+    print(f"{'games':>8} {'filter':<18} {'list ms':>9} | {'columns ms':>10}   (hits)")
+    for count in counts:
+        games = build_games(count)
+        columns = None
+        if columns_available():
+            start = time.perf_counter()
+            columns = CatalogColumns(games)
+            print(f"{count:>8} columns built in {(time.perf_counter() - start) * 1000:.1f} ms")
+        cases = []
+        for share in REFERENCED_SHARES:
+            playlist_ids = {game.id for game in random.Random(share).sample(games, int(count * share))}
+            cases.append((f"orphans {share:.0%}", lambda ids=playlist_ids: [g for g in games if g.id and g.id not in ids],
+                          lambda ids=playlist_ids: columns.orphan_positions(ids)))
+        for name, list_filter, columns_filter in cases:
+            list_ms, hits = timed(list_filter)
+            if columns is None:
+                print(f"{count:>8} {name:<18} {list_ms:>9.2f} | {'-':>10}   ({hits})")
+                continue
+            columns_ms, column_hits = timed(columns_filter)
+            assert column_hits == hits
+            print(f"{count:>8} {name:<18} {list_ms:>9.2f} | {columns_ms:>10.2f}   ({hits})")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 500000])
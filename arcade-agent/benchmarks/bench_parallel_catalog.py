@@ -0,0 +1,50 @@
+"""Measures GameCatalog cold-load time with 1/2/4/8 parse worker processes.
+
+Builds a synthetic library of 50 platform files, each one a copy of
+Samples/GameList/Arcade.xml with its <Game> blocks repeated `scale` times.
+
+Usage: python benchmarks/bench_parallel_catalog.py [scale]   (default: 5)
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from game_catalog import GameCatalog
+
+SAMPLE_PLATFORM = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Samples', 'GameList', 'Arcade.xml'))
+PLATFORM_COUNT = 50
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def build_library(directory, scale):
+    with open(SAMPLE_PLATFORM, "r", encoding="utf-8") as f:
+        content = f.read()
+    head_end = content.index("<LaunchBox>") + len("<LaunchBox>")
+    tail_start = content.rindex("</LaunchBox>")
+    scaled = content[:head_end] + content[head_end:tail_start] * scale + content[tail_start:]
+    for i in range(PLATFORM_COUNT):
+        with open(os.path.join(directory, f"Platform {i:02d}.xml"), "w", encoding="utf-8") as f:
+            f.write(scaled)
+
+
+def main(scale):
+    print(f"CPU cores: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as directory:
+        build_library(directory, scale)
+        total_mb = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) / 2**20
+        print(f"{PLATFORM_COUNT} platform files, {total_mb:.1f} MB total")
+        baseline = None
+        for workers in WORKER_COUNTS:
+            catalog = GameCatalog(directory, stat_check_interval=0, parse_workers=workers)
+            start = time.perf_counter()
+            games = catalog.get_games()
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"workers={workers}: {len(games)} games in {elapsed:.2f} s (speed-up x{baseline / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
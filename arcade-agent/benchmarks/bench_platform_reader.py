@@ -0,0 +1,82 @@
+"""Compares the legacy ET.parse platform parser with the streaming iterparse reader.
+
+Builds a scaled-up copy of Samples/GameList/Arcade.xml (the sample's <Game> blocks repeated
+N times) and reports wall time and tracemalloc peak memory for both parsers.
+
+Usage: python benchmarks/bench_platform_reader.py [scale ...]   (default: 10 50 200)
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from platform_reader import iter_platform_games
+
+SAMPLE_PLATFORM = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Samples', 'GameList', 'Arcade.xml'))
+
+
+def legacy_parse(filepath):
+    """The original ET.parse based extraction from get_all_games()."""
+    platform_name = os.path.splitext(os.path.basename(filepath))[0]
+    root = ET.parse(filepath).getroot()
+    return [
+        {
+            "title": game.findtext("Title", ""),
+            "id": game.findtext("ID", ""),
+            "platform": game.findtext("Platform", platform_name),
+            "path": game.findtext("ApplicationPath", "")
+        }
+        for game in root.findall("Game")
+    ]
+
+
+def streaming_parse(filepath):
+    return [record.to_dict() for record in iter_platform_games(filepath)]
+
+
+def build_scaled_platform(scale, directory):
+    with open(SAMPLE_PLATFORM, "r", encoding="utf-8") as f:
+        content = f.read()
+    head_end = content.index("<LaunchBox>") + len("<LaunchBox>")
+    tail_start = content.rindex("</LaunchBox>")
+    body = content[head_end:tail_start]
+    path = os.path.join(directory, "Arcade.xml")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content[:head_end])
+        for _ in range(scale):
+            f.write(body)
+        f.write(content[tail_start:])
+    return path
+
+
+def measure(parse, filepath):
+    start = time.perf_counter()
+    games = parse(filepath)
+    elapsed = time.perf_counter() - start
+    del games
+
+    tracemalloc.start()
+    games = parse(filepath)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(games), elapsed, peak
+
+
+def main(scales):
+    print(f"{'scale':>6} {'file MB':>8} {'games':>8} | {'legacy s':>9} {'legacy peak MB':>15} | {'stream s':>9} {'stream peak MB':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            path = build_scaled_platform(scale, directory)
+            size_mb = os.path.getsize(path) / 2**20
+            count, legacy_s, legacy_peak = measure(legacy_parse, path)
+            stream_count, stream_s, stream_peak = measure(streaming_parse, path)
+            assert count == stream_count
+            print(f"{scale:>6} {size_mb:>8.1f} {count:>8} | {legacy_s:>9.2f} {legacy_peak / 2**20:>15.1f} | {stream_s:>9.2f} {stream_peak / 2**20:>15.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 50, 200])
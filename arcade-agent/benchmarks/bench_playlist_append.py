@@ -0,0 +1,99 @@
+"""Compares the incremental playlist writer with the old minidom rewrite on a 10k-entry playlist.
+
+Adds 1 and 1,000 games to a playlist file with 10,000 <PlaylistGame> entries, either by
+inserting the new blocks into the file's bytes (PlaylistCatalog.append_games) or by parsing
+the file, serializing it with ET.tostring and pretty-printing it with minidom (the old
+add_games_to_playlist). Each run starts from a fresh copy of the file.
+
+Usage: python benchmarks/bench_playlist_append.py [playlist size]   (default: 10000)
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import tracemalloc
+import xml.etree.ElementTree as ET
+import xml.dom.minidom
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from playlist_catalog import PlaylistCatalog
+
+ADDED_COUNTS = [1, 1000]
+REPEATS = 5
+
+
+def write_playlist(path, count):
+    with open(path, "w", encoding="utf-8", newline="\r\n") as f:
+        f.write('<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n  <Playlist>\n    <Name>Big</Name>\n  </Playlist>\n')
+        for i in range(count):
+            f.write(f"  <PlaylistGame>\n    <GameId>{i:08d}-0000-0000-0000-000000000000</GameId>\n"
+                    f"    <GameTitle>Game {i}</GameTitle>\n    <ManualOrder>{i}</ManualOrder>\n  </PlaylistGame>\n")
+        f.write("</LaunchBox>")
+
+
+def minidom_add(path, game_ids):
+    tree = ET.parse(path)
+    root = tree.getroot()
+    existing_ids = {g.text for g in root.findall("PlaylistGame/GameId")}
+    for gid in game_ids:
+        if gid not in existing_ids:
+            pg_node = ET.Element("PlaylistGame")
+            ET.SubElement(pg_node, "GameId").text = gid
+            root.append(pg_node)
+            existing_ids.add(gid)
+    dom = xml.dom.minidom.parseString(ET.tostring(root, encoding="utf-8"))
+    with open(path, "wb") as f:
+        f.write(dom.toprettyxml(indent="  ", encoding="utf-8"))
+
+
+def prepare_minidom(path, game_ids):
+    return lambda: minidom_add(path, game_ids)
+
+
+def prepare_incremental(path, game_ids):
+    catalog = PlaylistCatalog(os.path.dirname(path), os.path.dirname(path))
+    catalog.refresh()  # The agent's catalog is warm; only the write is measured
+    return lambda: catalog.append_games("Big", game_ids)
+
+
+def measure(template, path, prepare, game_ids):
+    """Returns (best time in ms, peak traced memory in MiB) of adding game_ids to a fresh copy of the playlist."""
+    times = []
+    for _ in range(REPEATS):
+        shutil.copyfile(template, path)
+        action = prepare(path, game_ids)
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    # Memory is traced in a separate run, as tracing slows the allocations down
+    shutil.copyfile(template, path)
+    action = prepare(path, game_ids)
+    tracemalloc.start()
+    action()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times) * 1000, peak / 2**20
+
+
+def main(size):
+    base_dir = tempfile.mkdtemp()
+    try:
+        template = os.path.join(base_dir, "template.xml")
+        work_dir = os.path.join(base_dir, "Playlists")
+        os.makedirs(work_dir)
+        write_playlist(template, size)
+        print(f"Playlist with {size} entries: {os.path.getsize(template) / 2**20:.1f} MiB")
+        print(f"{'added':>6} {'writer':<12} {'ms':>9} {'peak MiB':>9}")
+        for added in ADDED_COUNTS:
+            game_ids = [f"new-{i}" for i in range(added)]
+            for name, prepare in (("minidom", prepare_minidom), ("incremental", prepare_incremental)):
+                ms, peak = measure(template, os.path.join(work_dir, "Big.xml"), prepare, game_ids)
+                print(f"{added:>6} {name:<12} {ms:>9.2f} {peak:>9.1f}")
+    finally:
+        shutil.rmtree(base_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,63 @@
+"""Compares the title search index with a linear scan over a synthetic 100k-game library.
+
+The linear scan is what clients do today: lowercase every title and test `query in title`.
+It only finds substrings; the index also handles word prefixes and typos.
+
+Usage: python benchmarks/bench_title_search.py [game count]   (default: 100000)
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from title_search import TitleSearchIndex
+from platform_reader import GameRecord
+
+WORDS = (
+    "street fighter final fight super mario kart pac man galaga donkey kong metal slug king of "
+    "fighters mortal kombat tekken puzzle bobble bubble dragon ninja turtles simpsons x men "
+    "marvel capcom golden axe double shot bowling golf racing rally star wars space invaders "
+    "asteroids tempest defender robotron frogger centipede dig dug bomber raiden strikers "
+    "gradius darius contra castlevania zelda warrior legend quest world champion edition turbo"
+).split()
+QUERIES = ["street fighter", "galaga", "mort komb", "fightr", "invad", "kong", "s"]
+REPEATS = 20
+
+
+def build_games(count):
+    rng = random.Random(42)
+    return [
+        GameRecord(" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))) + f" {i % 97}", str(i), "Arcade", "")
+        for i in range(count)
+    ]
+
+
+def linear_scan(games, query, limit):
+    q = query.lower()
+    matches = [g for g in games if q in g.title.lower()]
+    return matches[:limit], len(matches)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - start) / REPEATS * 1000, result
+
+
+def main(count):
+    games = build_games(count)
+    start = time.perf_counter()
+    index = TitleSearchIndex(games)
+    print(f"{count} games, index built in {time.perf_counter() - start:.2f} s")
+    print(f"{'query':<16} {'scan ms':>8} {'scan hits':>10} | {'index ms':>9} {'index hits':>11}")
+    for query in QUERIES:
+        scan_ms, (_, scan_hits) = timed(lambda: linear_scan(games, query, 50))
+        index_ms, (_, index_hits) = timed(lambda: index.search(query, limit=50))
+        print(f"{query:<16} {scan_ms:>8.2f} {scan_hits:>10} | {index_ms:>9.2f} {index_hits:>11}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,72 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Above this share of the catalog, an ID set is filtered faster with a plain set lookup per game:
+# each wanted ID still costs a Python-level hash and string compare on the columnar path
+MAX_COLUMNAR_ID_SHARE = 0.15
+
+
+def columns_available():
+    """True when NumPy is installed and the columnar catalog can be used."""
+    return np is not None
+
+
+def prefer_columns(id_count, game_count):
+    """True when filtering game_count games by id_count IDs is faster on the columnar catalog."""
+    return np is not None and id_count <= game_count * MAX_COLUMNAR_ID_SHARE
+
+
+def _hash_ids(ids, count=-1):
+    # hash() of a str is stable for the lifetime of the process, which is all the columns need
+    return np.fromiter(map(hash, ids), dtype=np.int64, count=count)
+
+
+class CatalogColumns:
+    """Columnar (NumPy) form of the catalog's game list, for vectorized ID set filters.
+
+    Holds one array entry per game, in catalog order: a 64-bit hash of its ID. ID lookups
+    binary-search the sorted hashes and then compare the actual IDs, so results are exact
+    even if two IDs share a hash. Filters return positions into `games`, so results keep
+    the catalog's title ordering without sorting again.
+    Requires NumPy (see columns_available()).
+    """
+
+    def __init__(self, games):
+        self.games = games
+        count = len(games)
+        self.id_hashes = _hash_ids((game.id for game in games), count=count)
+        self.has_id = np.fromiter((bool(game.id) for game in games), dtype=bool, count=count)
+        # Catalog positions ordered by ID hash, and the hashes in that order, for searchsorted
+        self._hash_order = np.argsort(self.id_hashes, kind="stable")
+        self._sorted_hashes = self.id_hashes[self._hash_order]
+        self._ids = np.array([game.id for game in games], dtype=object)
+
+    def _referenced_mask(self, game_ids):
+        """Mask of the games whose ID is in the iterable game_ids."""
+        mask = np.zeros(len(self.games), dtype=bool)
+        if not len(self.games):
+            return mask
+        wanted = list(game_ids)
+        hashes = _hash_ids(wanted, count=len(wanted))
+        # Searching with sorted needles walks the sorted hashes front to back instead of jumping around
+        needle_order = np.argsort(hashes)
+        hashes = hashes[needle_order]
+        wanted = np.array(wanted, dtype=object)[needle_order]
+        lo = np.searchsorted(self._sorted_hashes, hashes, side="left")
+        hi = np.searchsorted(self._sorted_hashes, hashes, side="right")
+        # One game per hash is the normal case: compare its ID with the wanted ID in one vectorized pass
+        single = hi - lo == 1
+        positions = self._hash_order[lo[single]]
+        mask[positions[self._ids[positions] == wanted[single]]] = True
+        # Duplicate IDs across platform files (or a hash collision) leave several candidates to check one by one
+        for i in np.flatnonzero(hi - lo > 1):
+            for position in self._hash_order[lo[i]:hi[i]]:
+                if self._ids[position] == wanted[i]:
+                    mask[position] = True
+        return mask & self.has_id
+
+    def orphan_positions(self, game_ids):
+        """Positions of the games with an ID that is not in game_ids, in catalog order."""
+        return np.flatnonzero(self.has_id & ~self._referenced_mask(game_ids))
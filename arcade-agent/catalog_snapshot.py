@@ -0,0 +1,179 @@
+import os
+import sys
+import mmap
+import struct
+import logging
+from array import array
+
+# Binary snapshot of the parsed game catalog, used to serve games right after agent startup
+# without re-parsing the LaunchBox platform XML files.
+#
+# Layout (little-endian):
+#   header        magic, format version, column count, file count, game count, string count
+#   u32           string index of the platforms folder the snapshot was built from
+#   u32 * columns string indexes of the column (game field) names
+#   file entries  (name string index, size, mtime_ns, first game, game count) per platform file
+#   u32 * games * columns   string index of every field of every game
+#   u64 * games, u32 * games  byte offset and length of every game's <Game> element in its platform file
+#   u64 * (strings + 1)     byte offsets of each string in the string blob
+#   string blob   UTF-8 encoded, de-duplicated strings
+SNAPSHOT_MAGIC = b"LBCATSNP"
+SNAPSHOT_FORMAT_VERSION = 2
+
+_HEADER = struct.Struct("<8sIIIII")
+_FILE_ENTRY = struct.Struct("<IQqII")
+
+
+# --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
+def log(msg, level=logging.INFO):
+    logging.log(level, msg)
+
+
+def _to_little_endian(arr):
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+
+def write_snapshot(path, platforms_path, fields, files):
+    """Writes the catalog files ({filename: {"stat": (size, mtime_ns), "games": [game]}}) to path.
+
+    Each game is stored as the values of its `fields` attributes plus its `offset` and `length`.
+
+    The file is written to a temporary name and renamed into place, so a reader never sees
+    a half-written snapshot.
+    """
+    strings = []
+    string_index = {}
+
+    def ref(value):
+        i = string_index.get(value)
+        if i is None:
+            i = string_index[value] = len(strings)
+            strings.append(value)
+        return i
+
+    root_ref = ref(platforms_path)
+    column_refs = array("I", [ref(field) for field in fields])
+    file_entries = bytearray()
+    records = array("I")
+    offsets = array("Q")
+    lengths = array("I")
+    game_count = 0
+    for filename, entry in files.items():
+        games = entry["games"]
+        size, mtime_ns = entry["stat"]
+        file_entries += _FILE_ENTRY.pack(ref(filename), size, mtime_ns, game_count, len(games))
+        for game in games:
+            records.extend(ref(getattr(game, field)) for field in fields)
+            offsets.append(game.offset)
+            lengths.append(game.length)
+        game_count += len(games)
+
+    blob = bytearray()
+    string_offsets = array("Q")
+    for value in strings:
+        string_offsets.append(len(blob))
+        blob += value.encode("utf-8")
+    string_offsets.append(len(blob))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(fields), len(files), game_count, len(strings)))
+        f.write(struct.pack("<I", root_ref))
+        f.write(_to_little_endian(column_refs).tobytes())
+        f.write(file_entries)
+        f.write(_to_little_endian(records).tobytes())
+        f.write(_to_little_endian(offsets).tobytes())
+        f.write(_to_little_endian(lengths).tobytes())
+        f.write(_to_little_endian(string_offsets).tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+    log(f"Wrote catalog snapshot with {game_count} games from {len(files)} platform files to {path}", level=logging.DEBUG)
+
+
+def read_snapshot(path, platforms_path, fields, factory):
+    """Memory-maps a snapshot written by write_snapshot and returns its catalog files.
+
+    Games are rebuilt with factory(*values, filename, offset, length), the values in `fields` order.
+
+    Returns None when the snapshot is missing, corrupt, from another format version, built
+    from another platforms folder or with other fields. The caller is expected to compare
+    the returned (size, mtime_ns) stats with the platform files on disk.
+    """
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return _decode(view, platforms_path, fields, factory)
+            finally:
+                view.release()
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError, OSError) as e:
+        log(f"Ignoring unreadable catalog snapshot {path}: {e}", level=logging.WARNING)
+        return None
+
+
+def _decode(view, platforms_path, fields, factory):
+    magic, version, column_count, file_count, game_count, string_count = _HEADER.unpack_from(view, 0)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_FORMAT_VERSION:
+        log("Catalog snapshot has an unknown format, ignoring it.", level=logging.WARNING)
+        return None
+
+    pos = _HEADER.size
+    (root_ref,) = struct.unpack_from("<I", view, pos)
+    pos += 4
+    column_refs = _read_array(view, "I", pos, column_count)
+    pos += 4 * column_count
+    entries_pos = pos
+    pos += _FILE_ENTRY.size * file_count
+    records = _read_array(view, "I", pos, game_count * column_count)
+    pos += 4 * game_count * column_count
+    game_offsets = _read_array(view, "Q", pos, game_count)
+    pos += 8 * game_count
+    game_lengths = _read_array(view, "I", pos, game_count)
+    pos += 4 * game_count
+    offsets = _read_array(view, "Q", pos, string_count + 1)
+    blob_start = pos + 8 * (string_count + 1)
+    if blob_start + offsets[-1] > len(view):
+        raise ValueError("snapshot is truncated")
+    if max(records, default=0) >= string_count or max(column_refs, default=0) >= string_count or root_ref >= string_count:
+        raise ValueError("snapshot refers to a string it does not contain")
+
+    decoded = [None] * string_count
+
+    def string(i):
+        value = decoded[i]
+        if value is None:
+            value = decoded[i] = str(view[blob_start + offsets[i]:blob_start + offsets[i + 1]], "utf-8")
+        return value
+
+    if string(root_ref) != platforms_path:
+        log("Catalog snapshot was built from another platforms folder, ignoring it.", level=logging.INFO)
+        return None
+    if tuple(string(i) for i in column_refs) != tuple(fields):
+        log("Catalog snapshot has different game fields, ignoring it.", level=logging.INFO)
+        return None
+
+    files = {}
+    for n in range(file_count):
+        name_ref, size, mtime_ns, first, count = _FILE_ENTRY.unpack_from(view, entries_pos + n * _FILE_ENTRY.size)
+        if name_ref >= string_count or first + count > game_count:
+            raise ValueError("snapshot refers to a game it does not contain")
+        filename = string(name_ref)
+        games = []
+        for g in range(first, first + count):
+            base = g * column_count
+            values = [string(records[base + c]) for c in range(column_count)]
+            games.append(factory(*values, filename, game_offsets[g], game_lengths[g]))
+        files[filename] = {"stat": (size, mtime_ns), "games": games}
+    return files
+
+
+def _read_array(view, typecode, pos, count):
+    arr = array(typecode)
+    arr.frombytes(view[pos:pos + arr.itemsize * count])
+    if len(arr) != count:
+        raise ValueError("snapshot is truncated")
+    return _to_little_endian(arr)
@@ -0,0 +1,98 @@
+import threading
+import uuid
+from collections import deque
+
+# Number of change entries kept; clients further behind than that have to resync
+MAX_CHANGE_ENTRIES = 20000
+
+
+def diff_games(old_games, new_games):
+    """Returns the game change entries between two game lists, as {"type", "action", "id"} dicts.
+
+    Games are matched by ID; a game whose fields differ is reported as "changed". Games
+    without an ID cannot be tracked and are left out.
+    """
+    old_by_id = {game.id: game for game in old_games if game.id}
+    new_by_id = {game.id: game for game in new_games if game.id}
+    changes = []
+    for game_id in sorted(old_by_id.keys() | new_by_id.keys()):
+        old = old_by_id.get(game_id)
+        new = new_by_id.get(game_id)
+        if old is None:
+            action = "added"
+        elif new is None:
+            action = "removed"
+        elif old != new:
+            action = "changed"
+        else:
+            continue
+        changes.append({"type": "game", "action": action, "id": game_id})
+    return changes
+
+
+def diff_playlists(old_playlists, new_playlists):
+    """Returns the playlist change entries between two {playlist name: set of game IDs} dicts.
+
+    Reports added and removed playlists, and per playlist the game IDs added to or removed from it.
+    """
+    changes = []
+    for name in sorted(old_playlists.keys() | new_playlists.keys()):
+        old_ids = old_playlists.get(name)
+        new_ids = new_playlists.get(name)
+        if old_ids is None:
+            changes.append({"type": "playlist", "action": "added", "name": name})
+            old_ids = set()
+        elif new_ids is None:
+            changes.append({"type": "playlist", "action": "removed", "name": name})
+            continue
+        added = sorted(new_ids - old_ids)
+        removed = sorted(old_ids - new_ids)
+        if added:
+            changes.append({"type": "playlist_games", "action": "added", "name": name, "ids": added})
+        if removed:
+            changes.append({"type": "playlist_games", "action": "removed", "name": name, "ids": removed})
+    return changes
+
+
+class ChangeLog:
+    """Bounded, thread-safe log of catalog and playlist changes.
+
+    Every recorded batch of changes gets the next generation number. Only the newest
+    `max_entries` entries are kept; whole generations are dropped at once, so a client is
+    either given every change after its generation or told to resync. Generations restart
+    with the agent process, which `instance_id` identifies.
+    """
+
+    def __init__(self, max_entries=MAX_CHANGE_ENTRIES):
+        self.max_entries = max_entries
+        self.instance_id = uuid.uuid4().hex[:12]
+        self.generation = 0
+        self._entries = deque()  # (generation, change) pairs, oldest first
+        self._floor = 0  # Newest generation that has been dropped from the log
+        self._lock = threading.Lock()
+
+    def record(self, changes):
+        """Adds a batch of changes under a new generation. Returns the generation (unchanged for an empty batch)."""
+        with self._lock:
+            if not changes:
+                return self.generation
+            self.generation += 1
+            self._entries.extend((self.generation, change) for change in changes)
+            while len(self._entries) > self.max_entries:
+                dropped, _ = self._entries.popleft()
+                self._floor = dropped
+                while self._entries and self._entries[0][0] == dropped:
+                    self._entries.popleft()
+            return self.generation
+
+    def since(self, generation):
+        """Returns (changes after `generation` each with its "generation", current generation).
+
+        Changes is None when the client has to resync: `generation` has aged out of the log
+        or is ahead of it (e.g. from before an agent restart).
+        """
+        with self._lock:
+            if generation < self._floor or generation > self.generation:
+                return None, self.generation
+            changes = [dict(change, generation=g) for g, change in self._entries if g > generation]
+            return changes, self.generation
@@ -0,0 +1,91 @@
+from array import array
+from collections import Counter
+from itertools import chain
+
+# Facets that games can be filtered and counted by
+FACETS = ("platform", "genre", "developer", "publisher", "year", "decade")
+
+
+def game_facet_values(game):
+    """Returns {facet: [values]} for one catalog game. Empty values are left out."""
+    release_year = game.release_date[:4]
+    year = release_year if len(release_year) == 4 and release_year.isdigit() else ""
+    values = {
+        "platform": [game.platform],
+        # LaunchBox separates multiple genres with ';'
+        "genre": [g.strip() for g in game.genre.split(";")],
+        "developer": [game.developer],
+        "publisher": [game.publisher],
+        "year": [year],
+        "decade": [f"{year[:3]}0s" if year else ""],
+    }
+    return {facet: [v for v in vals if v] for facet, vals in values.items()}
+
+
+class FacetIndex:
+    """Sorted posting lists (catalog positions) per facet value, for fast filtering and counting.
+
+    Values are matched case-insensitively. Several values of one facet are OR'ed together,
+    different facets are AND'ed.
+    """
+
+    def __init__(self, games):
+        self.games = games
+        self._postings = {facet: {} for facet in FACETS}  # facet -> casefolded value -> array of positions
+        self._labels = {facet: {} for facet in FACETS}  # facet -> casefolded value -> value as first seen
+        # facet -> per position tuple of value labels, used to count the facets of a result set
+        self._forward = {facet: [] for facet in FACETS}
+        for position, game in enumerate(games):
+            for facet, values in game_facet_values(game).items():
+                postings = self._postings[facet]
+                labels = self._labels[facet]
+                game_labels = []
+                for value in values:
+                    key = value.casefold()
+                    label = labels.setdefault(key, value)
+                    if label in game_labels:
+                        continue
+                    game_labels.append(label)
+                    postings.setdefault(key, array("I")).append(position)
+                self._forward[facet].append(tuple(game_labels))
+
+    def _counts(self, facet, positions=None):
+        if positions is None:
+            labels = self._labels[facet]
+            counts = {labels[key]: len(posting) for key, posting in self._postings[facet].items()}
+        else:
+            counts = Counter(chain.from_iterable(map(self._forward[facet].__getitem__, positions)))
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def match(self, filters):
+        """Returns the sorted catalog positions matching {facet: [values]}, or None for no filters."""
+        matched = None
+        # Intersect the most selective facet first
+        selections = []
+        for facet, values in filters.items():
+            selected = set()
+            for value in values:
+                selected.update(self._postings[facet].get(value.casefold(), ()))
+            selections.append(selected)
+        for selected in sorted(selections, key=len):
+            matched = selected if matched is None else matched.intersection(selected)
+            if not matched:
+                return []
+        return sorted(matched) if matched is not None else None
+
+    def query(self, filters, limit=50, count_facets=FACETS, max_values=50):
+        """Filters games and counts facet values over the result.
+
+        Returns (games of the first `limit` matches in catalog order, total matches,
+        {facet: {value: count}} limited to the `max_values` most frequent values per facet).
+        """
+        positions = self.match(filters)
+        total = len(self.games) if positions is None else len(positions)
+        counts = {}
+        for facet in count_facets:
+            counts[facet] = dict(self._counts(facet, positions)[:max_values])
+        if positions is None:
+            games = self.games[:limit]
+        else:
+            games = [self.games[p] for p in positions[:limit]]
+        return games, total, counts
@@ -0,0 +1,277 @@
+import os
+import bisect
+import threading
+import uuid
+import time
+import logging
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+from platform_reader import iter_platform_games, read_game_element, GameRecord
+from catalog_snapshot import read_snapshot, write_snapshot
+from change_log import diff_games
+
+# How long (in seconds) a refresh result is trusted before the platform folder is stat'ed again.
+# Keeps bursts of requests (e.g. the web UI loading several tabs) from hitting the disk at all.
+STAT_CHECK_INTERVAL = 2.0
+
+# Game fields kept in the catalog (and in its on-disk snapshot)
+GAME_FIELDS = GameRecord.FIELDS
+
+# --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
+def log(msg, level=logging.INFO):
+    logging.log(level, msg)
+
+
+def parse_platform_file(filepath):
+    """Parses one LaunchBox platform XML file and returns its games as a list of GameRecords."""
+    return list(iter_platform_games(filepath))
+
+
+def load_platform_file(filepath):
+    """Parses a platform file without raising; returns (games, error_message).
+
+    Runs in pool worker processes too, where the agent's logging is not configured,
+    so errors are handed back to the caller to be logged instead of logged here.
+    """
+    filename = os.path.basename(filepath)
+    try:
+        return parse_platform_file(filepath), None
+    except ET.ParseError as e:
+        return [], f"XML parse error in platform file {filename}: {e}"
+    except Exception as e:
+        return [], f"Unexpected error parsing platform file {filename}: {str(e)}"
+
+
+def sort_key(game):
+    """Catalog ordering: by title, ties broken by ID so every position has a unique key."""
+    return (game.title, game.id)
+
+
+class GameCatalog:
+    """Process-wide cache of the games found in the LaunchBox platform XML files.
+
+    Each platform file is parsed once and kept in memory, as GameRecords, together with its (size, mtime).
+    A refresh only re-parses the files whose (size, mtime) changed, drops the files that
+    disappeared, and bumps `generation` whenever the merged game list changed.
+    """
+
+    def __init__(self, platforms_path, stat_check_interval=STAT_CHECK_INTERVAL, parse_workers=0, snapshot_path=None, change_log=None):
+        self.platforms_path = platforms_path
+        self.stat_check_interval = stat_check_interval
+        self.parse_workers = parse_workers  # > 1 parses changed platform files in a process pool
+        self.snapshot_path = snapshot_path  # Binary snapshot rewritten after every change, if set
+        self.change_log = change_log  # ChangeLog receiving the games added/removed/changed by each refresh, if set
+        self.generation = 0
+        # Distinguishes this process's generations from those of a previous agent run
+        self.instance_id = uuid.uuid4().hex[:12]
+        self._files = {}  # filename -> {"stat": (size, mtime_ns), "games": [GameRecord]}
+        self._games = []  # Merged list, sorted by (title, id)
+        self._by_platform = {}  # platform -> games, sorted like _games
+        self._by_id = {}  # game ID -> game, for O(1) lookups
+        self._indexes = {}  # name -> (generation, index) for indexes derived from _games
+        self._last_check = None
+        self._lock = threading.RLock()
+
+    def _scan(self):
+        """Returns {filename: (size, mtime_ns)} for every platform XML file on disk."""
+        stats = {}
+        for filename in os.listdir(self.platforms_path):
+            if not filename.endswith(".xml"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.platforms_path, filename))
+            except OSError as e:
+                log(f"Could not stat platform file {filename}: {e}", level=logging.WARNING)
+                continue
+            stats[filename] = (st.st_size, st.st_mtime_ns)
+        return stats
+
+    def _load_files(self, filenames):
+        """Parses the given platform files, isolating parse errors to the failing file.
+
+        Returns {filename: games}. Uses a process pool when parse_workers > 1 and more
+        than one file needs parsing; results are identical to the sequential path.
+        """
+        filepaths = [os.path.join(self.platforms_path, f) for f in filenames]
+        workers = min(self.parse_workers, len(filepaths))
+        if workers > 1:
+            log(f"Parsing {len(filepaths)} platform files with {workers} worker processes")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(load_platform_file, filepaths))
+        else:
+            results = [load_platform_file(path) for path in filepaths]
+
+        loaded = {}
+        for filename, (games, error) in zip(filenames, results):
+            if error:
+                log(error, level=logging.ERROR)
+            else:
+                log(f"Parsed {len(games)} games from {filename}")
+            loaded[filename] = games
+        return loaded
+
+    def refresh(self, force=False):
+        """Brings the catalog in line with the platform files on disk and returns the generation."""
+        with self._lock:
+            now = time.monotonic()
+            if (not force and self._last_check is not None
+                    and now - self._last_check < self.stat_check_interval):
+                return self.generation
+            self._last_check = now
+
+            if not os.path.isdir(self.platforms_path):
+                log(f"Platforms path missing: {self.platforms_path}")
+                stats = {}
+            else:
+                stats = self._scan()
+
+            changed = [f for f, st in stats.items() if self._files.get(f, {}).get("stat") != st]
+            removed = [f for f in self._files if f not in stats]
+            if not changed and not removed:
+                return self.generation
+
+            log(f"Platform catalog refresh: {len(changed)} changed, {len(removed)} removed, {len(stats)} total files in: {self.platforms_path}")
+            old_games = [game for f in changed + removed for game in self._files.get(f, {}).get("games", ())]
+            for filename in removed:
+                del self._files[filename]
+            loaded = self._load_files(changed)
+            for filename in changed:
+                self._files[filename] = {"stat": stats[filename], "games": loaded[filename]}
+
+            # The first load is the baseline clients sync against, not a change
+            record_changes = self.change_log is not None and self.generation > 0
+            self._rebuild()
+            if record_changes:
+                changes = diff_games(old_games, [game for f in changed for game in loaded[f]])
+                # A game "removed" from one file but still listed in another platform file is still there
+                self.change_log.record([c for c in changes if c["action"] != "removed" or c["id"] not in self._by_id])
+            self._save_snapshot()
+            return self.generation
+
+    def _rebuild(self):
+        """Re-merges the per-file game lists, rebuilds the sorted views and bumps the generation."""
+        merged = []
+        for entry in self._files.values():
+            merged.extend(entry["games"])
+        self._games = sorted(merged, key=sort_key)
+        by_platform = {}
+        for game in self._games:
+            by_platform.setdefault(game.platform, []).append(game)
+        self._by_platform = by_platform
+        self._by_id = {game.id: game for game in self._games if game.id}
+        self.generation += 1
+
+    def load_snapshot(self):
+        """Seeds the catalog from the on-disk snapshot, if there is a usable one.
+
+        Every platform file keeps the (size, mtime) recorded in the snapshot, so the next
+        refresh only re-parses the files that changed since the snapshot was written.
+        Returns True when the snapshot was loaded.
+        """
+        if not self.snapshot_path:
+            return False
+        with self._lock:
+            files = read_snapshot(self.snapshot_path, self.platforms_path, GAME_FIELDS, GameRecord)
+            if files is None:
+                return False
+            self._files = files
+            self._last_check = None
+            self._rebuild()
+            log(f"Loaded {len(self._games)} games from {len(files)} platform files out of catalog snapshot {self.snapshot_path}")
+            return True
+
+    def _save_snapshot(self):
+        if not self.snapshot_path:
+            return
+        try:
+            write_snapshot(self.snapshot_path, self.platforms_path, GAME_FIELDS, self._files)
+        except Exception as e:
+            log(f"Failed to write catalog snapshot {self.snapshot_path}: {e}", level=logging.ERROR)
+
+    def get_games(self, platform=None):
+        """Returns the merged game list sorted by title (then ID). Callers must not mutate it.
+
+        The returned list is replaced, never modified, when the catalog changes, so it can be
+        iterated after the call without holding the catalog lock.
+        """
+        with self._lock:
+            self.refresh()
+            if platform is None:
+                return self._games
+            return self._by_platform.get(platform, [])
+
+    def get_by_ids(self, game_ids):
+        """Looks up games by ID in O(len(game_ids)). Returns (found games in request order, missing IDs)."""
+        with self._lock:
+            self.refresh()
+            by_id = self._by_id
+        found = []
+        missing = []
+        for game_id in game_ids:
+            game = by_id.get(game_id)
+            if game is None:
+                missing.append(game_id)
+            else:
+                found.append(game)
+        return found, missing
+
+    def get_game_element(self, game_id):
+        """Returns the full <Game> element of a game, parsed from just its byte range, or None.
+
+        If the platform file changed since it was parsed, the catalog is refreshed first so
+        the recorded byte range matches the file again.
+        """
+        with self._lock:
+            self.refresh()
+            for attempt in range(2):
+                game = self._by_id.get(game_id)
+                if game is None:
+                    return None
+                filepath = os.path.join(self.platforms_path, game.source)
+                try:
+                    st = os.stat(filepath)
+                    if (st.st_size, st.st_mtime_ns) == self._files[game.source]["stat"]:
+                        element = read_game_element(filepath, game.offset, game.length)
+                        if element.findtext("ID", "") == game_id:
+                            return element
+                except (OSError, KeyError, ET.ParseError) as e:
+                    log(f"Could not read game {game_id} from {game.source} at offset {game.offset}: {e}", level=logging.WARNING)
+                if attempt == 0:
+                    self.refresh(force=True)
+            return None
+
+    def get_index(self, name, build):
+        """Returns the index `name`, calling build(games) again whenever the catalog changed.
+
+        Derived indexes (search, facets, ...) are built lazily on first use after a change
+        and then shared by every request until the next change.
+        """
+        with self._lock:
+            self.refresh()
+            cached = self._indexes.get(name)
+            if cached is None or cached[0] != self.generation:
+                cached = (self.generation, build(self._games))
+                self._indexes[name] = cached
+            return cached[1]
+
+    def current_etag(self):
+        """Refreshes the catalog and returns a strong ETag value identifying its content."""
+        with self._lock:
+            self.refresh()
+            return f"{self.instance_id}-{self.generation}"
+
+    def get_page(self, limit, after=None, platform=None):
+        """Returns (games, total) for one page of the title-sorted catalog.
+
+        `after` is the sort key of the last game of the previous page (see sort_key), and
+        `platform` restricts the page to one platform. Costs O(log n + limit).
+        """
+        with self._lock:
+            self.refresh()
+            if platform is None:
+                games = self._games
+            else:
+                games = self._by_platform.get(platform, [])
+            start = bisect.bisect_right(games, after, key=sort_key) if after is not None else 0
+            return games[start:start + limit], len(games)
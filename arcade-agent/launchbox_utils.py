@@ -1,9 +1,22 @@
 import os
-import xml.etree.ElementTree as ET
-import xml.dom.minidom
 import logging
 import re
-import urllib.parse
+import json
+import base64
+import hashlib
+import threading
+
+from game_catalog import GameCatalog, GAME_FIELDS, sort_key
+from title_search import TitleSearchIndex
+from facet_index import FacetIndex, FACETS
+from catalog_columns import CatalogColumns, prefer_columns
+from orphan_index import OrphanIndex
+from change_log import ChangeLog, diff_playlists
+from rom_verifier import RomVerifier
+from playlist_catalog import PlaylistCatalog, playlist_filename
+from playlist_queue import PlaylistWriteQueue
+from smart_playlists import SmartPlaylists
+from rom_hasher import RomHasher, ROM_HASH_WORKERS, ROM_HASH_RATE_LIMIT
 
 # --- Configuration (These might need to be passed in or read from a config) ---
 # For now, hardcoding based on original agent.py
@@ -12,6 +25,53 @@ LAUNCHBOX_PATH = os.path.join(USER_HOME, "LaunchBox")
 PLATFORMS_PATH = os.path.join(LAUNCHBOX_PATH, "Data", "Platforms")
 PLAYLISTS_PATH = os.path.join(LAUNCHBOX_PATH, "Data", "Playlists")
 
+# Number of worker processes used to parse platform files in parallel (0 or 1 = sequential)
+PARSE_WORKERS = int(os.environ.get("AGENT_PARSE_WORKERS", "0"))
+
+# Largest page size accepted by the paginated games endpoint
+MAX_GAMES_PAGE_SIZE = 5000
+# Largest number of results returned by the title search endpoint
+MAX_SEARCH_RESULTS = 500
+# Upper bound on the operations of one /api/launchbox/playlists/batch request
+MAX_PLAYLIST_BATCH_OPERATIONS = 1000
+
+# ROM checksum cache (JSON lines), kept next to agent.log like the catalog snapshot
+ROM_HASH_CACHE_FILE = "rom_hashes.jsonl"
+# Threads hashing ROM files, and their combined read rate cap in MB/s (0 = unlimited)
+ROM_HASH_WORKERS = int(os.environ.get("AGENT_ROM_HASH_WORKERS", str(ROM_HASH_WORKERS)))
+ROM_HASH_RATE_MB = float(os.environ.get("AGENT_ROM_HASH_RATE_MB", str(ROM_HASH_RATE_LIMIT / 2**20)))
+
+# Binary snapshot of the parsed catalog, kept next to agent.log so restarts can skip the XML parse
+CATALOG_SNAPSHOT_FILE = "game_catalog.snapshot"
+
+# Bounded log of game and playlist changes, served by /api/launchbox/changes
+CHANGE_LOG = ChangeLog()
+
+# Process-wide platform catalog; platform files are only re-parsed when their (size, mtime) change
+GAME_CATALOG = GameCatalog(PLATFORMS_PATH, parse_workers=PARSE_WORKERS, snapshot_path=CATALOG_SNAPSHOT_FILE, change_log=CHANGE_LOG)
+
+# Background check of every game's ApplicationPath, started by agent.py
+ROM_VERIFIER = RomVerifier(LAUNCHBOX_PATH)
+
+# Process-wide playlist cache; only playlist files whose size/mtime changed are read again
+PLAYLIST_CATALOG = PlaylistCatalog(PLAYLISTS_PATH, os.path.join(LAUNCHBOX_PATH, "Images", "Playlists"))
+
+# Adds to the same playlist within a short window are written to disk together
+PLAYLIST_QUEUE = PlaylistWriteQueue(PLAYLIST_CATALOG)
+
+# Smart playlist rules, kept next to agent.log like the other agent state files
+SMART_PLAYLISTS_FILE = "smart_playlists.json"
+
+# Rule-based playlists, re-tested against the games that changed and updated by agent.py in the background
+SMART_PLAYLISTS = SmartPlaylists(SMART_PLAYLISTS_FILE, GAME_CATALOG, PLAYLIST_CATALOG)
+
+# Background CRC32/SHA1 hashing of the ROM files, started by agent.py
+ROM_HASHER = RomHasher(ROM_HASH_CACHE_FILE, ROM_VERIFIER.resolve, workers=ROM_HASH_WORKERS,
+                       rate_limit=int(ROM_HASH_RATE_MB * 2**20))
+
+# Fields a game can be returned with: the catalog fields plus the ROM check result
+GAME_RESPONSE_FIELDS = GAME_FIELDS + ("rom_exists",)
+
 # --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
 # Need to ensure logging is configured before these functions are called
 def log(msg, level=logging.INFO):
@@ -19,187 +79,270 @@ def log(msg, level=logging.INFO):
 
 # --- Helper Functions ---
 
-def get_all_games():
-    games = []
-    if not os.path.isdir(PLATFORMS_PATH):
-        log(f"Platforms path missing: {PLATFORMS_PATH}")
-        return games
+def game_to_dict(game, fields=GAME_RESPONSE_FIELDS):
+    """JSON form of a catalog game, projected onto `fields` (see GAME_RESPONSE_FIELDS).
+
+    `rom_exists` is True/False once the background ROM check has covered the game, else None.
+    """
+    if "rom_exists" not in fields:
+        return game.to_dict(fields)
+    data = game.to_dict([f for f in fields if f != "rom_exists"])
+    data["rom_exists"] = ROM_VERIFIER.rom_exists(game.id)
+    return data
 
-    xml_files = [f for f in os.listdir(PLATFORMS_PATH) if f.endswith(".xml")]
-    log(f"Found {len(xml_files)} platform XML files in: {PLATFORMS_PATH}")
+def get_games_etag():
+    """Strong ETag value for game responses: changes with the catalog and with the ROM check results."""
+    return f"{GAME_CATALOG.current_etag()}-r{ROM_VERIFIER.generation}"
 
-    for filename in xml_files:
-        filepath = os.path.join(PLATFORMS_PATH, filename)
-        count = 0
+def get_all_games():
+    """Returns every game across all platforms as dicts, sorted by title, from the cached catalog."""
+    games = GAME_CATALOG.get_games()
+    log(f"Catalog generation {GAME_CATALOG.generation}: {len(games)} games available", level=logging.DEBUG)
+    return [game_to_dict(game) for game in games]
+
+def encode_games_cursor(game):
+    """Opaque cursor pointing just after `game` in the catalog ordering."""
+    return base64.urlsafe_b64encode(json.dumps(sort_key(game)).encode("utf-8")).decode("ascii")
+
+def decode_games_cursor(cursor):
+    title, game_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    return (str(title), str(game_id))
+
+def get_games_page(limit, cursor=None, fields=None, platform=None):
+    """Returns (page, error) for one page of the title-sorted game catalog.
+
+    `fields` projects each game onto a subset of GAME_RESPONSE_FIELDS and `platform` filters by
+    platform name. The page holds the games, the total matching count and the cursor of
+    the next page (None on the last page).
+    """
+    if limit < 1 or limit > MAX_GAMES_PAGE_SIZE:
+        return None, f"limit must be between 1 and {MAX_GAMES_PAGE_SIZE}"
+    if fields:
+        unknown = [f for f in fields if f not in GAME_RESPONSE_FIELDS]
+        if unknown:
+            return None, f"Unknown fields: {', '.join(unknown)}"
+    after = None
+    if cursor:
         try:
-            tree = ET.parse(filepath)
-            root = tree.getroot()
-            platform_name = os.path.splitext(filename)[0]
-            for game in root.findall("Game"):
-                game_data = {
-                    "title": game.findtext("Title", ""),
-                    "id": game.findtext("ID", ""),
-                    "platform": game.findtext("Platform", platform_name),
-                    "path": game.findtext("ApplicationPath", "")
-                }
-                # DEBUG: Log a sample game ID
-                if game_data["title"] == "Donkey Kong":
-                    log(f"DEBUG: Extracted Donkey Kong ID: {game_data['id']}", level=logging.DEBUG)
-                games.append(game_data)
-                count += 1
-            log(f"Parsed {count} games from {filename}")
-        except ET.ParseError as e:
-            log(f"XML parse error in platform file {filename}: {e}", level=logging.ERROR)
-        except Exception as e:
-            log(f"Unexpected error parsing platform file {filename}: {str(e)}", level=logging.ERROR)
-
-    return sorted(games, key=lambda x: x.get('title', '')) # Sort safely
+            after = decode_games_cursor(cursor)
+        except Exception:
+            log(f"Invalid games cursor received: {cursor}", level=logging.WARNING)
+            return None, "Invalid cursor"
+
+    games, total = GAME_CATALOG.get_page(limit + 1, after=after, platform=platform)
+    has_more = len(games) > limit
+    games = games[:limit]
+    next_cursor = encode_games_cursor(games[-1]) if has_more else None
+    return {
+        "games": [game_to_dict(game, fields or GAME_RESPONSE_FIELDS) for game in games],
+        "total": total,
+        "next_cursor": next_cursor,
+        "generation": GAME_CATALOG.generation
+    }, None
+
+def get_playlists_etag():
+    """Strong ETag value for the playlist data, computed from file stats without parsing any XML."""
+    # Banner changes made through the agent and queued adds are not covered by the playlist file stats
+    digest = hashlib.sha1(f"{PLAYLIST_CATALOG.banner_changes}:{PLAYLIST_QUEUE.version}".encode("ascii"))
+    if os.path.isdir(PLAYLISTS_PATH):
+        for filename in sorted(os.listdir(PLAYLISTS_PATH)):
+            if not filename.endswith(".xml"):
+                continue
+            try:
+                st = os.stat(os.path.join(PLAYLISTS_PATH, filename))
+            except OSError:
+                continue
+            digest.update(f"|{filename}:{st.st_size}:{st.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()
+
+def get_orphaned_games_etag():
+    """Orphans depend on both the game catalog and the playlists."""
+    PLAYLIST_QUEUE.flush()  # The orphans are computed from the playlist files, so the ETag must be too
+    return f"{get_games_etag()}-{get_playlists_etag()}"
+
+# Playlist ETag and {playlist name: set of game IDs} as of the last change log sync
+_synced_playlists = None
+_playlist_sync_lock = threading.Lock()
+
+def sync_playlist_changes():
+    """Records the playlist membership changes since the previous sync in CHANGE_LOG.
+
+    Playlists are only parsed when their ETag changed. The first sync is the baseline and records nothing.
+    """
+    global _synced_playlists
+    with _playlist_sync_lock:
+        etag = get_playlists_etag()
+        if _synced_playlists is not None and _synced_playlists[0] == etag:
+            return
+        membership = {playlist["name"]: set(playlist["gameIds"]) for playlist in get_playlists_data()}
+        if _synced_playlists is not None:
+            CHANGE_LOG.record(diff_playlists(_synced_playlists[1], membership))
+        _synced_playlists = (etag, membership)
+
+def get_changes(since=None, instance=None):
+    """Returns the game and playlist changes after generation `since` of the change log.
+
+    The result holds the agent `instance`, the current `generation` and either the `changes`
+    or `resync: true` when the client has to reload games and playlists in full: `since` is
+    missing, has aged out of the log, or `instance` names an earlier agent process.
+    """
+    GAME_CATALOG.refresh()
+    sync_playlist_changes()
+    if since is None or (instance and instance != CHANGE_LOG.instance_id):
+        changes, generation = None, CHANGE_LOG.generation
+    else:
+        changes, generation = CHANGE_LOG.since(since)
+    return {
+        "instance": CHANGE_LOG.instance_id,
+        "generation": generation,
+        "resync": changes is None,
+        "changes": changes or []
+    }
 
 def get_playlists_data():
-    log("Reading playlists...")
-    playlists = []
-    if not os.path.isdir(PLAYLISTS_PATH):
-        log(f"Playlists path missing: {PLAYLISTS_PATH}", level=logging.WARNING)
-        return playlists
-
-    # Define the base path for playlist images
-    PLAYLIST_IMAGES_BASE_PATH = os.path.join(LAUNCHBOX_PATH, "Images", "Playlists")
-
-    for filename in os.listdir(PLAYLISTS_PATH):
-        if filename.endswith(".xml"):
-            path = os.path.join(PLAYLISTS_PATH, filename)
-            try:
-                tree = ET.parse(path)
-                root = tree.getroot()
-                playlist_element = root.find("Playlist")
-                if playlist_element is None:
-                    log(f"Could not find <Playlist> element in {filename}", level=logging.WARNING)
-                    continue
-                name = playlist_element.findtext("Name", "")
-                game_ids = [g.text for g in root.findall("PlaylistGame/GameId") if g.text] # Ensure g.text is not None
-                # DEBUG: Log sample playlist IDs
-                if name == "1 Player _ Turn base":
-                     log(f"DEBUG: Extracted Game IDs for '{name}': {game_ids[:5]}...", level=logging.DEBUG) # Log first 5
-                playlist_data = {"name": name, "gameIds": game_ids, "game_count": len(game_ids)}
-
-                # Construct and check for banner image path
-                # Sanitize playlist name for path construction
-                safe_playlist_name = re.sub(r'[<>:"/\\|?*]', '_', name)
-                banner_image_path = os.path.join(PLAYLIST_IMAGES_BASE_PATH, safe_playlist_name, "Clear Logo", f"{safe_playlist_name}.png")
-
-                if os.path.exists(banner_image_path):
-                    # Include the path in the data, potentially relative to LAUNCHBOX_PATH or absolute
-                    # Sending absolute path for now, can adjust if needed for frontend
-                    playlist_data["bannerImagePath"] = banner_image_path
-                    log(f"Found banner image for playlist '{name}': {banner_image_path}", level=logging.DEBUG)
-                else:
-                    log(f"No banner image found for playlist '{name}' at expected path: {banner_image_path}", level=logging.DEBUG)
-
-
-                playlists.append(playlist_data)
-                log(f"Parsed playlist '{name}' with {len(game_ids)} games from {filename}")
-
-                # --- Repair Check (even if parsing succeeded, check for malformed structure) ---
-                # Read the raw content to check for the specific broken pattern
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-
-                # Simple check for the pattern </Playlist><PlaylistGame>
-                # This is a basic check and might need refinement depending on variations
-                if "</Playlist><PlaylistGame>" in content:
-                    log(f"Detected potentially malformed XML in {filename}. Attempting repair.", level=logging.WARNING)
-                    # Re-parse and pretty-print to fix formatting
-                    try:
-                        repaired_xml_string = ET.tostring(root, encoding='utf-8')
-                        dom = xml.dom.minidom.parseString(repaired_xml_string)
-                        pretty_xml_string = dom.toprettyxml(indent="  ", encoding="utf-8")
-
-                        with open(path, "wb") as f:
-                            f.write(pretty_xml_string)
-                        log(f"Successfully repaired and pretty-printed {filename}.")
-                    except Exception as repair_e:
-                        log(f"Failed to repair {filename} after detecting malformed structure: {repair_e}", level=logging.ERROR)
-
-
-            except ET.ParseError as e:
-                log(f"XML parse error in playlist {filename}: {e}. Attempting repair.", level=logging.ERROR)
-                # --- Repair Logic for Parse Errors ---
-                try:
-                    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-
-                    # Attempt to fix the specific broken pattern: insert newline and indent after </Playlist>
-                    # This regex looks for </Playlist> immediately followed by <PlaylistGame>
-                    repaired_content = re.sub(r"</Playlist>(<PlaylistGame>)", r"</Playlist>\n  \1", content)
-
-                    # Try parsing the repaired content
-                    repaired_root = ET.fromstring(repaired_content)
-
-                    # If parsing is successful, pretty-print and save
-                    repaired_xml_string = ET.tostring(repaired_root, encoding='utf-8')
-                    dom = xml.dom.minidom.parseString(repaired_xml_string)
-                    pretty_xml_string = dom.toprettyxml(indent="  ", encoding="utf-8") # Use 2 spaces for indent
-
-                    with open(path, "wb") as f: # Open in binary mode for writing bytes
-                        f.write(pretty_xml_string)
-
-                    log(f"Successfully repaired and re-saved {filename} after parse error.")
-
-                    # Re-parse the repaired file to add to the playlists list
-                    tree = ET.parse(path)
-                    root = tree.getroot()
-                    playlist_element = root.find("Playlist")
-                    if playlist_element is not None:
-                        name = playlist_element.findtext("Name", "")
-                        game_ids = [g.text for g in root.findall("PlaylistGame/GameId") if g.text]
-                        playlist_data = {"name": name, "gameIds": game_ids, "game_count": len(game_ids)}
-
-                        # Construct and check for banner image path for repaired file
-                        safe_playlist_name = re.sub(r'[<>:"/\\|?*]', '_', name)
-                        banner_image_path = os.path.join(PLAYLIST_IMAGES_BASE_PATH, safe_playlist_name, "Clear Logo", f"{safe_playlist_name}.png")
-
-                        if os.path.exists(banner_image_path):
-                            playlist_data["bannerImagePath"] = banner_image_path
-                            log(f"Found banner image for repaired playlist '{name}': {banner_image_path}", level=logging.DEBUG)
-                        else:
-                            log(f"No banner image found for repaired playlist '{name}' at expected path: {banner_image_path}", level=logging.DEBUG)
-
-                        playlists.append(playlist_data)
-                        log(f"Parsed repaired playlist '{name}' with {len(game_ids)} games from {filename}")
-                    else:
-                         log(f"Repaired file {filename} still missing <Playlist> element.", level=logging.WARNING)
-
-
-                except Exception as repair_e:
-                    log(f"Failed to repair {filename} after parse error: {repair_e}", level=logging.ERROR)
-                    # If repair fails, skip this playlist
-                    continue
-
-            except Exception as e:
-                 log(f"Unexpected error parsing playlist {filename}: {str(e)}", level=logging.ERROR)
-                 continue # Skip this playlist on unexpected errors
+    """Returns every playlist as {"name", "gameIds", "game_count"[, "bannerImagePath"]}.
+
+    Served from PLAYLIST_CATALOG, which only reads the playlist files changed since the last call.
+    Games still queued in PLAYLIST_QUEUE are included, so an add shows up before it is written,
+    and a playlist whose last queued write failed carries the error as "write_error".
+    """
+    playlists = PLAYLIST_CATALOG.get_playlists()
+    pending = PLAYLIST_QUEUE.pending_games()
+    errors = PLAYLIST_QUEUE.get_errors()
+    for playlist in playlists:
+        if playlist["name"] in errors:
+            playlist["write_error"] = errors[playlist["name"]]
+        queued = pending.get(playlist["name"])
+        if queued:
+            playlist["gameIds"] = playlist["gameIds"] + queued
+            playlist["game_count"] = len(playlist["gameIds"])
+    log(f"Returning {len(playlists)} playlists.", level=logging.DEBUG)
     return playlists
 
+def get_playlist_repair_status():
+    return PLAYLIST_CATALOG.get_repair_status()
+
+def repair_playlists():
+    """Repairs the malformed playlist files now and returns the report (see PlaylistCatalog.repair)."""
+    PLAYLIST_QUEUE.flush()
+    report = PLAYLIST_CATALOG.repair()
+    log(f"Playlist repair: {len(report['repaired'])} repaired, {len(report['failed'])} failed, {len(report['unparseable'])} unparseable")
+    return report
+
+def search_games(query, limit=50):
+    """Returns (result, error) for a ranked title search over the catalog.
+
+    Matches whole words, word prefixes, substrings and near-misses (typos); every word of the
+    query has to match. The result holds the top `limit` games, each with its score.
+    """
+    if not query or not query.strip():
+        return None, "Query parameter 'q' is required"
+    if limit < 1 or limit > MAX_SEARCH_RESULTS:
+        return None, f"limit must be between 1 and {MAX_SEARCH_RESULTS}"
+    index = GAME_CATALOG.get_index("title_search", TitleSearchIndex)
+    matches, total = index.search(query, limit=limit)
+    log(f"Title search '{query}' matched {total} games", level=logging.DEBUG)
+    return {
+        "query": query,
+        "total": total,
+        "results": [dict(game_to_dict(game), score=score) for game, score in matches]
+    }, None
+
+def get_game_facets(filters, limit=50, fields=None):
+    """Returns (result, error) for a faceted query over the catalog.
+
+    `filters` maps facet names (see FACETS) to lists of accepted values. The result holds the
+    total number of matching games, the value counts of every facet over the matching games
+    and the first `limit` matching games in catalog order, optionally projected onto `fields`.
+    """
+    unknown = [f for f in filters if f not in FACETS]
+    if unknown:
+        return None, f"Unknown facets: {', '.join(unknown)}"
+    if limit < 0 or limit > MAX_GAMES_PAGE_SIZE:
+        return None, f"limit must be between 0 and {MAX_GAMES_PAGE_SIZE}"
+    if fields:
+        unknown = [f for f in fields if f not in GAME_RESPONSE_FIELDS]
+        if unknown:
+            return None, f"Unknown fields: {', '.join(unknown)}"
+    index = GAME_CATALOG.get_index("facets", FacetIndex)
+    games, total, counts = index.query(filters, limit=limit)
+    log(f"Facet query {filters} matched {total} games", level=logging.DEBUG)
+    return {"total": total, "facets": counts, "games": [game_to_dict(game, fields or GAME_RESPONSE_FIELDS) for game in games]}, None
+
+def get_playlist_game_ids():
+    """Returns the set of game IDs referenced by at least one playlist."""
+    PLAYLIST_QUEUE.flush()
+    return PLAYLIST_CATALOG.referenced_ids()
+
+def get_game_playlists(game_id):
+    """Returns {"id", "playlists"}: the names of the playlists listing the game, from the reverse index."""
+    PLAYLIST_QUEUE.flush()  # The reverse index only knows the written playlists
+    return {"id": game_id, "playlists": PLAYLIST_CATALOG.get_game_playlists(game_id)}
+
+def get_catalog_ids():
+    """Returns the frozenset of every game ID in the catalog, built once per catalog generation."""
+    return GAME_CATALOG.get_index("ids", lambda games: frozenset(game.id for game in games if game.id))
+
+def find_dangling_entries():
+    """Returns {"playlists": [{"name", "game_ids"}], "total"}: playlist entries whose game ID is in no platform file."""
+    PLAYLIST_QUEUE.flush()
+    dangling = PLAYLIST_CATALOG.find_dangling(get_catalog_ids())
+    return {
+        "playlists": [{"name": name, "game_ids": game_ids} for name, game_ids in dangling.items()],
+        "total": sum(len(game_ids) for game_ids in dangling.values())
+    }
+
+def remove_dangling_entries(playlist_names=None):
+    """Returns (result, error) after removing the dangling entries, optionally only from `playlist_names`.
+
+    Uses one batch "remove" operation per affected playlist, so each file is rewritten once and
+    atomically. Refuses to run against an empty catalog, where every entry would look dangling.
+    """
+    known_ids = get_catalog_ids()
+    if not known_ids:
+        return None, "The game catalog is empty; refusing to remove playlist entries"
+    PLAYLIST_QUEUE.flush()
+    dangling = PLAYLIST_CATALOG.find_dangling(known_ids)
+    if playlist_names is not None:
+        dangling = {name: ids for name, ids in dangling.items() if name in playlist_names}
+    if not dangling:
+        return {"removed": 0, "results": []}, None
+    results = PLAYLIST_CATALOG.apply_batch([{"op": "remove", "playlist": name, "games": ids} for name, ids in dangling.items()])
+    removed = sum(result.get("removed", 0) for result in results if result["status"] == "ok")
+    log(f"Removed {removed} dangling entries from {len(results)} playlists")
+    return {"removed": removed, "results": results}, None
+
+def _scan_orphan_positions(games, playlist_game_ids):
+    """Full orphan scan for OrphanIndex: a vectorized set difference when the columnar catalog is worth it."""
+    if not prefer_columns(len(playlist_game_ids), len(games)):
+        return None
+    columns = GAME_CATALOG.get_index("columns", CatalogColumns)
+    if columns.games is not games:
+        return None  # The catalog changed in between; the orphan index is rebuilt on the next request
+    return columns.orphan_positions(playlist_game_ids)
+
+def iter_orphaned_games():
+    """Yields the catalog games that are not in any playlist, as dicts in catalog order.
+
+    The orphan set is kept by an OrphanIndex, which only applies the playlist membership
+    changes since the previous request. Queued playlist adds are written first.
+    """
+    PLAYLIST_QUEUE.flush()
+    index = GAME_CATALOG.get_index("orphans", OrphanIndex)
+    for game in index.get_orphans(PLAYLIST_CATALOG, full_scan=_scan_orphan_positions):
+        yield game_to_dict(game)
+
 def find_orphaned_games():
     log("Finding orphaned games...")
-    all_games = get_all_games()
-    playlists_data = get_playlists_data()
-
-    playlist_game_ids = set()
-    for playlist in playlists_data:
-        ids = playlist.get("gameIds")
-        if isinstance(ids, list):
-             playlist_game_ids.update(ids)
-        else:
-            log(f"Playlist '{playlist.get('name', 'Unknown')}' has invalid or missing 'gameIds'", level=logging.WARNING)
-
-    orphaned_games = [
-        game for game in all_games
-        if game.get("id") and game.get("id") not in playlist_game_ids
-    ]
+    orphaned_games = list(iter_orphaned_games())
     log(f"Found {len(orphaned_games)} orphaned games.")
     return orphaned_games
 
+def iter_games(fields=None, platform=None):
+    """Yields catalog games as dicts in catalog order, optionally filtered by platform and projected onto fields."""
+    for game in GAME_CATALOG.get_games(platform=platform):
+        yield game_to_dict(game, fields or GAME_RESPONSE_FIELDS)
+
 def add_games_to_playlist(playlist_name, game_ids):
     log(f"Attempting to add {len(game_ids)} games to playlist: {playlist_name}")
 
@@ -207,56 +350,75 @@ def add_games_to_playlist(playlist_name, game_ids):
         log("Invalid input for add_games_to_playlist", level=logging.WARNING)
         return {"status": "error", "message": "Invalid input"}
 
-    playlist_found = False
-    for filename in os.listdir(PLAYLISTS_PATH):
-        if filename.endswith(".xml"):
-            path = os.path.join(PLAYLISTS_PATH, filename)
-            try:
-                tree = ET.parse(path)
-                root = tree.getroot()
-                playlist_element = root.find("Playlist")
-                if playlist_element is not None and playlist_element.findtext("Name", "") == playlist_name:
-                    playlist_found = True
-                    existing_ids = {g.text for g in root.findall("PlaylistGame/GameId")}
-                    added_count = 0
-                    for gid in game_ids:
-                        if gid not in existing_ids:
-                            pg_node = ET.Element("PlaylistGame")
-                            gid_node = ET.SubElement(pg_node, "GameId")
-                            gid_node.text = gid
-                            root.append(pg_node)
-                            added_count += 1
-                            existing_ids.add(gid)
-
-                    if added_count > 0:
-                        # Use minidom for pretty printing
-                        xml_string = ET.tostring(root, encoding='utf-8')
-                        dom = xml.dom.minidom.parseString(xml_string)
-                        pretty_xml_string = dom.toprettyxml(indent="  ", encoding="utf-8") # Use 2 spaces for indent
-
-                        with open(path, "wb") as f: # Open in binary mode for writing bytes
-                            f.write(pretty_xml_string)
-
-                        log(f"Updated playlist '{playlist_name}' with {added_count} new games and pretty-printed.")
-                        return {"status": "updated", "added": added_count}
-                    else:
-                        log(f"No new games to add to playlist '{playlist_name}'.")
-                        return {"status": "no changes", "added": 0}
-
-            except ET.ParseError as e:
-                log(f"Failed to parse playlist {filename} for update: {e}", level=logging.ERROR)
-                return {"status": "error", "message": f"Failed to parse playlist file: {e}"}
-            except Exception as e:
-                log(f"Error updating playlist {filename}: {e}", level=logging.ERROR)
-                return {"status": "error", "message": f"Error updating playlist file: {e}"}
-
-    if not playlist_found:
-        log(f"Playlist '{playlist_name}' not found for updating.", level=logging.WARNING)
-        return {"status": "playlist not found"}
-    else:
-        # This path might not be reachable if playlist_found was True but update failed
-        log(f"Update failed for playlist '{playlist_name}', but file was found.", level=logging.ERROR)
-        return {"status": "error", "message": "Failed to update playlist file"}
+    try:
+        # Queued and written together with the other adds to this playlist within PLAYLIST_WRITE_DELAY
+        added = PLAYLIST_QUEUE.add_games(playlist_name, game_ids)
+        if added is None:
+            log(f"Playlist '{playlist_name}' not found for updating.", level=logging.WARNING)
+            return {"status": "playlist not found"}
+        if added:
+            log(f"Queued {len(added)} new games for playlist '{playlist_name}'.")
+            result = {"status": "updated", "added": len(added)}
+        else:
+            log(f"No new games to add to playlist '{playlist_name}'.")
+            result = {"status": "no changes", "added": 0}
+        # The queued games of a failed write are retried; tell the caller they are not on disk yet
+        write_error = PLAYLIST_QUEUE.get_errors().get(playlist_name)
+        if write_error:
+            result["write_error"] = write_error
+        return result
+
+    except Exception as e:
+        log(f"Error updating playlist '{playlist_name}': {e}", level=logging.ERROR)
+        return {"status": "error", "message": f"Error updating playlist file: {e}"}
+
+def apply_playlist_batch(operations):
+    """Returns (result, error) for a batch of playlist operations (see PlaylistCatalog.apply_batch).
+
+    The result holds one {"op", "playlist", "status", ...} entry per operation and the number of
+    operations that were applied; "error" and "rolled_back" operations left their file untouched.
+    """
+    if not isinstance(operations, list) or not operations:
+        return None, "operations must be a non-empty list"
+    if len(operations) > MAX_PLAYLIST_BATCH_OPERATIONS:
+        return None, f"At most {MAX_PLAYLIST_BATCH_OPERATIONS} operations per batch"
+    PLAYLIST_QUEUE.flush()  # Queued adds are applied before the batch, in the order they were made
+    # Through SMART_PLAYLISTS, so smart playlist rules follow the deletes and renames
+    results = SMART_PLAYLISTS.apply_batch(operations)
+    applied = sum(1 for result in results if result["status"] == "ok")
+    log(f"Playlist batch: {applied} of {len(results)} operations applied")
+    return {"applied": applied, "results": results}, None
+
+def flush_playlist_writes():
+    """Writes every queued playlist add to disk now.
+
+    Returns {"written": {playlist name: number of games}, "failed": {playlist name: error}}; the
+    games of a failed write stay queued and are tried again.
+    """
+    written, failed = PLAYLIST_QUEUE.flush()
+    return {"written": {name: len(game_ids) for name, game_ids in written.items()}, "failed": failed}
+
+def get_smart_playlists():
+    """Returns {"playlists": [{"name", "rule", "game_count"}]} for every smart playlist rule."""
+    return {"playlists": SMART_PLAYLISTS.get_rules()}
+
+def set_smart_playlist(playlist_name, rule, replace=False):
+    """Returns (result, error) after creating or replacing a smart playlist rule and writing the playlist (see SmartPlaylists.set_rule).
+
+    An existing regular playlist is only taken over with `replace`; without it the error comes with
+    {"name", "would_remove"} as result.
+    """
+    PLAYLIST_QUEUE.flush()
+    return SMART_PLAYLISTS.set_rule(playlist_name, rule, replace=replace)
+
+def delete_smart_playlist(playlist_name):
+    """Forgets a smart playlist rule, keeping its playlist file. Returns False without such a rule."""
+    return SMART_PLAYLISTS.delete_rule(playlist_name)
+
+def update_smart_playlists():
+    """Brings the smart playlists in line with the catalog now. Returns {"updated": {playlist name: {"added", "removed"}}}."""
+    PLAYLIST_QUEUE.flush()
+    return {"updated": SMART_PLAYLISTS.update()}
 
 def delete_playlist(playlist_name):
     log(f"Attempting to delete playlist: {playlist_name}")
@@ -265,11 +427,20 @@ def delete_playlist(playlist_name):
         log("Invalid input for delete_playlist", level=logging.WARNING)
         return {"status": "error", "message": "Invalid input"}
 
-    playlist_filename = f"{playlist_name}.xml"
-    playlist_path = os.path.join(PLAYLISTS_PATH, playlist_filename)
-
-    if not os.path.exists(playlist_path):
-        log(f"Playlist file not found for deletion: {playlist_path}", level=logging.WARNING)
+    # The file is found by the playlist's <Name>, like add_games_to_playlist, not assumed to be "<name>.xml"
+    PLAYLIST_QUEUE.flush()
+    # Dropped first, so the smart playlist update cannot write the playlist again once it is deleted
+    rule_deleted = SMART_PLAYLISTS.delete_rule(playlist_name)
+    playlist_path = PLAYLIST_CATALOG.find_file(playlist_name)
+    if playlist_path is None:
+        # A file that does not parse has no <Name> in the index; fall back to the file named after the playlist
+        fallback_path = os.path.join(PLAYLISTS_PATH, playlist_filename(playlist_name))
+        if os.path.isfile(fallback_path):
+            playlist_path = fallback_path
+    if playlist_path is None:
+        if rule_deleted:
+            return {"status": "deleted"}
+        log(f"Playlist '{playlist_name}' not found for deletion.", level=logging.WARNING)
         return {"status": "playlist not found"}
 
     try:
@@ -283,25 +454,75 @@ def delete_playlist(playlist_name):
         log(f"Unexpected error deleting playlist {playlist_path}: {e}", level=logging.ERROR)
         return {"status": "error", "message": f"Unexpected error: {e}"}
 
+def get_missing_roms():
+    """Returns the games whose ROM was not found by the last ROM check, with the check's status."""
+    missing = [game_to_dict(game) for game in GAME_CATALOG.get_games() if ROM_VERIFIER.rom_exists(game.id) is False]
+    return {"running": ROM_VERIFIER.running, "last_run": ROM_VERIFIER.last_run, "games": missing}
+
+def get_rom_hashes_page(limit, cursor=None):
+    """Returns (page, error) for one page of ROM checksums, sorted by file path.
+
+    The page holds the entries (path, size, crc32, sha1, game_ids), the total number of
+    hashed files and the cursor of the next page (None on the last page).
+    """
+    if limit < 1 or limit > MAX_GAMES_PAGE_SIZE:
+        return None, f"limit must be between 1 and {MAX_GAMES_PAGE_SIZE}"
+    after = None
+    if cursor:
+        try:
+            after = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        except Exception:
+            log(f"Invalid ROM hashes cursor received: {cursor}", level=logging.WARNING)
+            return None, "Invalid cursor"
+    entries, total = ROM_HASHER.get_page(limit + 1, after=after)
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    next_cursor = base64.urlsafe_b64encode(entries[-1]["path"].encode("utf-8")).decode("ascii") if has_more else None
+    return {"hashes": entries, "total": total, "next_cursor": next_cursor}, None
+
+def get_rom_hash_progress():
+    return ROM_HASHER.get_progress()
+
+def element_to_dict(element):
+    """Converts the children of an XML element to a dict: leaf text as strings, nested elements as dicts.
+
+    A tag that appears several times becomes a list of its values.
+    """
+    result = {}
+    for child in element:
+        value = element_to_dict(child) if len(child) else (child.text or "")
+        if child.tag not in result:
+            result[child.tag] = value
+        elif isinstance(result[child.tag], list):
+            result[child.tag].append(value)
+        else:
+            result[child.tag] = [result[child.tag], value]
+    return result
+
+def get_game_full(game_id):
+    """Returns every field of one game's <Game> element as a dict, or None if the ID is unknown.
+
+    Reads only that game's byte range of its platform file instead of parsing the whole file.
+    """
+    element = GAME_CATALOG.get_game_element(game_id)
+    if element is None:
+        log(f"Full metadata requested for unknown game ID {game_id}", level=logging.DEBUG)
+        return None
+    return element_to_dict(element)
+
 def get_game_details(game_ids_to_find):
+    """Returns {"games": [...], "missing": [...]} for the requested game IDs, from the catalog's ID index."""
     log(f"Received request for game details for {len(game_ids_to_find)} IDs: {game_ids_to_find[:10]}...", level=logging.DEBUG)
 
     if not game_ids_to_find:
-        return [] # Return empty list if no IDs provided
+        return {"games": [], "missing": []} # Nothing to look up if no IDs provided
 
-    all_games = get_all_games()
-    # Create a lookup map for faster searching
-    games_map = {game.get("id"): game for game in all_games if game.get("id")}
-
-    found_games = []
-    for game_id in game_ids_to_find:
-        if game_id in games_map:
-            found_games.append(games_map[game_id])
-        else:
-             log(f"Game ID {game_id} requested but not found in platform data.", level=logging.WARNING)
+    found_games, missing_ids = GAME_CATALOG.get_by_ids(game_ids_to_find)
+    if missing_ids:
+        log(f"{len(missing_ids)} requested game IDs not found in platform data: {missing_ids[:10]}...", level=logging.WARNING)
 
     log(f"Returning details for {len(found_games)} games.", level=logging.DEBUG)
-    return found_games
+    return {"games": [game_to_dict(game) for game in found_games], "missing": missing_ids}
 
 def apply_playlist_banner_image(playlist_name, temp_image_path, launchbox_path):
     log(f"Attempting to apply banner for playlist '{playlist_name}' from temporary path: {temp_image_path}", level=logging.DEBUG)
@@ -323,6 +544,7 @@ def apply_playlist_banner_image(playlist_name, temp_image_path, launchbox_path):
         # Copy the temporary file to the permanent location
         import shutil
         shutil.copy2(temp_image_path, dest_path)
+        PLAYLIST_CATALOG.banner_changed()
         log(f"Successfully copied temporary image '{temp_image_path}' to permanent location: '{dest_path}'", level=logging.DEBUG)
 
         return {"status": "success", "message": "Playlist banner image applied successfully"}
@@ -0,0 +1,46 @@
+import threading
+
+
+class OrphanIndex:
+    """The catalog games listed by no playlist, kept up to date from the playlist membership changes.
+
+    Built per catalog generation (see GameCatalog.get_index). The first request computes the
+    orphan set from every referenced game ID; later requests only apply the game IDs that
+    became referenced or unreferenced since (see PlaylistCatalog.membership_since), so serving
+    orphans costs no playlist parsing and no pass over the catalog.
+    """
+
+    def __init__(self, games):
+        self.games = games
+        self._positions = {}  # game ID -> catalog positions (an ID can appear in several platform files)
+        for position, game in enumerate(games):
+            if game.id:
+                self._positions.setdefault(game.id, []).append(position)
+        self.generation = None  # Playlist membership generation the orphan set reflects
+        self._orphans = set()  # Catalog positions of the orphaned games
+        self._orphan_games = []  # The orphaned games in catalog order
+        self._lock = threading.Lock()
+
+    def get_orphans(self, playlist_catalog, full_scan=None):
+        """Returns the orphaned games in catalog order. Callers must not mutate the list.
+
+        `full_scan(games, referenced_ids)` may return the orphan positions when the set has to be
+        computed from scratch (e.g. with the columnar catalog); it can return None to fall back.
+        """
+        with self._lock:
+            generation, referenced, unreferenced = playlist_catalog.membership_since(self.generation)
+            if generation == self.generation and unreferenced is not None:
+                return self._orphan_games
+            if unreferenced is None:
+                positions = full_scan(self.games, referenced) if full_scan is not None else None
+                if positions is None:
+                    positions = [p for game_id, ps in self._positions.items() if game_id not in referenced for p in ps]
+                self._orphans = set(map(int, positions))
+            else:
+                for game_id in referenced:
+                    self._orphans.difference_update(self._positions.get(game_id, ()))
+                for game_id in unreferenced:
+                    self._orphans.update(self._positions.get(game_id, ()))
+            self._orphan_games = [self.games[position] for position in sorted(self._orphans)]
+            self.generation = generation
+            return self._orphan_games
@@ -0,0 +1,178 @@
+import os
+import sys
+import xml.etree.ElementTree as ET
+import xml.parsers.expat
+
+# Bytes handed to the XML parser at a time; records are yielded after every chunk
+READ_CHUNK_SIZE = 1 << 16
+
+# Platform XML child elements of <Game> read into GameRecord fields
+_FIELD_TAGS = {
+    "Title": "title",
+    "ID": "id",
+    "Platform": "platform",
+    "ApplicationPath": "path",
+    "Genre": "genre",
+    "Developer": "developer",
+    "Publisher": "publisher",
+    "ReleaseDate": "release_date",
+}
+
+
+def _split_path(path):
+    """Splits an ApplicationPath into (interned folder incl. separator, file name).
+
+    Games of one platform usually live in a handful of ROM folders, so the folder part
+    is stored once per distinct folder instead of once per game.
+    """
+    cut = max(path.rfind("\\"), path.rfind("/")) + 1
+    return sys.intern(path[:cut]), path[cut:]
+
+
+class GameRecord:
+    """Compact representation of one <Game> entry from a LaunchBox platform XML file.
+
+    Strings that repeat across games (platform, genre, developer, publisher, ROM folder)
+    are interned, so the catalog holds each distinct value once. Use to_dict() to turn a
+    record into JSON-ready data.
+
+    `source`, `offset` and `length` locate the <Game> element in its platform file: it starts
+    `offset` bytes into the file and its end tag starts `length` bytes later (see read_game_element).
+    """
+    FIELDS = ("title", "id", "platform", "path", "genre", "developer", "publisher", "release_date")
+    __slots__ = ("title", "id", "platform", "_path_dir", "_path_name", "genre", "developer", "publisher", "release_date",
+                 "source", "offset", "length")
+
+    def __init__(self, title, id, platform, path, genre="", developer="", publisher="", release_date="",
+                 source="", offset=0, length=0):
+        self.title = title
+        self.id = id
+        self.platform = sys.intern(platform)
+        self._path_dir, self._path_name = _split_path(path)
+        self.genre = sys.intern(genre)
+        self.developer = sys.intern(developer)
+        self.publisher = sys.intern(publisher)
+        self.release_date = release_date
+        self.source = sys.intern(source)
+        self.offset = offset
+        self.length = length
+
+    @property
+    def path(self):
+        return self._path_dir + self._path_name
+
+    def to_dict(self, fields=FIELDS):
+        """Returns the record as a dict, optionally projected onto a subset of FIELDS."""
+        return {field: getattr(self, field) for field in fields}
+
+    def __reduce__(self):
+        # Rebuild through __init__ when unpickled (e.g. from a parse worker process) so strings get interned again
+        return (GameRecord, tuple(getattr(self, field) for field in self.FIELDS) + (self.source, self.offset, self.length))
+
+    def __eq__(self, other):
+        if not isinstance(other, GameRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"GameRecord({', '.join(f'{field}={getattr(self, field)!r}' for field in self.FIELDS)})"
+
+
+def iter_platform_games(filepath):
+    """Streams the <Game> entries of a platform XML file as GameRecord objects.
+
+    Feeds the file to expat in chunks and only keeps the fields of the <Game> being read,
+    so peak memory depends on the chunk size, not on the size of the file. Records carry
+    the byte range of their <Game> element. Raises ET.ParseError on malformed XML, like
+    ET.parse does.
+    """
+    filename = os.path.basename(filepath)
+    platform_name = os.path.splitext(filename)[0]
+    parser = xml.parsers.expat.ParserCreate()
+    parser.buffer_text = True
+    records = []
+    depth = 0
+    game = None  # {field: text} of the top-level <Game> being read
+    game_offset = 0
+    field = None  # Field whose text is being collected
+    text = []
+
+    def start_element(tag, attrs):
+        nonlocal depth, game, game_offset, field
+        depth += 1
+        # Only direct children of <LaunchBox> are games, same as root.findall("Game")
+        if depth == 2 and tag == "Game":
+            game = {}
+            game_offset = parser.CurrentByteIndex
+        elif depth == 3 and game is not None:
+            name = _FIELD_TAGS.get(tag)
+            # findtext() semantics: the first matching child wins, an empty one reads as ""
+            if name is not None and name not in game:
+                game[name] = ""
+                field = name
+                text.clear()
+        elif field is not None:
+            # Text after a nested element is not part of the field's own text
+            game[field] = "".join(text)
+            field = None
+
+    def end_element(tag):
+        nonlocal depth, game, field
+        depth -= 1
+        if depth == 2 and field is not None:
+            game[field] = "".join(text)
+            field = None
+        elif depth == 1 and game is not None:
+            records.append(GameRecord(
+                game.get("title", ""),
+                game.get("id", ""),
+                game.get("platform", platform_name),
+                game.get("path", ""),
+                game.get("genre", ""),
+                game.get("developer", ""),
+                game.get("publisher", ""),
+                game.get("release_date", ""),
+                filename,
+                game_offset,
+                parser.CurrentByteIndex - game_offset
+            ))
+            game = None
+
+    def character_data(data):
+        if field is not None:
+            text.append(data)
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    try:
+        with open(filepath, "rb") as f:
+            while True:
+                chunk = f.read(READ_CHUNK_SIZE)
+                parser.Parse(chunk, not chunk)
+                yield from records
+                records.clear()
+                if not chunk:
+                    break
+    except xml.parsers.expat.ExpatError as e:
+        error = ET.ParseError(str(e))
+        error.code, error.position = e.code, (e.lineno, e.offset)
+        raise error from None
+
+
+def read_game_element(filepath, offset, length):
+    """Reads and parses just the <Game> element at the given byte range of a platform file.
+
+    The range ends where the element's end tag starts, so the end tag is added back here.
+    Raises ET.ParseError if the range does not hold a complete <Game> element (e.g. the
+    file changed since the range was recorded).
+    """
+    with open(filepath, "rb") as f:
+        f.seek(offset)
+        data = f.read(length)
+    if len(data) != length:
+        raise ET.ParseError("game element range is past the end of the file")
+    element = ET.fromstring(data + b"</Game>")
+    if element.tag != "Game":
+        raise ET.ParseError(f"expected <Game> at offset {offset}, found <{element.tag}>")
+    return element
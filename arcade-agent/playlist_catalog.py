@@ -0,0 +1,679 @@
+import os
+import re
+import time
+import uuid
+import threading
+import logging
+from collections import deque
+import xml.etree.ElementTree as ET
+import xml.dom.minidom
+from xml.sax.saxutils import escape
+
+# Layout left behind by older writers: a <PlaylistGame> glued to the closing </Playlist> tag
+REPAIR_MARKER = b"</Playlist><PlaylistGame>"
+# Indentation of the top-level elements (<Playlist>, <PlaylistGame>) of a playlist file
+_INDENT_RE = re.compile(rb"\n([ \t]*)<(?:PlaylistGame|Playlist)>")
+# Operations accepted by PlaylistCatalog.apply_batch()
+BATCH_OPERATIONS = ("add", "remove", "create", "delete", "rename")
+# Membership changes kept for membership_since(); consumers further behind start over from the full set
+MAX_MEMBERSHIP_CHANGES = 1000
+# Seconds between two runs of the background playlist repair job
+PLAYLIST_REPAIR_INTERVAL = 3600
+
+
+# --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
+def log(msg, level=logging.INFO):
+    logging.log(level, msg)
+
+
+def banner_path(images_path, playlist_name):
+    """Returns where the Clear Logo banner of a playlist is expected under `images_path` (Images/Playlists)."""
+    safe_playlist_name = re.sub(r'[<>:"/\\|?*]', '_', playlist_name)
+    return os.path.join(images_path, safe_playlist_name, "Clear Logo", f"{safe_playlist_name}.png")
+
+
+def playlist_filename(name):
+    """Returns "<name>.xml" with the characters Windows does not allow in file names replaced by "_"."""
+    return re.sub(r'[<>:"/\\|?*]', '_', name) + ".xml"
+
+
+def pretty_print(root):
+    """Serializes a playlist tree with 2-space indentation, the way the agent writes playlist files."""
+    dom = xml.dom.minidom.parseString(ET.tostring(root, encoding="utf-8"))
+    return dom.toprettyxml(indent="  ", encoding="utf-8")
+
+
+def write_playlist_file(path, data):
+    """Replaces a playlist file atomically: readers (LaunchBox included) see the old or the new content, never a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def append_playlist_games(data, game_ids):
+    """Returns playlist file bytes with one <PlaylistGame> block per game ID inserted before </LaunchBox>.
+
+    The existing bytes are kept as they are; the new blocks follow the file's line endings
+    and indentation, so the result looks like the rest of the file.
+    """
+    end = data.rfind(b"</LaunchBox>")
+    if end < 0:
+        raise ValueError("No </LaunchBox> closing tag found")
+    newline = b"\r\n" if b"\r\n" in data else b"\n"
+    match = _INDENT_RE.search(data)
+    indent = match.group(1) if match and match.group(1) else b"  "
+    line_start = data.rfind(b"\n", 0, end) + 1
+    if data[line_start:end].strip():
+        # </LaunchBox> shares its line with other content: start the blocks on a new line
+        head, tail = data[:end] + newline, data[end:]
+    else:
+        head, tail = data[:line_start], data[line_start:]
+    blocks = b"".join(
+        indent + b"<PlaylistGame>" + newline
+        + indent * 2 + b"<GameId>" + escape(game_id).encode("utf-8") + b"</GameId>" + newline
+        + indent + b"</PlaylistGame>" + newline
+        for game_id in game_ids
+    )
+    return head + blocks + tail
+
+
+def parse_playlist_bytes(data):
+    """Parses the bytes of a playlist file and checks them for the broken layout in the same pass.
+
+    Returns (root, repaired): `repaired` is the pretty-printed content to write back when the
+    file is malformed (REPAIR_MARKER found, or only parseable once the marker is split), else
+    None. Raises ET.ParseError when the content cannot be parsed even after the repair.
+    """
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        text = data.decode("utf-8", errors="ignore")
+        root = ET.fromstring(re.sub(r"</Playlist>(<PlaylistGame>)", r"</Playlist>\n  \1", text))
+        return root, pretty_print(root)
+    if REPAIR_MARKER in data:
+        return root, pretty_print(root)
+    return root, None
+
+
+def playlist_from_root(root):
+    """Returns {"name", "gameIds", "game_count"} for a parsed playlist file, or None without a <Playlist> element."""
+    playlist_element = root.find("Playlist")
+    if playlist_element is None:
+        return None
+    game_ids = [g.text for g in root.findall("PlaylistGame/GameId") if g.text]
+    return {"name": playlist_element.findtext("Name", ""), "gameIds": game_ids, "game_count": len(game_ids)}
+
+
+def new_playlist_bytes(name):
+    """Returns the content of a new, empty playlist file named `name`."""
+    return (f'<?xml version="1.0" standalone="yes"?>\r\n<LaunchBox>\r\n  <Playlist>\r\n'
+            f'    <PlaylistId>{uuid.uuid4()}</PlaylistId>\r\n    <Name>{escape(name)}</Name>\r\n'
+            f'  </Playlist>\r\n</LaunchBox>').encode("utf-8")
+
+
+class PlaylistEdit:
+    """In-memory edit of one playlist file, written back in one piece.
+
+    The XML declaration, line endings and indentation of the file are kept; added entries
+    are indented like the existing ones and removed entries take their whitespace with them.
+    """
+
+    def __init__(self, data):
+        self.root, _ = parse_playlist_bytes(data)
+        self.playlist = self.root.find("Playlist")
+        if self.playlist is None:
+            raise ValueError("No <Playlist> element")
+        start = data.find(b"<" + self.root.tag.encode("utf-8"))
+        end = data.rfind(b"</" + self.root.tag.encode("utf-8") + b">")
+        self.prolog = data[:start] if start >= 0 else b""
+        self.epilog = data[end + len(self.root.tag) + 3:] if end >= 0 else b""
+        self.crlf = b"\r\n" in data
+        match = _INDENT_RE.search(data)
+        self.indent = match.group(1).decode("ascii") if match and match.group(1) else "  "
+        self.game_ids = {g.text for g in self.root.findall("PlaylistGame/GameId")}
+        self.changed = False
+
+    @property
+    def name(self):
+        return self.playlist.findtext("Name", "")
+
+    def add(self, game_ids):
+        """Appends a <PlaylistGame> per ID not in the playlist yet. Returns the IDs added."""
+        added = []
+        for game_id in game_ids:
+            if game_id in self.game_ids:
+                continue
+            entry = ET.Element("PlaylistGame")
+            entry.text = "\n" + self.indent * 2
+            ET.SubElement(entry, "GameId").text = game_id
+            entry[0].tail = "\n" + self.indent
+            last = self.root[-1]
+            entry.tail = last.tail
+            last.tail = "\n" + self.indent
+            self.root.append(entry)
+            self.game_ids.add(game_id)
+            added.append(game_id)
+        self.changed |= bool(added)
+        return added
+
+    def remove(self, game_ids):
+        """Removes the <PlaylistGame> entries of the given IDs. Returns the IDs removed."""
+        game_ids = set(game_ids)
+        removed = []
+        for position in range(len(self.root) - 1, -1, -1):
+            entry = self.root[position]
+            if entry.tag != "PlaylistGame" or entry.findtext("GameId") not in game_ids:
+                continue
+            if position == len(self.root) - 1 and position > 0:
+                self.root[position - 1].tail = entry.tail  # Keep the whitespace before the closing tag
+            self.root.remove(entry)
+            removed.append(entry.findtext("GameId"))
+        self.game_ids -= set(removed)
+        self.changed |= bool(removed)
+        return removed[::-1]
+
+    def rename(self, new_name):
+        old_name = self.name
+        for tag in ("Name", "NestedName"):
+            element = self.playlist.find(tag)
+            if element is not None and (tag == "Name" or element.text == old_name):
+                element.text = new_name
+        self.changed = True
+
+    def to_bytes(self):
+        body = ET.tostring(self.root, encoding="unicode")
+        if self.crlf:
+            body = body.replace("\n", "\r\n")
+        return self.prolog + body.encode("utf-8") + self.epilog
+
+
+class PlaylistCatalog:
+    """Process-wide cache of the LaunchBox playlist XML files.
+
+    Each file is read once into memory, parsed and checked for the broken layout from that
+    one buffer, and kept with its (size, mtime). A refresh stats the folder and only re-reads
+    files whose (size, mtime) changed. Banner lookups are cached per playlist name until the
+    playlist file or a banner changes through the agent (see banner_changed()).
+
+    Reading never writes: malformed files are served from their in-memory repair and only
+    flagged, and repair() rewrites them from the maintenance job.
+
+    Playlists are looked up by their display name (<Name>), which need not match the file
+    name, through a name -> file index rebuilt whenever a file changes. A reverse game ID ->
+    playlist files index is updated from the IDs each changed file gained or lost, and the
+    games that became (un)referenced by any playlist are logged for membership_since(), and
+    every ID added to or removed from some playlist for changed_since().
+    """
+
+    def __init__(self, playlists_path, images_path):
+        self.playlists_path = playlists_path
+        self.images_path = images_path  # Images/Playlists, where playlist banners live
+        self.banner_changes = 0  # Bumped whenever the agent changes a banner
+        self._files = {}  # filename -> {"stat": (size, mtime_ns), "playlist": dict or None, "needs_repair", "error"}
+        self._by_name = {}  # playlist name -> filename (the first file by name when several share a name)
+        self._by_game = {}  # game ID -> set of filenames of the playlists listing it
+        self.membership_generation = 0  # Bumped whenever a playlist gains or loses game IDs
+        self._membership_changes = deque(maxlen=MAX_MEMBERSHIP_CHANGES)  # (generation, referenced, unreferenced, changed)
+        self._banners = {}  # playlist name -> banner path or None
+        self._lock = threading.RLock()
+
+    def _scan(self):
+        """Returns {filename: (size, mtime_ns)} for every playlist XML file on disk."""
+        stats = {}
+        for filename in os.listdir(self.playlists_path):
+            if not filename.endswith(".xml"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.playlists_path, filename))
+            except OSError as e:
+                log(f"Could not stat playlist file {filename}: {e}", level=logging.WARNING)
+                continue
+            stats[filename] = (st.st_size, st.st_mtime_ns)
+        return stats
+
+    def _load_file(self, filename, stat):
+        """Reads and parses one playlist file without modifying it. Returns its catalog entry."""
+        path = os.path.join(self.playlists_path, filename)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            root, repaired = parse_playlist_bytes(data)
+        except ET.ParseError as e:
+            log(f"XML parse error in playlist {filename}: {e}", level=logging.ERROR)
+            return {"stat": stat, "playlist": None, "needs_repair": False, "error": str(e)}
+        except Exception as e:
+            log(f"Unexpected error parsing playlist {filename}: {str(e)}", level=logging.ERROR)
+            return {"stat": stat, "playlist": None, "needs_repair": False, "error": str(e)}
+
+        if repaired is not None:
+            log(f"Detected malformed XML in {filename}; it will be fixed by the playlist repair job.", level=logging.WARNING)
+        playlist = playlist_from_root(root)
+        if playlist is None:
+            log(f"Could not find <Playlist> element in {filename}", level=logging.WARNING)
+        else:
+            log(f"Parsed playlist '{playlist['name']}' with {playlist['game_count']} games from {filename}")
+        return {"stat": stat, "playlist": playlist, "needs_repair": repaired is not None, "error": None}
+
+    def refresh(self):
+        """Re-reads the playlist files whose (size, mtime) changed and drops the deleted ones."""
+        with self._lock:
+            if not os.path.isdir(self.playlists_path):
+                log(f"Playlists path missing: {self.playlists_path}", level=logging.WARNING)
+                stats = {}
+            else:
+                stats = self._scan()
+            changed = False
+            for filename in [f for f in self._files if f not in stats]:
+                self._set_entry(filename, None)
+                changed = True
+            for filename, stat in stats.items():
+                entry = self._files.get(filename)
+                if entry is not None and entry["stat"] == stat:
+                    continue
+                self._set_entry(filename, self._load_file(filename, stat))
+                changed = True
+            if changed:
+                self._index_names()
+
+    def _set_entry(self, filename, entry):
+        """Stores (or with None, drops) the entry of a file and updates the reverse index from its ID changes."""
+        old = self._files.pop(filename, None) if entry is None else self._files.get(filename)
+        if entry is not None:
+            self._files[filename] = entry
+        old_ids = set(old["playlist"]["gameIds"]) if old is not None and old["playlist"] is not None else set()
+        new_ids = set(entry["playlist"]["gameIds"]) if entry is not None and entry["playlist"] is not None else set()
+        if old is not None:
+            self._forget_banner(old["playlist"])
+        referenced, unreferenced = set(), set()
+        for game_id in new_ids - old_ids:
+            files = self._by_game.setdefault(game_id, set())
+            if not files:
+                referenced.add(game_id)
+            files.add(filename)
+        for game_id in old_ids - new_ids:
+            files = self._by_game[game_id]
+            files.discard(filename)
+            if not files:
+                del self._by_game[game_id]
+                unreferenced.add(game_id)
+        if old_ids != new_ids:
+            self.membership_generation += 1
+            self._membership_changes.append((self.membership_generation, referenced, unreferenced, old_ids ^ new_ids))
+
+    def membership_since(self, generation):
+        """Returns (membership generation, referenced, unreferenced) for the changes after `generation`.
+
+        `referenced` holds the game IDs that are now in some playlist and were in none before,
+        `unreferenced` the IDs no playlist lists anymore. When `generation` is None or too old,
+        `referenced` is every game ID listed by a playlist and `unreferenced` is None.
+        """
+        with self._lock:
+            self.refresh()
+            oldest = self._membership_changes[0][0] if self._membership_changes else self.membership_generation + 1
+            if generation is None or generation > self.membership_generation or generation < oldest - 1:
+                return self.membership_generation, set(self._by_game), None
+            referenced, unreferenced = set(), set()
+            for change_generation, now_referenced, now_unreferenced, _ in self._membership_changes:
+                if change_generation > generation:
+                    referenced = (referenced - now_unreferenced) | now_referenced
+                    unreferenced = (unreferenced - now_referenced) | now_unreferenced
+            return self.membership_generation, referenced, unreferenced
+
+    def changed_since(self, generation):
+        """Returns (membership generation, IDs added to or removed from any playlist after `generation`).
+
+        The IDs are None when `generation` is None or too old, and every game has to be looked at again.
+        """
+        with self._lock:
+            self.refresh()
+            oldest = self._membership_changes[0][0] if self._membership_changes else self.membership_generation + 1
+            if generation is None or generation > self.membership_generation or generation < oldest - 1:
+                return self.membership_generation, None
+            changed = set()
+            for change_generation, _, _, game_ids in self._membership_changes:
+                if change_generation > generation:
+                    changed.update(game_ids)
+            return self.membership_generation, changed
+
+    def get_game_playlists(self, game_id):
+        """Returns the names of the playlists listing `game_id`, sorted, from the reverse index."""
+        with self._lock:
+            self.refresh()
+            files = self._by_game.get(game_id, ())
+            return sorted(self._files[filename]["playlist"]["name"] for filename in files)
+
+    def find_dangling(self, known_ids):
+        """Returns {playlist name: sorted game IDs} for the listed IDs that are not in `known_ids`.
+
+        Computed as a set difference over the reverse index; no playlist file is parsed.
+        """
+        with self._lock:
+            self.refresh()
+            dangling = {}
+            for game_id in self._by_game.keys() - known_ids:
+                for filename in self._by_game[game_id]:
+                    dangling.setdefault(self._files[filename]["playlist"]["name"], []).append(game_id)
+            return {name: sorted(game_ids) for name, game_ids in sorted(dangling.items())}
+
+    def referenced_ids(self, game_ids=None, exclude=()):
+        """Returns the set of game IDs listed by at least one playlist.
+
+        `game_ids` limits the answer to those IDs, and the playlists named in `exclude` do not count.
+        """
+        with self._lock:
+            self.refresh()
+            excluded = {self._by_name[name] for name in exclude if name in self._by_name}
+            if not excluded:
+                return set(self._by_game) if game_ids is None else {g for g in game_ids if g in self._by_game}
+            candidates = self._by_game if game_ids is None else game_ids
+            return {g for g in candidates if not self._by_game.get(g, excluded) <= excluded}
+
+    def _index_names(self):
+        by_name = {}
+        for filename in sorted(self._files):
+            playlist = self._files[filename]["playlist"]
+            if playlist is None:
+                continue
+            if playlist["name"] in by_name:
+                log(f"Playlist name '{playlist['name']}' is used by both {by_name[playlist['name']]} and {filename}; using {by_name[playlist['name']]}", level=logging.WARNING)
+                continue
+            by_name[playlist["name"]] = filename
+        self._by_name = by_name
+
+    def find_file(self, name):
+        """Returns the path of the playlist file whose <Name> is `name`, or None. Opens no file."""
+        with self._lock:
+            self.refresh()
+            filename = self._by_name.get(name)
+            return os.path.join(self.playlists_path, filename) if filename is not None else None
+
+    def get_playlist(self, name):
+        """Returns the cached {"name", "gameIds", "game_count"} of the playlist named `name`, or None."""
+        with self._lock:
+            self.refresh()
+            filename = self._by_name.get(name)
+            return dict(self._files[filename]["playlist"]) if filename is not None else None
+
+    def append_games(self, name, game_ids):
+        """Adds the game IDs that are not in the playlist named `name` yet to the end of its file.
+
+        Only the new <PlaylistGame> blocks are written, inserted into the file's existing bytes,
+        and the file is replaced atomically. Returns the IDs added, or None without such a playlist.
+        """
+        with self._lock:
+            self.refresh()
+            filename = self._by_name.get(name)
+            if filename is None:
+                return None
+            path = os.path.join(self.playlists_path, filename)
+            entry = self._files[filename]
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+            if (st.st_size, st.st_mtime_ns) != entry["stat"]:
+                # Changed since the refresh: take the current IDs from the bytes just read
+                root, repaired = parse_playlist_bytes(data)
+                entry = {"stat": None, "playlist": playlist_from_root(root), "needs_repair": repaired is not None, "error": None}
+                if entry["playlist"] is None:
+                    raise ValueError(f"No <Playlist> element in {filename}")
+
+            existing_ids = set(entry["playlist"]["gameIds"])
+            added = []
+            for game_id in game_ids:
+                if game_id not in existing_ids:
+                    added.append(game_id)
+                    existing_ids.add(game_id)
+            if not added:
+                return added
+
+            write_playlist_file(path, append_playlist_games(data, added))
+            st = os.stat(path)
+            game_ids = entry["playlist"]["gameIds"] + added
+            playlist = dict(entry["playlist"], gameIds=game_ids, game_count=len(game_ids))
+            self._set_entry(filename, dict(entry, stat=(st.st_size, st.st_mtime_ns), playlist=playlist))
+            return added
+
+    def _new_filename(self, name, taken):
+        filename, suffix = playlist_filename(name), 2
+        base = filename[:-len(".xml")]
+        while filename in taken or filename in self._files or os.path.exists(os.path.join(self.playlists_path, filename)):
+            filename, suffix = f"{base} ({suffix}).xml", suffix + 1
+        return filename
+
+    def apply_batch(self, operations):
+        """Applies a list of playlist operations, reading and writing each touched file once.
+
+        Operations are dicts with "op" (see BATCH_OPERATIONS) and "playlist", plus "games" for
+        add/remove (and optionally create) and "new_name" for rename. They run in order, so later
+        operations see the names created or renamed by earlier ones. Every file is all-or-nothing:
+        when one operation on a file fails, none of that file's operations are written and the
+        others are reported as "rolled_back". Returns one result dict per operation.
+        """
+        with self._lock:
+            self.refresh()
+            names = dict(self._by_name)  # Playlist names as of the operations applied so far
+            files = {}  # filename -> {"edit": PlaylistEdit, "ops": [positions], "failed", "created", "deleted"}
+            results = []
+
+            def touch(filename, create_name=None):
+                if filename not in files:
+                    if create_name is not None:
+                        edit = PlaylistEdit(new_playlist_bytes(create_name))
+                        edit.changed = True
+                    else:
+                        with open(os.path.join(self.playlists_path, filename), "rb") as f:
+                            edit = PlaylistEdit(f.read())
+                    files[filename] = {"edit": edit, "ops": [], "failed": False,
+                                       "created": create_name is not None, "deleted": False}
+                return files[filename]
+
+            for position, operation in enumerate(operations):
+                result = {"op": operation.get("op") if isinstance(operation, dict) else None}
+                results.append(result)
+                state = None
+                # The existing file the operation names, resolved first so a failed validation still rolls it back
+                name = operation.get("playlist") if isinstance(operation, dict) else None
+                target = names.get(name) if isinstance(name, str) else None
+                try:
+                    if not isinstance(operation, dict) or operation.get("op") not in BATCH_OPERATIONS:
+                        raise ValueError(f"op must be one of {', '.join(BATCH_OPERATIONS)}")
+                    op, name = operation["op"], operation.get("playlist")
+                    result["playlist"] = name
+                    if not isinstance(name, str) or not name:
+                        raise ValueError("playlist must be a non-empty string")
+                    game_ids = operation.get("games", [])
+                    if not isinstance(game_ids, list) or not all(isinstance(g, str) and g for g in game_ids):
+                        raise ValueError("games must be a list of game IDs")
+
+                    if op == "create":
+                        if name in names:
+                            raise ValueError(f"Playlist '{name}' already exists")
+                        filename = self._new_filename(name, files)
+                        state = touch(filename, create_name=name)
+                        names[name] = filename
+                        result["file"] = filename
+                        result["added"] = len(state["edit"].add(game_ids))
+                    else:
+                        filename = names.get(name)
+                        if filename is None:
+                            raise KeyError(f"Playlist '{name}' not found")
+                        if op == "delete" and filename not in files:
+                            # Deleting needs no read: the file is removed even if it does not parse
+                            files[filename] = {"edit": None, "ops": [], "failed": False, "created": False, "deleted": False}
+                        try:
+                            state = touch(filename)
+                        except Exception:
+                            state = files[filename] = {"edit": None, "ops": [], "failed": True, "created": False, "deleted": False}
+                            raise
+                        edit = state["edit"]
+                        if edit is None and op != "delete":
+                            raise ValueError(f"Playlist file {filename} could not be read")
+                        if op == "add":
+                            result["added"] = len(edit.add(game_ids))
+                        elif op == "remove":
+                            result["removed"] = len(edit.remove(game_ids))
+                        elif op == "delete":
+                            state["deleted"] = True
+                            del names[name]
+                        else:
+                            new_name = operation.get("new_name")
+                            if not isinstance(new_name, str) or not new_name:
+                                raise ValueError("new_name must be a non-empty string")
+                            if new_name != name and new_name in names:
+                                raise ValueError(f"Playlist '{new_name}' already exists")
+                            edit.rename(new_name)
+                            del names[name]
+                            names[new_name] = filename
+                    result["status"] = "ok"
+                except (KeyError, ValueError, OSError, ET.ParseError) as e:
+                    result["status"] = "error"
+                    result["message"] = e.args[0] if isinstance(e, KeyError) else str(e)
+                    if state is None and target is not None:
+                        try:
+                            state = touch(target)
+                        except Exception:
+                            state = files[target] = {"edit": None, "ops": [], "failed": True, "created": False, "deleted": False}
+                    if state is not None:
+                        state["failed"] = True
+                if state is not None:
+                    state["ops"].append(position)
+
+            # A rolled-back file keeps its name, which a create or rename on another file may have
+            # reused; such a file is rolled back too (which can free or keep further names)
+            while True:
+                taken = {}
+                for filename, entry in self._files.items():
+                    if entry["playlist"] is not None and (filename not in files or files[filename]["failed"]):
+                        taken.setdefault(entry["playlist"]["name"], filename)
+                conflict = next(((filename, state) for filename, state in sorted(files.items())
+                                 if not state["failed"] and not state["deleted"] and state["edit"] is not None
+                                 and taken.get(state["edit"].name, filename) != filename), None)
+                if conflict is None:
+                    break
+                filename, state = conflict
+                state["failed"] = True
+                message = f"Playlist '{state['edit'].name}' is still used by {taken[state['edit'].name]}, whose operations were rolled back"
+                for position in state["ops"]:
+                    if results[position]["status"] == "ok" and results[position]["op"] in ("create", "rename"):
+                        results[position].update(status="error", message=message)
+
+            for filename, state in sorted(files.items()):
+                path = os.path.join(self.playlists_path, filename)
+                if not state["failed"]:
+                    try:
+                        if state["deleted"]:
+                            if not state["created"]:
+                                os.remove(path)
+                            self._set_entry(filename, None)
+                        elif state["edit"].changed:
+                            data = state["edit"].to_bytes()
+                            write_playlist_file(path, data)
+                            st = os.stat(path)
+                            self._set_entry(filename, {"stat": (st.st_size, st.st_mtime_ns),
+                                                       "playlist": playlist_from_root(state["edit"].root),
+                                                       "needs_repair": REPAIR_MARKER in data, "error": None})
+                        continue
+                    except OSError as e:
+                        log(f"Failed to write playlist {filename}: {e}", level=logging.ERROR)
+                        for position in state["ops"]:
+                            results[position].update(status="error", message=str(e))
+                for position in state["ops"]:
+                    if results[position]["status"] == "ok":
+                        results[position]["status"] = "rolled_back"
+            self._index_names()
+            return results
+
+    def _forget_banner(self, playlist):
+        if playlist is not None:
+            self._banners.pop(playlist["name"], None)
+
+    def _banner(self, name):
+        if name not in self._banners:
+            path = banner_path(self.images_path, name)
+            self._banners[name] = path if os.path.exists(path) else None
+        return self._banners[name]
+
+    def get_playlists(self):
+        """Returns the playlists as {"name", "gameIds", "game_count"[, "bannerImagePath"]} dicts, by file name.
+
+        The dicts are fresh on every call; the gameIds lists are shared and must not be mutated.
+        """
+        with self._lock:
+            self.refresh()
+            playlists = []
+            for filename in sorted(self._files):
+                playlist = self._files[filename]["playlist"]
+                if playlist is None:
+                    continue
+                playlist = dict(playlist)
+                banner = self._banner(playlist["name"])
+                if banner is not None:
+                    playlist["bannerImagePath"] = banner
+                playlists.append(playlist)
+            return playlists
+
+    def get_repair_status(self):
+        """Returns {"pending", "unparseable"}: the files repair() would rewrite and those it cannot fix."""
+        with self._lock:
+            self.refresh()
+            return {
+                "pending": sorted(f for f, entry in self._files.items() if entry["needs_repair"]),
+                "unparseable": [{"file": f, "error": entry["error"]} for f, entry in sorted(self._files.items()) if entry["error"]],
+            }
+
+    def repair(self):
+        """Rewrites every malformed playlist file with its repaired, pretty-printed content.
+
+        Each file is re-read and re-checked right before the atomic write, so edits made since
+        the last refresh are not lost. Returns {"checked", "repaired", "failed", "unparseable"}.
+        """
+        with self._lock:
+            self.refresh()
+            report = {"checked": len(self._files), "repaired": [], "failed": [], "unparseable": []}
+            for filename, entry in sorted(self._files.items()):
+                if entry["error"]:
+                    report["unparseable"].append({"file": filename, "error": entry["error"]})
+                if not entry["needs_repair"]:
+                    continue
+                path = os.path.join(self.playlists_path, filename)
+                try:
+                    with open(path, "rb") as f:
+                        root, repaired = parse_playlist_bytes(f.read())
+                    if repaired is None:
+                        continue  # Fixed by someone else; the next refresh reads it again
+                    write_playlist_file(path, repaired)
+                    st = os.stat(path)
+                except (OSError, ET.ParseError) as e:
+                    log(f"Failed to repair playlist {filename}: {e}", level=logging.ERROR)
+                    report["failed"].append({"file": filename, "error": str(e)})
+                    continue
+                self._set_entry(filename, {"stat": (st.st_size, st.st_mtime_ns), "playlist": playlist_from_root(root),
+                                           "needs_repair": False, "error": None})
+                report["repaired"].append(filename)
+                log(f"Successfully repaired and pretty-printed {filename}.")
+            return report
+
+    def start_repair_job(self, interval=PLAYLIST_REPAIR_INTERVAL):
+        """Runs repair() now and then every `interval` seconds in a daemon thread."""
+        def run_forever():
+            while True:
+                try:
+                    report = self.repair()
+                    if report["repaired"] or report["failed"]:
+                        log(f"Playlist repair: {len(report['repaired'])} repaired, {len(report['failed'])} failed")
+                except Exception as e:
+                    log(f"Playlist repair failed: {e}", level=logging.ERROR)
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run_forever, name="playlist-repair", daemon=True)
+        thread.start()
+        return thread
+
+    def banner_changed(self):
+        """Drops the cached banner lookups after the agent added or replaced a playlist banner."""
+        with self._lock:
+            self.banner_changes += 1
+            self._banners = {}
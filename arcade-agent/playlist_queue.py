@@ -0,0 +1,127 @@
+import time
+import threading
+import logging
+
+# Seconds an add waits for more adds to the same playlist before it is written
+PLAYLIST_WRITE_DELAY = 0.5
+# Seconds before queued games whose write failed are tried again
+PLAYLIST_RETRY_DELAY = 30
+
+
+# --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
+def log(msg, level=logging.INFO):
+    logging.log(level, msg)
+
+
+class PlaylistWriteQueue:
+    """Coalesces the games added to a playlist within PLAYLIST_WRITE_DELAY into one write.
+
+    add_games() answers right away from the cached playlist plus the adds still queued for it,
+    and a background thread appends the queued games with one PlaylistCatalog.append_games()
+    call per playlist once the delay is over. flush() writes everything queued immediately;
+    it is called before other playlist changes, before BigBox starts and at shutdown.
+
+    When a write fails, its games stay queued and are tried again after `retry_delay`; the
+    error is kept per playlist (see get_errors()) until a write of that playlist succeeds or its
+    games are dropped because the playlist no longer exists.
+    """
+
+    def __init__(self, catalog, delay=PLAYLIST_WRITE_DELAY, retry_delay=PLAYLIST_RETRY_DELAY):
+        self.catalog = catalog
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self._pending = {}  # playlist name -> game IDs waiting to be written, in order
+        self._deadline = None  # When the oldest queued add is due
+        self.version = 0  # Bumped whenever games are queued, so ETags cover the queued adds
+        self._errors = {}  # playlist name -> error of its last failed write
+        self._flush_lock = threading.Lock()  # Serializes flushes, so writes stay in queue order
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def add_games(self, name, game_ids):
+        """Queues the game IDs not in the playlist yet. Returns the IDs queued, or None without such a playlist."""
+        playlist = self.catalog.get_playlist(name)
+        if playlist is None:
+            return None
+        with self._cond:
+            pending = self._pending.get(name, [])
+            known_ids = set(playlist["gameIds"]).union(pending)
+            queued = []
+            for game_id in game_ids:
+                if game_id not in known_ids:
+                    queued.append(game_id)
+                    known_ids.add(game_id)
+            if queued:
+                self._pending[name] = pending + queued
+                self.version += 1
+                if self._deadline is None:
+                    self._deadline = time.monotonic() + self.delay
+                self._start()
+                self._cond.notify()
+            return queued
+
+    def pending_games(self):
+        """Returns {playlist name: game IDs queued for it}."""
+        with self._cond:
+            return {name: list(game_ids) for name, game_ids in self._pending.items()}
+
+    def get_errors(self):
+        """Returns {playlist name: error} for the playlists whose last queued write failed."""
+        with self._cond:
+            return dict(self._errors)
+
+    def flush(self):
+        """Writes every queued add now, one append per playlist.
+
+        Returns ({playlist name: IDs written}, {playlist name: error}). Games whose write failed
+        are queued again; those of a playlist that no longer exists are dropped.
+        """
+        with self._flush_lock:
+            with self._cond:
+                pending, self._pending, self._deadline = self._pending, {}, None
+            written, failed, retry = {}, {}, {}
+            for name, game_ids in pending.items():
+                try:
+                    added = self.catalog.append_games(name, game_ids)
+                except Exception as e:
+                    log(f"Failed to write {len(game_ids)} queued games to playlist '{name}', retrying in {self.retry_delay}s: {e}", level=logging.ERROR)
+                    failed[name] = str(e)
+                    retry[name] = game_ids
+                    continue
+                if added is None:
+                    log(f"Playlist '{name}' disappeared before {len(game_ids)} queued games were written", level=logging.WARNING)
+                    failed[name] = "Playlist not found"
+                    continue
+                written[name] = added
+            with self._cond:
+                errors = dict(self._errors)
+                # Only writes that are retried keep an error; the games of a missing playlist are dropped
+                for name in pending:
+                    if name not in retry:
+                        self._errors.pop(name, None)
+                self._errors.update((name, failed[name]) for name in retry)
+                if self._errors != errors:
+                    self.version += 1  # The playlists response reports the write errors
+                for name, game_ids in retry.items():
+                    # Ahead of the games queued while this flush was writing
+                    queued = set(game_ids)
+                    self._pending[name] = game_ids + [g for g in self._pending.get(name, []) if g not in queued]
+                if retry:
+                    retry_at = time.monotonic() + self.retry_delay
+                    self._deadline = retry_at if self._deadline is None else max(self._deadline, retry_at)
+                    self._cond.notify()
+            if written:
+                log(f"Flushed queued playlist adds: {', '.join(f'{name} (+{len(ids)})' for name, ids in written.items())}")
+            return written, failed
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="playlist-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._deadline is None or time.monotonic() < self._deadline:
+                    self._cond.wait(None if self._deadline is None else self._deadline - time.monotonic())
+            self.flush()
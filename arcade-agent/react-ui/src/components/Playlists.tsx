@@ -84,9 +84,12 @@ const Playlists: React.FC = () => {
                 const errorData = await response.json().catch(() => ({}));
                 throw new Error(`HTTP error ${response.status}: ${errorData.error || response.statusText}`);
             }
-            const gamesData: Game[] = await response.json();
-            setPlaylistGames(gamesData);
-            console.log("Received games:", gamesData);
+            const data: { games: Game[]; missing: string[] } = await response.json();
+            setPlaylistGames(data.games);
+            console.log("Received games:", data.games);
+            if (data.missing.length > 0) {
+                console.warn(`${data.missing.length} game IDs in playlist not found:`, data.missing);
+            }
         } catch (err) {
             console.error("Error fetching playlist game details:", err);
             setErrorGames(err instanceof Error ? err.message : 'An unknown error occurred');
@@ -0,0 +1,227 @@
+import os
+import stat
+import json
+import time
+import zlib
+import bisect
+import hashlib
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Bytes read (and hashed) at a time; hashlib and zlib release the GIL for buffers this large
+HASH_CHUNK_SIZE = 1 << 20
+# Threads hashing files in parallel
+ROM_HASH_WORKERS = 2
+# Read rate cap in bytes per second shared by all hashing threads (0 = unlimited)
+ROM_HASH_RATE_LIMIT = 20 * 2**20
+# Seconds between two hashing runs of the background job
+ROM_HASH_INTERVAL = 6 * 3600
+
+
+# --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
+def log(msg, level=logging.INFO):
+    logging.log(level, msg)
+
+
+class RateLimiter:
+    """Caps the combined rate of consume() calls from several threads to `rate` units per second."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._available_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._available_at)
+            self._available_at = start + amount / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+
+def hash_file(path, limiter=None, chunk_size=HASH_CHUNK_SIZE):
+    """Returns (size, crc32 as 8 hex digits, sha1 hex digest) of a file, reading it in chunks."""
+    crc = 0
+    sha1 = hashlib.sha1()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            if limiter is not None:
+                limiter.consume(len(chunk))
+            crc = zlib.crc32(chunk, crc)
+            sha1.update(chunk)
+            size += len(chunk)
+    return size, f"{crc:08x}", sha1.hexdigest()
+
+
+class RomHasher:
+    """Computes CRC32/SHA1 checksums of the catalog's ROM files, hashing each file only once.
+
+    Checksums are cached by (path, size, mtime_ns) in an append-only JSON lines file, so
+    a run only hashes new or changed files and survives agent restarts. The cache file is
+    compacted after each run.
+    """
+
+    def __init__(self, cache_path, resolve, workers=ROM_HASH_WORKERS, rate_limit=ROM_HASH_RATE_LIMIT):
+        self.cache_path = cache_path
+        self.resolve = resolve  # ApplicationPath -> absolute file path, or None (see RomVerifier.resolve)
+        self.workers = workers
+        self.limiter = RateLimiter(rate_limit)
+        self._entries = {}  # absolute path -> {"size", "mtime_ns", "crc32", "sha1"}
+        self._game_ids = {}  # absolute path -> IDs of the games using it, as of the last run
+        self._paths = []  # Sorted paths of the last run that have a checksum, for paging
+        self._cache_lines = 0  # Lines in the cache file, including superseded ones
+        self._progress = {"running": False}
+        self._lock = threading.Lock()
+
+    def load_cache(self):
+        """Loads the checksums of previous runs. Returns the number of cached files."""
+        entries = {}
+        lines = 0
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        entries[entry.pop("path")] = entry
+                        lines += 1
+                    except (ValueError, KeyError, AttributeError):
+                        continue  # A line cut short by a crash; the file gets hashed again
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            log(f"Could not read ROM hash cache {self.cache_path}: {e}", level=logging.WARNING)
+        with self._lock:
+            self._entries = entries
+            self._cache_lines = lines
+            self._paths = sorted(entries)
+        log(f"Loaded {len(entries)} cached ROM checksums from {self.cache_path}")
+        return len(entries)
+
+    def _append_to_cache(self, cache_file, path, entry):
+        with self._lock:
+            self._entries[path] = entry
+            cache_file.write(json.dumps(dict(entry, path=path)) + "\n")
+            cache_file.flush()
+            self._cache_lines += 1
+
+    def _compact_cache(self, live_paths):
+        """Rewrites the cache file with one line per file still used by the catalog. Callers hold _lock."""
+        self._entries = {path: self._entries[path] for path in live_paths if path in self._entries}
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for path, entry in self._entries.items():
+                f.write(json.dumps(dict(entry, path=path)) + "\n")
+        os.replace(tmp_path, self.cache_path)
+        self._cache_lines = len(self._entries)
+
+    def _hash_one(self, path, stats, cache_file):
+        size, mtime_ns = stats
+        try:
+            hashed_size, crc32, sha1 = hash_file(path, self.limiter)
+        except OSError as e:
+            log(f"Could not hash ROM {path}: {e}", level=logging.WARNING)
+            with self._lock:
+                self._progress["errors"] += 1
+            return
+        # A file that changed while being read gets hashed again by the next run
+        self._append_to_cache(cache_file, path, {"size": hashed_size, "mtime_ns": mtime_ns, "crc32": crc32, "sha1": sha1})
+        with self._lock:
+            self._progress["files_done"] += 1
+            self._progress["bytes_done"] += hashed_size
+
+    def run(self, games):
+        """Hashes the ROM files of `games` that are not cached yet. Returns the progress of the run."""
+        with self._lock:
+            if self._progress["running"]:
+                return None
+            self._progress = {"running": True, "started_at": time.time(), "finished_at": None, "files_total": 0,
+                              "files_cached": 0, "files_done": 0, "bytes_total": 0, "bytes_done": 0, "errors": 0}
+        try:
+            game_ids = {}
+            for game in games:
+                path = self.resolve(game.path) if game.id else None
+                if path is not None:
+                    game_ids.setdefault(path, []).append(game.id)
+
+            to_hash = []
+            cached = 0
+            for path in game_ids:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue  # Missing ROMs are reported by the ROM check
+                if not stat.S_ISREG(st.st_mode):
+                    continue
+                entry = self._entries.get(path)
+                if entry is not None and (entry["size"], entry["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                    cached += 1
+                else:
+                    to_hash.append((path, (st.st_size, st.st_mtime_ns)))
+            with self._lock:
+                self._progress.update(files_total=len(to_hash), files_cached=cached,
+                                      bytes_total=sum(stats[0] for _, stats in to_hash))
+                self._game_ids = game_ids
+            log(f"ROM hashing: {len(to_hash)} files to hash, {cached} unchanged files cached")
+
+            with open(self.cache_path, "a", encoding="utf-8") as cache_file, \
+                    ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for future in [pool.submit(self._hash_one, path, stats, cache_file) for path, stats in to_hash]:
+                    future.result()
+
+            with self._lock:
+                # Compacted and re-listed together, so get_page never sees a path whose entry was dropped
+                stale = self._entries.keys() - game_ids.keys()
+                if stale or self._cache_lines > len(self._entries):
+                    self._compact_cache(game_ids)
+                self._paths = sorted(path for path in game_ids if path in self._entries)
+                self._progress.update(running=False, finished_at=time.time())
+                progress = dict(self._progress)
+            log(f"ROM hashing finished: {progress['files_done']} files hashed, {progress['errors']} errors")
+            return progress
+        except Exception:
+            with self._lock:
+                self._progress.update(running=False, finished_at=time.time())
+            raise
+
+    def get_progress(self):
+        """Returns the progress of the current (or last) run, with the rate limit in bytes per second."""
+        with self._lock:
+            return dict(self._progress, rate_limit=self.limiter.rate)
+
+    def get_page(self, limit, after=None):
+        """Returns (checksum entries sorted by path, total) for the files after path `after`.
+
+        Each entry holds the path, size, crc32, sha1 and the IDs of the games using the file.
+        """
+        with self._lock:
+            paths = self._paths
+            start = bisect.bisect_right(paths, after) if after is not None else 0
+            page = []
+            for path in paths[start:start + limit]:
+                entry = self._entries[path]
+                page.append({"path": path, "size": entry["size"], "crc32": entry["crc32"], "sha1": entry["sha1"],
+                             "game_ids": self._game_ids.get(path, [])})
+            return page, len(paths)
+
+    def start(self, get_games, interval=ROM_HASH_INTERVAL):
+        """Loads the cache, then runs run(get_games()) now and every `interval` seconds in a daemon thread."""
+        def run_forever():
+            self.load_cache()
+            while True:
+                try:
+                    self.run(get_games())
+                except Exception as e:
+                    log(f"ROM hashing failed: {e}", level=logging.ERROR)
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run_forever, name="rom-hasher", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,137 @@
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads listing ROM folders in parallel (network shares and USB drives are latency bound)
+ROM_CHECK_WORKERS = 8
+# Seconds between two verification runs of the background job
+ROM_CHECK_INTERVAL = 300
+
+
+# --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
+def log(msg, level=logging.INFO):
+    logging.log(level, msg)
+
+
+class RomVerifier:
+    """Checks that the ApplicationPath of every game points at an existing file or folder.
+
+    Paths are grouped by folder and each folder is listed once instead of stat'ing every
+    file. Listings are cached with the folder's mtime, which changes whenever an entry is
+    added, removed or renamed in it, so later runs only re-list the folders that changed.
+    """
+
+    def __init__(self, launchbox_path, workers=ROM_CHECK_WORKERS):
+        self.launchbox_path = launchbox_path
+        self.workers = workers
+        self.generation = 0  # Bumped whenever the results change
+        self.running = False
+        self.last_run = None  # Statistics of the last completed run
+        self._results = {}  # game ID -> True/False
+        self._dir_cache = {}  # folder -> (mtime_ns, frozenset of normcased entry names)
+        self._lock = threading.Lock()
+
+    def resolve(self, app_path):
+        """Returns the absolute path an ApplicationPath points at, or None if it is not a file path."""
+        if not app_path or "://" in app_path:
+            return None  # No path, or a URL such as steam://rungameid/...
+        path = app_path.replace("\\", os.sep)
+        if not os.path.isabs(path):
+            # Relative ApplicationPaths are relative to the LaunchBox folder
+            path = os.path.join(self.launchbox_path, path)
+        return os.path.normpath(path)
+
+    def _list_directory(self, directory):
+        """Returns (mtime_ns, entry names, relisted) for a folder, or None if it cannot be read."""
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            return None, frozenset(), False  # Missing folder: every ROM in it is missing
+        except OSError as e:
+            log(f"Could not stat ROM folder {directory}: {e}", level=logging.WARNING)
+            return None
+        cached = self._dir_cache.get(directory)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[0], cached[1], False
+        try:
+            names = frozenset(os.path.normcase(name) for name in os.listdir(directory))
+        except OSError as e:
+            log(f"Could not list ROM folder {directory}: {e}", level=logging.WARNING)
+            return None
+        return mtime_ns, names, True
+
+    def verify(self, games):
+        """Checks the ROM of every game with an ID and a file ApplicationPath. Returns the run statistics."""
+        with self._lock:
+            if self.running:
+                return None
+            self.running = True
+        try:
+            start = time.monotonic()
+            by_directory = {}  # folder -> [(game ID, normcased file name)]
+            for game in games:
+                if not game.id:
+                    continue
+                full_path = self.resolve(game.path)
+                if full_path is None:
+                    continue
+                directory, name = os.path.split(full_path)
+                by_directory.setdefault(directory, []).append((game.id, os.path.normcase(name)))
+
+            directories = list(by_directory)
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                listings = list(pool.map(self._list_directory, directories))
+
+            results = {}
+            dir_cache = {}
+            relisted = 0
+            for directory, listing in zip(directories, listings):
+                if listing is None:
+                    continue  # Unreadable folder: leave its games unchecked
+                mtime_ns, names, was_relisted = listing
+                relisted += was_relisted
+                if mtime_ns is not None:
+                    dir_cache[directory] = (mtime_ns, names)
+                for game_id, name in by_directory[directory]:
+                    results[game_id] = name in names
+
+            missing = sum(1 for exists in results.values() if not exists)
+            stats = {
+                "finished_at": time.time(),
+                "duration": round(time.monotonic() - start, 3),
+                "games_checked": len(results),
+                "missing": missing,
+                "folders": len(directories),
+                "folders_relisted": relisted,
+            }
+            with self._lock:
+                if results != self._results:
+                    self.generation += 1
+                self._results = results
+                self._dir_cache = dir_cache
+                self.last_run = stats
+            log(f"ROM check: {missing} of {len(results)} ROMs missing, {relisted} of {len(directories)} folders re-listed in {stats['duration']} s")
+            return stats
+        finally:
+            with self._lock:
+                self.running = False
+
+    def rom_exists(self, game_id):
+        """True/False once the game's ROM was checked, None if it was not (yet) or has no file path."""
+        return self._results.get(game_id)
+
+    def start(self, get_games, interval=ROM_CHECK_INTERVAL):
+        """Runs verify(get_games()) now and then every `interval` seconds in a daemon thread."""
+        def run_forever():
+            while True:
+                try:
+                    self.verify(get_games())
+                except Exception as e:
+                    log(f"ROM check failed: {e}", level=logging.ERROR)
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run_forever, name="rom-verifier", daemon=True)
+        thread.start()
+        return thread
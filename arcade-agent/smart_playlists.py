@@ -0,0 +1,350 @@
+import os
+import re
+import json
+import time
+import logging
+import threading
+
+from facet_index import FacetIndex, FACETS, game_facet_values
+from game_catalog import sort_key
+
+# Seconds between two background updates of the smart playlists
+SMART_PLAYLIST_INTERVAL = 60
+
+# Criteria a smart playlist rule can combine; every criterion given has to match
+RULE_KEYS = ("platform", "title", "facets", "orphan")
+
+
+# --- Logging Setup (Assuming basic logging is configured in the main agent.py) ---
+def log(msg, level=logging.INFO):
+    logging.log(level, msg)
+
+
+def _values(value, what):
+    """Normalizes a rule value given as one string or a list of strings into a list."""
+    values = [value] if isinstance(value, str) else value
+    if not isinstance(values, list) or not values or not all(isinstance(v, str) and v for v in values):
+        raise ValueError(f"{what} must be a non-empty string or list of strings")
+    return values
+
+
+class SmartRule:
+    """A validated smart playlist rule.
+
+    `platform` and `facets` ({facet: values}, see FACETS) match values case-insensitively like
+    FacetIndex: any value of one facet, every facet given. `title` is a regular expression searched
+    in the title, ignoring case. `orphan` selects the games that no regular playlist lists (true)
+    or that some regular playlist lists (false). Raises ValueError for an invalid rule.
+    """
+
+    def __init__(self, rule):
+        if not isinstance(rule, dict):
+            raise ValueError("rule must be an object")
+        unknown = [key for key in rule if key not in RULE_KEYS]
+        if unknown:
+            raise ValueError(f"Unknown rule keys: {', '.join(unknown)}")
+        if not any(rule.get(key) is not None for key in RULE_KEYS):
+            raise ValueError(f"rule needs at least one of {', '.join(RULE_KEYS)}")
+        self.rule = rule
+
+        facets = rule.get("facets") or {}
+        if not isinstance(facets, dict):
+            raise ValueError("facets must be an object of facet -> values")
+        unknown = [facet for facet in facets if facet not in FACETS]
+        if unknown:
+            raise ValueError(f"Unknown facets: {', '.join(unknown)}")
+        self.filters = {facet: _values(values, f"facets.{facet}") for facet, values in facets.items()}
+        if rule.get("platform") is not None:
+            if "platform" in self.filters:
+                raise ValueError("Give the platform either as platform or as facets.platform")
+            self.filters["platform"] = _values(rule["platform"], "platform")
+        self._wanted = {facet: {v.casefold() for v in values} for facet, values in self.filters.items()}
+
+        title = rule.get("title")
+        if title is not None and not isinstance(title, str):
+            raise ValueError("title must be a regular expression string")
+        try:
+            self.title = re.compile(title, re.IGNORECASE) if title else None
+        except re.error as e:
+            raise ValueError(f"Invalid title regular expression: {e}")
+
+        self.orphan = rule.get("orphan")
+        if self.orphan is not None and not isinstance(self.orphan, bool):
+            raise ValueError("orphan must be true or false")
+
+    def matches_facets(self, game):
+        if not self._wanted:
+            return True
+        values = game_facet_values(game)
+        return all(any(v.casefold() in wanted for v in values[facet]) for facet, wanted in self._wanted.items())
+
+    def matches_rest(self, game, listed):
+        """Tests the title and orphan criteria; `listed` tells whether a regular playlist lists the game."""
+        if self.title is not None and not self.title.search(game.title):
+            return False
+        return self.orphan is None or self.orphan != listed
+
+    def matches(self, game, listed):
+        return self.matches_facets(game) and self.matches_rest(game, listed)
+
+
+class SmartPlaylists:
+    """Rule-based playlists kept in line with the game catalog and written as LaunchBox playlist files.
+
+    Rules are stored by playlist name in a JSON file. The first update() tests every game against
+    every rule, starting from the facet index posting lists. Later updates only test again the games
+    the catalog change log reports as added, removed or changed and, for rules on orphan status, the
+    games added to or removed from some playlist (see PlaylistCatalog.changed_since). Orphan status
+    comes from the playlist reverse index and ignores the smart playlists themselves.
+
+    Each playlist file is then brought in line with its matches through PlaylistCatalog.apply_batch(),
+    so a file is only rewritten, once and atomically, when entries have to be added or removed. The
+    agent owns the content of a smart playlist: entries added by hand that the rule does not match
+    are removed again. A rule is therefore only attached to an existing regular playlist when the
+    caller asks for it (see set_rule).
+    """
+
+    def __init__(self, rules_path, game_catalog, playlist_catalog):
+        self.rules_path = rules_path
+        self.game_catalog = game_catalog
+        self.playlist_catalog = playlist_catalog
+        self._rules = {}  # playlist name -> SmartRule
+        self._matches = {}  # playlist name -> set of the matching game IDs
+        self._catalog_generation = None  # GameCatalog generation the matches reflect; None before the first update
+        self._log_generation = None  # Change log generation the matches reflect
+        self._membership_generation = None  # Playlist membership generation the orphan tests reflect
+        self._lock = threading.RLock()
+
+    def load_rules(self):
+        """Loads the stored rules, skipping invalid ones. Returns the number of rules loaded."""
+        try:
+            with open(self.rules_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            stored = {}
+        except (OSError, ValueError) as e:
+            log(f"Could not read smart playlist rules {self.rules_path}: {e}", level=logging.ERROR)
+            stored = {}
+        rules = {}
+        for name, rule in (stored.items() if isinstance(stored, dict) else ()):
+            try:
+                rules[name] = SmartRule(rule)
+            except ValueError as e:
+                log(f"Skipping invalid smart playlist rule '{name}': {e}", level=logging.WARNING)
+        with self._lock:
+            self._rules = rules
+            self._matches = {}
+            self._catalog_generation = None
+        log(f"Loaded {len(rules)} smart playlist rules from {self.rules_path}")
+        return len(rules)
+
+    def _save_rules(self, rules):
+        tmp_path = f"{self.rules_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({name: rule.rule for name, rule in sorted(rules.items())}, f, indent=2)
+        os.replace(tmp_path, self.rules_path)
+
+    def get_rules(self):
+        """Returns [{"name", "rule", "game_count"}] sorted by name; game_count is None until evaluated."""
+        with self._lock:
+            return [{"name": name, "rule": rule.rule, "game_count": len(self._matches[name]) if name in self._matches else None}
+                    for name, rule in sorted(self._rules.items())]
+
+    def set_rule(self, name, rule, replace=False):
+        """Creates or replaces the rule of playlist `name` and writes the playlist.
+
+        Returns ({"name", "rule", "game_count", "added", "removed"}, error). A regular playlist
+        named `name` is only taken over with `replace`; otherwise the error is returned together
+        with {"name", "would_remove"}: the entries the rule would remove from it.
+        """
+        if not isinstance(name, str) or not name:
+            return None, "name must be a non-empty string"
+        try:
+            compiled = SmartRule(rule)
+        except ValueError as e:
+            return None, str(e)
+        with self._lock:
+            playlist = self.playlist_catalog.get_playlist(name)
+            if playlist is not None and name not in self._rules and not replace:
+                listed = self.playlist_catalog.referenced_ids(exclude=[*self._rules, name]) if compiled.orphan is not None else None
+                matches = self._evaluate_all(compiled, listed)
+                would_remove = [game_id for game_id in playlist["gameIds"] if game_id not in matches]
+                return {"name": name, "would_remove": would_remove}, (
+                    f"Playlist '{name}' is not a smart playlist; the rule would remove {len(would_remove)} of its "
+                    f"{len(playlist['gameIds'])} entries. Set replace to let the rule manage it.")
+            rules = dict(self._rules)
+            rules[name] = compiled
+            try:
+                self._save_rules(rules)
+            except OSError as e:
+                log(f"Failed to save smart playlist rules {self.rules_path}: {e}", level=logging.ERROR)
+                return None, f"Failed to save smart playlist rules: {e}"
+            self._rules = rules
+            if self._catalog_generation is not None:
+                # The other rules are up to date; only the new rule needs every game tested
+                self._matches[name] = self._evaluate_all(compiled)
+            written = self.update().get(name, {"added": 0, "removed": 0})
+            log(f"Smart playlist '{name}' now matches {len(self._matches[name])} games")
+            return {"name": name, "rule": compiled.rule, "game_count": len(self._matches[name]), **written}, None
+
+    def delete_rule(self, name):
+        """Forgets the rule of playlist `name`; the playlist file is kept as a regular playlist. Returns False without such a rule."""
+        with self._lock:
+            if name not in self._rules:
+                return False
+            rules = dict(self._rules)
+            del rules[name]
+            self._save_rules(rules)
+            self._rules = rules
+            self._matches.pop(name, None)
+            log(f"Removed the rule of smart playlist '{name}'")
+            return True
+
+    def apply_batch(self, operations):
+        """Applies playlist operations through PlaylistCatalog.apply_batch() and makes the rules follow them.
+
+        The rule of a smart playlist deleted by the batch is dropped and that of a renamed one moves
+        to the new name, under the same lock as update(), so a deleted or renamed smart playlist is
+        never written again under its old name. Returns the batch results.
+        """
+        with self._lock:
+            results = self.playlist_catalog.apply_batch(operations)
+            rules = dict(self._rules)
+            for operation, result in zip(operations, results):
+                if result["status"] != "ok" or result["playlist"] not in rules:
+                    continue
+                name = result["playlist"]
+                if result["op"] == "delete":
+                    del rules[name]
+                    self._matches.pop(name, None)
+                    log(f"Removed the rule of deleted smart playlist '{name}'")
+                elif result["op"] == "rename" and operation["new_name"] != name:
+                    new_name = operation["new_name"]
+                    rules[new_name] = rules.pop(name)
+                    if name in self._matches:
+                        self._matches[new_name] = self._matches.pop(name)
+                    log(f"Moved the rule of smart playlist '{name}' to '{new_name}'")
+            if rules.keys() != self._rules.keys():
+                self._rules = rules
+                self._save_rules(rules)
+            return results
+
+    def _evaluate_all(self, rule, listed=None):
+        """Returns the IDs of every catalog game matching `rule`, filtering by facets through the facet index."""
+        index = self.game_catalog.get_index("facets", FacetIndex)
+        positions = index.match(rule.filters)
+        games = index.games if positions is None else [index.games[p] for p in positions]
+        if rule.orphan is not None and listed is None:
+            listed = self.playlist_catalog.referenced_ids(exclude=self._rules)
+        return {game.id for game in games if game.id and rule.matches_rest(game, listed is not None and game.id in listed)}
+
+    def _retest(self, rules, game_ids):
+        """Tests the games `game_ids` again against the named rules; games no longer in the catalog drop out."""
+        found, missing = self.game_catalog.get_by_ids(sorted(game_ids))
+        listed = None
+        if any(self._rules[name].orphan is not None for name in rules):
+            listed = self.playlist_catalog.referenced_ids(game_ids=[game.id for game in found], exclude=self._rules)
+        for name in rules:
+            rule, matches = self._rules[name], self._matches[name]
+            matches.difference_update(missing)
+            for game in found:
+                if rule.matches(game, listed is not None and game.id in listed):
+                    matches.add(game.id)
+                else:
+                    matches.discard(game.id)
+
+    def _changed_games(self):
+        """Returns (catalog game IDs to test again, playlist member IDs to test again); None stands for every game."""
+        change_log = self.game_catalog.change_log
+        log_generation = change_log.generation if change_log is not None else None
+        generation = self.game_catalog.refresh()
+        catalog_ids = set()
+        if not self._catalog_generation:
+            # Not evaluated yet, or against the empty catalog before the first load (which the change log does not record)
+            catalog_ids = None
+        elif generation != self._catalog_generation:
+            changes = None
+            if change_log is not None:
+                changes, log_generation = change_log.since(self._log_generation)
+            if changes is None:
+                catalog_ids = None
+            else:
+                catalog_ids.update(change["id"] for change in changes if change["type"] == "game")
+        self._catalog_generation, self._log_generation = generation, log_generation
+        self._membership_generation, member_ids = self.playlist_catalog.changed_since(self._membership_generation)
+        return catalog_ids, member_ids
+
+    def update(self):
+        """Tests the games changed since the last update and rewrites the smart playlists that differ.
+
+        Returns {playlist name: {"added", "removed"}} for the playlists that were written.
+        """
+        with self._lock:
+            catalog_ids, member_ids = self._changed_games()
+            if not self._rules:
+                return {}
+            orphan_rules = [name for name, rule in self._rules.items() if rule.orphan is not None]
+            if catalog_ids is None or any(name not in self._matches for name in self._rules):
+                listed = self.playlist_catalog.referenced_ids(exclude=self._rules) if orphan_rules else None
+                for name, rule in self._rules.items():
+                    self._matches[name] = self._evaluate_all(rule, listed)
+                log(f"Evaluated {len(self._rules)} smart playlist rules against the whole catalog")
+            else:
+                if member_ids is None:
+                    listed = self.playlist_catalog.referenced_ids(exclude=self._rules)
+                    for name in orphan_rules:
+                        self._matches[name] = self._evaluate_all(self._rules[name], listed)
+                elif orphan_rules:
+                    catalog_ids = catalog_ids | member_ids
+                if catalog_ids:
+                    self._retest(list(self._rules), catalog_ids)
+                    log(f"Tested {len(catalog_ids)} changed games against {len(self._rules)} smart playlist rules", level=logging.DEBUG)
+            return self._write()
+
+    def _catalog_order(self, game_ids):
+        found, _ = self.game_catalog.get_by_ids(game_ids)
+        return [game.id for game in sorted(found, key=sort_key)]
+
+    def _write(self):
+        """Adds the missing matches to, and removes the other entries from, every smart playlist file."""
+        operations = []
+        for name in sorted(self._rules):
+            matches = self._matches[name]
+            playlist = self.playlist_catalog.get_playlist(name)
+            if playlist is None:
+                operations.append({"op": "create", "playlist": name, "games": self._catalog_order(matches)})
+                continue
+            current = set(playlist["gameIds"])
+            removed = [game_id for game_id in playlist["gameIds"] if game_id not in matches]
+            added = self._catalog_order(matches - current)
+            if removed:
+                operations.append({"op": "remove", "playlist": name, "games": removed})
+            if added:
+                operations.append({"op": "add", "playlist": name, "games": added})
+        if not operations:
+            return {}
+        written = {}
+        for result in self.playlist_catalog.apply_batch(operations):
+            if result["status"] != "ok":
+                log(f"Failed to update smart playlist '{result['playlist']}': {result.get('message', result['status'])}", level=logging.ERROR)
+                continue
+            counts = written.setdefault(result["playlist"], {"added": 0, "removed": 0})
+            counts["added"] += result.get("added", 0)
+            counts["removed"] += result.get("removed", 0)
+        for name, counts in written.items():
+            log(f"Smart playlist '{name}': {counts['added']} added, {counts['removed']} removed")
+        return written
+
+    def start(self, interval=SMART_PLAYLIST_INTERVAL):
+        """Runs update() now and then every `interval` seconds in a daemon thread."""
+        def run_forever():
+            while True:
+                try:
+                    self.update()
+                except Exception as e:
+                    log(f"Smart playlist update failed: {e}", level=logging.ERROR)
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run_forever, name="smart-playlists", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+# Assuming catalog_columns.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from catalog_columns import CatalogColumns, columns_available, prefer_columns
+from platform_reader import GameRecord
+
+GAMES = [
+    GameRecord("Asteroids", "a1", "Arcade", ""),
+    GameRecord("Mario", "n1", "Nintendo", ""),
+    GameRecord("No ID", "", "Arcade", ""),
+    GameRecord("Sonic", "s1", "Sega Genesis", ""),
+    GameRecord("Zaxxon", "a2", "Arcade", ""),
+]
+
+
+@unittest.skipUnless(columns_available(), "NumPy is not installed")
+class TestCatalogColumns(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = CatalogColumns(GAMES)
+
+    def ids(self, positions):
+        return [GAMES[p].id for p in positions]
+
+    def test_orphans_match_list_filter(self):
+        referenced = {"n1", "a2", "not-in-catalog"}
+        self.assertEqual(self.ids(self.columns.orphan_positions(referenced)), ["a1", "s1"])
+        self.assertEqual(self.ids(self.columns.orphan_positions(set())), ["a1", "n1", "s1", "a2"])
+
+    def test_hash_collisions_do_not_change_results(self):
+        # Force every ID onto the same hash, so only the exact ID comparison tells them apart
+        with patch("catalog_columns.hash", lambda value: 7, create=True):
+            columns = CatalogColumns(GAMES)
+            self.assertEqual(self.ids(columns.orphan_positions({"n1", "zzz"})), ["a1", "s1", "a2"])
+
+    def test_prefer_columns_only_for_small_id_sets(self):
+        self.assertTrue(prefer_columns(100, 100000))
+        self.assertFalse(prefer_columns(50000, 100000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import shutil
+
+# Assuming catalog_snapshot.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from catalog_snapshot import read_snapshot, write_snapshot, _HEADER, _FILE_ENTRY
+from game_catalog import GameCatalog, GAME_FIELDS
+from platform_reader import GameRecord
+from test_game_catalog import write_platform
+
+
+
+class TestCatalogSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.platforms_dir = os.path.join(self.work_dir, "Platforms")
+        os.mkdir(self.platforms_dir)
+        self.snapshot_path = os.path.join(self.work_dir, "game_catalog.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        files = {
+            "Arcade.xml": {"stat": (123, 456789), "games": [
+                GameRecord("Pac-Man", "a1", "Arcade", "roms\\pacman.zip", "Maze", "Namco", "Midway", "1980-05-22", "Arcade.xml", 5000000000, 812),
+                GameRecord("Café ☕", "a2", "Arcade", ""),
+            ]},
+            "Empty.xml": {"stat": (1, 2), "games": []},
+        }
+        write_snapshot(self.snapshot_path, self.platforms_dir, GAME_FIELDS, files)
+        restored = read_snapshot(self.snapshot_path, self.platforms_dir, GAME_FIELDS, GameRecord)
+        self.assertEqual(restored, files)
+        pacman = restored["Arcade.xml"]["games"][0]
+        self.assertEqual((pacman.source, pacman.offset, pacman.length), ("Arcade.xml", 5000000000, 812))
+
+    def test_rejects_other_folder_fields_and_corruption(self):
+        fields = ("title", "id", "platform", "path")
+        files = {"Arcade.xml": {"stat": (1, 2), "games": [GameRecord("A", "1", "Arcade", "")]}}
+        write_snapshot(self.snapshot_path, self.platforms_dir, fields, files)
+        self.assertIsNone(read_snapshot(self.snapshot_path, "/other/Platforms", fields, GameRecord))
+        self.assertIsNone(read_snapshot(self.snapshot_path, self.platforms_dir, GAME_FIELDS, GameRecord))
+
+        with open(self.snapshot_path, "r+b") as f:
+            f.truncate(os.path.getsize(self.snapshot_path) - 3)
+        self.assertIsNone(read_snapshot(self.snapshot_path, self.platforms_dir, fields, GameRecord))
+        self.assertIsNone(read_snapshot(os.path.join(self.work_dir, "missing"), self.platforms_dir, fields, GameRecord))
+
+    def test_out_of_range_references_fall_back_to_a_full_parse(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Asteroids", "a2")])
+        GameCatalog(self.platforms_dir, stat_check_interval=0, snapshot_path=self.snapshot_path).get_games()
+        with open(self.snapshot_path, "rb") as f:
+            data = bytearray(f.read())
+        column_count, file_count = _HEADER.unpack_from(data, 0)[2:4]
+        entries_pos = _HEADER.size + 4 + 4 * column_count
+        records_pos = entries_pos + _FILE_ENTRY.size * file_count
+        for position, value in ((records_pos, 999999), (entries_pos + _FILE_ENTRY.size - 4, 999999)):
+            corrupt = bytearray(data)
+            corrupt[position:position + 4] = value.to_bytes(4, "little")
+            with open(self.snapshot_path, "wb") as f:
+                f.write(corrupt)
+            restarted = GameCatalog(self.platforms_dir, stat_check_interval=0, snapshot_path=self.snapshot_path)
+            self.assertFalse(restarted.load_snapshot())
+            self.assertEqual([g.id for g in restarted.get_games()], ["a2", "a1"])
+
+    def test_catalog_serves_from_snapshot_without_parsing(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Asteroids", "a2")])
+        write_platform(os.path.join(self.platforms_dir, "Nintendo.xml"), [("Mario", "n1")])
+        first = GameCatalog(self.platforms_dir, stat_check_interval=0, snapshot_path=self.snapshot_path)
+        expected = first.get_games()
+        self.assertTrue(os.path.exists(self.snapshot_path))
+
+        restarted = GameCatalog(self.platforms_dir, stat_check_interval=0, snapshot_path=self.snapshot_path)
+        with patch('game_catalog.parse_platform_file') as mock_parse:
+            self.assertTrue(restarted.load_snapshot())
+            self.assertEqual(restarted.get_games(), expected)
+            mock_parse.assert_not_called()
+
+    def test_catalog_reparses_only_files_changed_since_snapshot(self):
+        arcade = os.path.join(self.platforms_dir, "Arcade.xml")
+        nintendo = os.path.join(self.platforms_dir, "Nintendo.xml")
+        write_platform(arcade, [("Zaxxon", "a1")], mtime=1000)
+        write_platform(nintendo, [("Mario", "n1")], mtime=1000)
+        GameCatalog(self.platforms_dir, stat_check_interval=0, snapshot_path=self.snapshot_path).get_games()
+
+        write_platform(nintendo, [("Mario", "n1"), ("Metroid", "n2")], mtime=2000)
+        restarted = GameCatalog(self.platforms_dir, stat_check_interval=0, snapshot_path=self.snapshot_path)
+        restarted.load_snapshot()
+        with patch('game_catalog.parse_platform_file', return_value=[
+            GameRecord("Mario", "n1", "Nintendo", ""),
+            GameRecord("Metroid", "n2", "Nintendo", ""),
+        ]) as mock_parse:
+            games = restarted.get_games()
+            mock_parse.assert_called_once_with(nintendo)
+        self.assertEqual([g.id for g in games], ["n1", "n2", "a1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+
+# Assuming change_log.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from change_log import ChangeLog, diff_games, diff_playlists
+from platform_reader import GameRecord
+
+
+class TestChangeLog(unittest.TestCase):
+
+    def test_since_returns_later_generations(self):
+        log = ChangeLog()
+        first = log.record([{"type": "game", "action": "added", "id": "a1"}])
+        self.assertEqual(log.record([]), first)
+        second = log.record([{"type": "game", "action": "removed", "id": "a1"}])
+        changes, generation = log.since(first)
+        self.assertEqual(generation, second)
+        self.assertEqual(changes, [{"type": "game", "action": "removed", "id": "a1", "generation": second}])
+        self.assertEqual(log.since(0)[0][0]["generation"], first)
+        self.assertEqual(log.since(second), ([], second))
+
+    def test_old_generations_age_out_whole(self):
+        log = ChangeLog(max_entries=3)
+        log.record([{"id": "1"}, {"id": "2"}])
+        second = log.record([{"id": "3"}, {"id": "4"}])
+        # Generation 1 was dropped to stay within 3 entries; both of its entries go together
+        self.assertEqual(log.since(0), (None, second))
+        self.assertEqual([c["id"] for c in log.since(1)[0]], ["3", "4"])
+        self.assertEqual(log.since(second + 1), (None, second))
+
+    def test_diff_games(self):
+        old = [GameRecord("A", "1", "Arcade", ""), GameRecord("B", "2", "Arcade", ""), GameRecord("No ID", "", "Arcade", "")]
+        new = [GameRecord("A", "1", "Arcade", ""), GameRecord("B", "2", "Arcade", "roms/b.zip"), GameRecord("C", "3", "Arcade", "")]
+        self.assertEqual(diff_games(old, new), [
+            {"type": "game", "action": "changed", "id": "2"},
+            {"type": "game", "action": "added", "id": "3"},
+        ])
+
+    def test_diff_playlists(self):
+        self.assertEqual(diff_playlists({"Old": {"1"}, "Fav": {"1", "2"}}, {"Fav": {"2", "3"}, "New": {"4"}}), [
+            {"type": "playlist_games", "action": "added", "name": "Fav", "ids": ["3"]},
+            {"type": "playlist_games", "action": "removed", "name": "Fav", "ids": ["1"]},
+            {"type": "playlist", "action": "added", "name": "New"},
+            {"type": "playlist_games", "action": "added", "name": "New", "ids": ["4"]},
+            {"type": "playlist", "action": "removed", "name": "Old"},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
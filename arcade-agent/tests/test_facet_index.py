@@ -0,0 +1,62 @@
+import unittest
+import os
+import sys
+
+# Assuming facet_index.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from facet_index import FacetIndex, game_facet_values
+from platform_reader import GameRecord
+
+
+def game(game_id, genre, developer, publisher, release_date, platform="Arcade"):
+    return GameRecord(game_id, game_id, platform, "", genre, developer, publisher, release_date)
+
+
+GAMES = [
+    game("sf2", "Fighting", "Capcom", "Capcom", "1991-02-06T00:00:00-05:00"),
+    game("sfa3", "Fighting; Action", "Capcom", "Capcom", "1998-06-29T00:00:00-04:00"),
+    game("mk", "Fighting", "Midway", "Midway", "1992-10-08T00:00:00-04:00"),
+    game("ff", "Beat 'em Up", "Capcom", "Capcom", "1989-12-01T00:00:00-05:00"),
+    game("pacman", "Maze", "Namco", "Midway", "1980-05-22T00:00:00-04:00"),
+    game("homebrew", "", "", "", "", platform="Nintendo"),
+]
+
+
+class TestFacetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FacetIndex(GAMES)
+
+    def ids(self, filters, limit=50):
+        games, total, _ = self.index.query(filters, limit=limit)
+        return [g.id for g in games], total
+
+    def test_facet_values(self):
+        values = game_facet_values(GAMES[1])
+        self.assertEqual(values["genre"], ["Fighting", "Action"])
+        self.assertEqual(values["year"], ["1998"])
+        self.assertEqual(values["decade"], ["1990s"])
+        self.assertEqual(game_facet_values(GAMES[5])["year"], [])
+
+    def test_and_across_facets_or_within_a_facet(self):
+        self.assertEqual(self.ids({"decade": ["1990s"], "developer": ["capcom"], "genre": ["Fighting"]}), (["sf2", "sfa3"], 2))
+        self.assertEqual(self.ids({"developer": ["Capcom", "Namco"], "decade": ["1980s"]}), (["ff", "pacman"], 2))
+        self.assertEqual(self.ids({"publisher": ["Unknown"]}), ([], 0))
+
+    def test_no_filters_returns_all_with_global_counts(self):
+        games, total, counts = self.index.query({}, limit=2)
+        self.assertEqual(total, 6)
+        self.assertEqual(len(games), 2)
+        self.assertEqual(counts["genre"], {"Fighting": 3, "Action": 1, "Beat 'em Up": 1, "Maze": 1})
+        self.assertEqual(counts["platform"], {"Arcade": 5, "Nintendo": 1})
+
+    def test_counts_follow_filters(self):
+        _, total, counts = self.index.query({"developer": ["Capcom"]})
+        self.assertEqual(total, 3)
+        self.assertEqual(counts["decade"], {"1990s": 2, "1980s": 1})
+        self.assertEqual(counts["publisher"], {"Capcom": 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import shutil
+import tracemalloc
+
+# Assuming game_catalog.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import game_catalog
+from game_catalog import GameCatalog
+
+
+def write_platform(path, games, mtime=None):
+    """Writes a minimal LaunchBox platform XML file containing (title, id) games."""
+    body = "".join(
+        f"  <Game>\n    <Title>{title}</Title>\n    <ID>{game_id}</ID>\n    <ApplicationPath>roms\\{game_id}.zip</ApplicationPath>\n  </Game>\n"
+        for title, game_id in games
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n{body}</LaunchBox>')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def write_large_platform(path, count):
+    """Writes a platform file whose games look like a real LaunchBox library (GUID IDs, ROM folders, metadata)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n')
+        for i in range(count):
+            f.write(
+                f"  <Game>\n    <Title>Some Arcade Game Title {i}</Title>\n    <ID>{i:08x}-06f5-421e-820b-69907f53bd29</ID>\n"
+                f"    <Platform>Arcade</Platform>\n    <ApplicationPath>..\\..\\Games\\Arcade\\Roms\\game{i}.zip</ApplicationPath>\n"
+                f"    <Genre>Fighting; Action</Genre>\n    <Developer>Developer {i % 50}</Developer>\n"
+                f"    <Publisher>Publisher {i % 20}</Publisher>\n    <ReleaseDate>19{80 + i % 20}-06-29T00:00:00-04:00</ReleaseDate>\n  </Game>\n"
+            )
+        f.write("</LaunchBox>")
+
+
+class TestGameCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.platforms_dir = tempfile.mkdtemp()
+        self.catalog = GameCatalog(self.platforms_dir, stat_check_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.platforms_dir, ignore_errors=True)
+
+    def test_merges_platforms_sorted_by_title(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Asteroids", "a2")])
+        write_platform(os.path.join(self.platforms_dir, "Nintendo.xml"), [("Mario", "n1")])
+        games = self.catalog.get_games()
+        self.assertEqual([g.title for g in games], ["Asteroids", "Mario", "Zaxxon"])
+        self.assertEqual(games[1].platform, "Nintendo")
+        self.assertEqual(self.catalog.generation, 1)
+
+    def test_only_changed_files_are_reparsed(self):
+        arcade = os.path.join(self.platforms_dir, "Arcade.xml")
+        nintendo = os.path.join(self.platforms_dir, "Nintendo.xml")
+        write_platform(arcade, [("Zaxxon", "a1")], mtime=1000)
+        write_platform(nintendo, [("Mario", "n1")], mtime=1000)
+        self.catalog.get_games()
+
+        with patch('game_catalog.parse_platform_file', wraps=game_catalog.parse_platform_file) as mock_parse:
+            self.catalog.get_games()
+            mock_parse.assert_not_called()
+            self.assertEqual(self.catalog.generation, 1)
+
+            write_platform(nintendo, [("Mario", "n1"), ("Metroid", "n2")], mtime=2000)
+            games = self.catalog.get_games()
+            mock_parse.assert_called_once_with(nintendo)
+        self.assertEqual(len(games), 3)
+        self.assertEqual(self.catalog.generation, 2)
+
+    def test_removed_file_drops_its_games(self):
+        arcade = os.path.join(self.platforms_dir, "Arcade.xml")
+        write_platform(arcade, [("Zaxxon", "a1")])
+        write_platform(os.path.join(self.platforms_dir, "Nintendo.xml"), [("Mario", "n1")])
+        self.assertEqual(len(self.catalog.get_games()), 2)
+        os.remove(arcade)
+        self.assertEqual([g.id for g in self.catalog.get_games()], ["n1"])
+        self.assertEqual(self.catalog.generation, 2)
+
+    def test_parse_error_is_isolated_to_one_file(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1")])
+        with open(os.path.join(self.platforms_dir, "Broken.xml"), "w") as f:
+            f.write("<LaunchBox><Game><Title>oops</Game>")
+        self.assertEqual([g.id for g in self.catalog.get_games()], ["a1"])
+
+    def test_parallel_parsing_matches_sequential(self):
+        for i in range(4):
+            write_platform(os.path.join(self.platforms_dir, f"Platform{i}.xml"), [(f"Game {i}", f"p{i}"), (f"Another {i}", f"q{i}")])
+        with open(os.path.join(self.platforms_dir, "Broken.xml"), "w") as f:
+            f.write("<LaunchBox><Game><Title>oops</Game>")
+        parallel = GameCatalog(self.platforms_dir, stat_check_interval=0, parse_workers=2)
+        self.assertEqual(parallel.get_games(), self.catalog.get_games())
+        self.assertEqual(len(parallel.get_games()), 8)
+
+    def test_stat_check_interval_skips_disk(self):
+        catalog = GameCatalog(self.platforms_dir, stat_check_interval=3600)
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1")])
+        catalog.get_games()
+        with patch('game_catalog.os.listdir') as mock_listdir:
+            catalog.get_games()
+            mock_listdir.assert_not_called()
+
+    def test_missing_platforms_path(self):
+        catalog = GameCatalog(os.path.join(self.platforms_dir, "missing"), stat_check_interval=0)
+        self.assertEqual(catalog.get_games(), [])
+
+
+    def test_memory_per_game_stays_within_budget(self):
+        # Dict-per-game storage took ~930 bytes per game on this data; records with interned strings and byte ranges take ~540
+        count = 20000
+        write_large_platform(os.path.join(self.platforms_dir, "Arcade.xml"), count)
+        tracemalloc.start()
+        try:
+            self.catalog.get_games()
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(retained / count, 600)
+        games = self.catalog.get_games()
+        self.assertIs(games[0].platform, games[1].platform)
+        self.assertEqual(games[0].path, "..\\..\\Games\\Arcade\\Roms\\game0.zip")
+
+
+if __name__ == '__main__':
+    unittest.main()
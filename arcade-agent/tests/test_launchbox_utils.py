@@ -0,0 +1,365 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import shutil
+import xml.etree.ElementTree as ET
+
+# Assuming launchbox_utils.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import launchbox_utils
+from game_catalog import GameCatalog
+from change_log import ChangeLog
+from rom_verifier import RomVerifier
+from playlist_catalog import PlaylistCatalog
+from playlist_queue import PlaylistWriteQueue
+from smart_playlists import SmartPlaylists
+from test_game_catalog import write_platform
+
+
+class LaunchBoxTestCase(unittest.TestCase):
+    """Points launchbox_utils at a temporary LaunchBox folder with a fresh catalog."""
+
+    def setUp(self):
+        self.launchbox_dir = tempfile.mkdtemp()
+        self.platforms_dir = os.path.join(self.launchbox_dir, "Data", "Platforms")
+        self.playlists_dir = os.path.join(self.launchbox_dir, "Data", "Playlists")
+        os.makedirs(self.platforms_dir)
+        os.makedirs(self.playlists_dir)
+        self.change_log = ChangeLog()
+        self.catalog = GameCatalog(self.platforms_dir, stat_check_interval=0, change_log=self.change_log)
+        self.rom_verifier = RomVerifier(self.launchbox_dir, workers=1)
+        self.playlist_catalog = PlaylistCatalog(self.playlists_dir, os.path.join(self.launchbox_dir, "Images", "Playlists"))
+        for patcher in (
+            patch.object(launchbox_utils, "LAUNCHBOX_PATH", self.launchbox_dir),
+            patch.object(launchbox_utils, "PLATFORMS_PATH", self.platforms_dir),
+            patch.object(launchbox_utils, "PLAYLISTS_PATH", self.playlists_dir),
+            patch.object(launchbox_utils, "GAME_CATALOG", self.catalog),
+            patch.object(launchbox_utils, "CHANGE_LOG", self.change_log),
+            patch.object(launchbox_utils, "ROM_VERIFIER", self.rom_verifier),
+            patch.object(launchbox_utils, "PLAYLIST_CATALOG", self.playlist_catalog),
+            # Queued adds are only written by explicit flushes in these tests
+            patch.object(launchbox_utils, "PLAYLIST_QUEUE", PlaylistWriteQueue(self.playlist_catalog, delay=3600)),
+            patch.object(launchbox_utils, "SMART_PLAYLISTS", SmartPlaylists(os.path.join(self.launchbox_dir, "smart_playlists.json"),
+                                                                            self.catalog, self.playlist_catalog)),
+            patch.object(launchbox_utils, "_synced_playlists", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.launchbox_dir, ignore_errors=True)
+
+    def write_playlist(self, filename, name, game_ids, mtime=None):
+        games = "".join(f"  <PlaylistGame>\n    <GameId>{gid}</GameId>\n  </PlaylistGame>\n" for gid in game_ids)
+        path = os.path.join(self.playlists_dir, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n  <Playlist>\n    <Name>{name}</Name>\n  </Playlist>\n{games}</LaunchBox>')
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+
+class TestGamesPage(LaunchBoxTestCase):
+
+    def setUp(self):
+        super().setUp()
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [(f"Arcade {i:02d}", f"a{i}") for i in range(7)])
+        write_platform(os.path.join(self.platforms_dir, "Nintendo.xml"), [(f"Nintendo {i:02d}", f"n{i}") for i in range(3)])
+
+    def collect(self, **kwargs):
+        ids, cursor = [], None
+        while True:
+            page, error = launchbox_utils.get_games_page(cursor=cursor, **kwargs)
+            self.assertIsNone(error)
+            ids.extend(g["id"] for g in page["games"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return ids, page
+
+    def test_pages_cover_catalog_in_order(self):
+        ids, last_page = self.collect(limit=3)
+        self.assertEqual(ids, [g["id"] for g in launchbox_utils.get_all_games()])
+        self.assertEqual(last_page["total"], 10)
+        self.assertEqual(len(last_page["games"]), 1)
+
+    def test_platform_filter_and_projection(self):
+        page, error = launchbox_utils.get_games_page(2, fields=["id", "title"], platform="Nintendo")
+        self.assertIsNone(error)
+        self.assertEqual(page["games"], [{"id": "n0", "title": "Nintendo 00"}, {"id": "n1", "title": "Nintendo 01"}])
+        self.assertEqual(page["total"], 3)
+        ids, _ = self.collect(limit=2, platform="Nintendo")
+        self.assertEqual(ids, ["n0", "n1", "n2"])
+
+    def test_cursor_survives_catalog_changes(self):
+        page, _ = launchbox_utils.get_games_page(2)
+        write_platform(os.path.join(self.platforms_dir, "Atari.xml"), [("AAA first", "t0")])
+        page, _ = launchbox_utils.get_games_page(2, cursor=page["next_cursor"])
+        self.assertEqual([g["id"] for g in page["games"]], ["a2", "a3"])
+
+    def test_invalid_arguments(self):
+        self.assertIsNotNone(launchbox_utils.get_games_page(0)[1])
+        self.assertIsNotNone(launchbox_utils.get_games_page(launchbox_utils.MAX_GAMES_PAGE_SIZE + 1)[1])
+        self.assertIsNotNone(launchbox_utils.get_games_page(10, fields=["title", "secret"])[1])
+        self.assertIsNotNone(launchbox_utils.get_games_page(10, cursor="not a cursor")[1])
+
+
+class TestGameIterators(LaunchBoxTestCase):
+
+    def setUp(self):
+        super().setUp()
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")])
+        write_platform(os.path.join(self.platforms_dir, "Nintendo.xml"), [("Mario", "n1")])
+        self.write_playlist("Favorites.xml", "Favorites", ["a2"])
+
+    def test_iter_games_filters_and_projects(self):
+        self.assertEqual(list(launchbox_utils.iter_games()), launchbox_utils.get_all_games())
+        self.assertEqual(list(launchbox_utils.iter_games(fields=["id"], platform="Arcade")), [{"id": "a2"}, {"id": "a1"}])
+
+    def test_iter_orphaned_games_matches_find(self):
+        orphans = list(launchbox_utils.iter_orphaned_games())
+        self.assertEqual([g["id"] for g in orphans], ["n1", "a1"])
+        self.assertEqual(launchbox_utils.find_orphaned_games(), orphans)
+
+    def test_orphans_follow_playlist_edits_incrementally(self):
+        self.assertEqual([g["id"] for g in launchbox_utils.iter_orphaned_games()], ["n1", "a1"])
+        launchbox_utils.add_games_to_playlist("Favorites", ["n1"])
+        launchbox_utils.flush_playlist_writes()
+        self.write_playlist("Shooters.xml", "Shooters", ["a1"], mtime=2000)
+        with patch('orphan_index.OrphanIndex.__init__') as mock_build:
+            self.assertEqual(list(launchbox_utils.iter_orphaned_games()), [])
+            mock_build.assert_not_called()
+        os.remove(os.path.join(self.playlists_dir, "Favorites.xml"))
+        self.assertEqual([g["id"] for g in launchbox_utils.iter_orphaned_games()], ["a2", "n1"])
+        self.assertEqual(launchbox_utils.get_game_playlists("a1"), {"id": "a1", "playlists": ["Shooters"]})
+
+
+class TestGameDetails(LaunchBoxTestCase):
+
+    def setUp(self):
+        super().setUp()
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")])
+
+    def test_lookup_reports_missing_ids(self):
+        result = launchbox_utils.get_game_details(["a2", "gone", "a1"])
+        self.assertEqual([g["title"] for g in result["games"]], ["Galaga", "Zaxxon"])
+        self.assertEqual(result["missing"], ["gone"])
+        self.assertEqual(launchbox_utils.get_game_details([]), {"games": [], "missing": []})
+
+    def test_lookup_does_not_scan_the_catalog(self):
+        launchbox_utils.get_game_details(["a1"])
+        with patch.object(self.catalog, "get_games") as mock_get_games:
+            launchbox_utils.get_game_details(["a1", "a2"])
+            mock_get_games.assert_not_called()
+
+
+class TestGameFull(LaunchBoxTestCase):
+
+    def write_full_platform(self, games, mtime):
+        body = "".join(f"  <Game>\n    <Title>{title}</Title>\n    <ID>{game_id}</ID>\n    <Notes>{notes}</Notes>\n  </Game>\n"
+                       for title, game_id, notes in games)
+        path = os.path.join(self.platforms_dir, "Arcade.xml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n{body}</LaunchBox>')
+        os.utime(path, (mtime, mtime))
+
+    def test_reads_only_the_game_slice(self):
+        self.write_full_platform([("Zaxxon", "a1", "Isometric"), ("Galaga", "a2", "Sequel to Galaxian")], mtime=1000)
+        self.catalog.get_games()
+        with patch('game_catalog.parse_platform_file') as mock_parse:
+            self.assertEqual(launchbox_utils.get_game_full("a2"), {"Title": "Galaga", "ID": "a2", "Notes": "Sequel to Galaxian"})
+            mock_parse.assert_not_called()
+        self.assertIsNone(launchbox_utils.get_game_full("gone"))
+
+    def test_changed_file_is_reindexed(self):
+        self.write_full_platform([("Zaxxon", "a1", "Isometric"), ("Galaga", "a2", "Sequel")], mtime=1000)
+        self.catalog.get_games()
+        self.write_full_platform([("Pac-Man", "a3", "Maze game with a long description"), ("Galaga", "a2", "Updated")], mtime=2000)
+        with patch.object(self.catalog, "stat_check_interval", 3600):
+            self.assertEqual(launchbox_utils.get_game_full("a2")["Notes"], "Updated")
+
+    def test_element_to_dict_nests_and_repeats(self):
+        element = ET.fromstring("<Game><ID>1</ID><Tag>a</Tag><Tag>b</Tag><Tag>c</Tag><Emulator><Name>MAME</Name></Emulator><Empty /></Game>")
+        self.assertEqual(launchbox_utils.element_to_dict(element),
+                         {"ID": "1", "Tag": ["a", "b", "c"], "Emulator": {"Name": "MAME"}, "Empty": ""})
+
+
+class TestMissingRoms(LaunchBoxTestCase):
+
+    def test_rom_exists_field_and_missing_list(self):
+        # write_platform points every game at roms\<id>.zip, relative to the LaunchBox folder
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")])
+        os.makedirs(os.path.join(self.launchbox_dir, "roms"))
+        open(os.path.join(self.launchbox_dir, "roms", "a2.zip"), "w").close()
+        self.assertEqual(launchbox_utils.get_missing_roms(), {"running": False, "last_run": None, "games": []})
+        self.assertIsNone(launchbox_utils.get_all_games()[0]["rom_exists"])
+        etag = launchbox_utils.get_games_etag()
+
+        self.rom_verifier.verify(self.catalog.get_games())
+        self.assertEqual([g["id"] for g in launchbox_utils.get_missing_roms()["games"]], ["a1"])
+        self.assertEqual({g["id"]: g["rom_exists"] for g in launchbox_utils.get_all_games()}, {"a1": False, "a2": True})
+        self.assertNotEqual(launchbox_utils.get_games_etag(), etag)
+        page, _ = launchbox_utils.get_games_page(10, fields=["id", "rom_exists"])
+        self.assertEqual(page["games"], [{"id": "a2", "rom_exists": True}, {"id": "a1", "rom_exists": False}])
+
+
+class TestPlaylistMutations(LaunchBoxTestCase):
+
+    def test_add_and_delete_open_only_the_named_playlist(self):
+        self.write_playlist("Other.xml", "Other", ["o1"])
+        path = self.write_playlist("favs.xml", "Favorites", ["a1"])
+        launchbox_utils.get_playlists_data()
+        with patch('playlist_catalog.open', wraps=open, create=True) as mock_open:
+            self.assertEqual(launchbox_utils.add_games_to_playlist("Favorites", ["a1", "a2"]), {"status": "updated", "added": 1})
+            self.assertEqual(launchbox_utils.add_games_to_playlist("Favorites", ["a3"]), {"status": "updated", "added": 1})
+            self.assertEqual({p["name"]: p["gameIds"] for p in launchbox_utils.get_playlists_data()}["Favorites"], ["a1", "a2", "a3"])
+            mock_open.assert_not_called()
+            self.assertEqual(launchbox_utils.flush_playlist_writes(), {"written": {"Favorites": 2}, "failed": {}})
+        # Both adds were written together: one read and one atomic write of the named playlist only
+        self.assertEqual([c.args[0] for c in mock_open.call_args_list], [path, f"{path}.tmp"])
+        self.assertEqual(self.playlist_catalog.get_playlist("Favorites")["gameIds"], ["a1", "a2", "a3"])
+        self.assertEqual(launchbox_utils.add_games_to_playlist("Missing", ["a1"]), {"status": "playlist not found"})
+
+        self.assertEqual(launchbox_utils.delete_playlist("Favorites"), {"status": "deleted"})
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual([p["name"] for p in launchbox_utils.get_playlists_data()], ["Other"])
+
+    def test_membership_reads_see_queued_adds(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")])
+        self.write_playlist("Favorites.xml", "Favorites", ["a1"])
+        self.assertEqual([g["id"] for g in launchbox_utils.find_orphaned_games()], ["a2"])
+        etag = launchbox_utils.get_orphaned_games_etag()
+
+        launchbox_utils.add_games_to_playlist("Favorites", ["a2", "gone"])
+        self.assertNotEqual(launchbox_utils.get_orphaned_games_etag(), etag)
+        self.assertEqual(launchbox_utils.find_orphaned_games(), [])
+        self.assertEqual(launchbox_utils.get_game_playlists("a2"), {"id": "a2", "playlists": ["Favorites"]})
+        self.assertEqual(launchbox_utils.find_dangling_entries()["total"], 1)
+
+    def test_unparseable_playlist_is_deleted_by_file_name(self):
+        path = os.path.join(self.playlists_dir, "Broken_1.xml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("<LaunchBox><Playlist>")
+        self.assertEqual(launchbox_utils.delete_playlist("Broken/1"), {"status": "deleted"})
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(launchbox_utils.delete_playlist("Broken/1"), {"status": "playlist not found"})
+
+    def test_deleting_a_smart_playlist_drops_its_rule(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")])
+        for name in ("Z Games", "G Games"):
+            result, error = launchbox_utils.set_smart_playlist(name, {"title": f"^{name[0]}"})
+            self.assertEqual((result["game_count"], error), (1, None))
+
+        self.assertEqual(launchbox_utils.delete_playlist("Z Games"), {"status": "deleted"})
+        result, error = launchbox_utils.apply_playlist_batch([{"op": "delete", "playlist": "G Games"}])
+        self.assertEqual(result["applied"], 1)
+        self.assertEqual(launchbox_utils.get_smart_playlists(), {"playlists": []})
+        self.assertEqual(launchbox_utils.update_smart_playlists(), {"updated": {}})
+        self.assertEqual(launchbox_utils.get_playlists_data(), [])
+
+    def test_renaming_a_smart_playlist_moves_its_rule(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")])
+        launchbox_utils.set_smart_playlist("Z Games", {"title": "^Z"})
+        result, error = launchbox_utils.apply_playlist_batch([{"op": "rename", "playlist": "Z Games", "new_name": "Zed"}])
+        self.assertEqual(result["applied"], 1)
+        self.assertEqual([p["name"] for p in launchbox_utils.get_smart_playlists()["playlists"]], ["Zed"])
+
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Zoo", "a3")])
+        launchbox_utils.update_smart_playlists()
+        self.assertEqual([(p["name"], p["gameIds"]) for p in launchbox_utils.get_playlists_data()], [("Zed", ["a1", "a3"])])
+
+
+class TestDanglingEntries(LaunchBoxTestCase):
+
+    def test_find_and_remove_dangling_entries(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")])
+        self.write_playlist("Favorites.xml", "Favorites", ["a1", "gone1", "gone2"])
+        self.write_playlist("Shooters.xml", "Shooters", ["a2", "gone1"])
+        self.write_playlist("Clean.xml", "Clean", ["a1"], mtime=1000)
+        self.assertEqual(launchbox_utils.find_dangling_entries(), {"playlists": [
+            {"name": "Favorites", "game_ids": ["gone1", "gone2"]},
+            {"name": "Shooters", "game_ids": ["gone1"]},
+        ], "total": 3})
+
+        result, error = launchbox_utils.remove_dangling_entries(["Favorites"])
+        self.assertEqual((result["removed"], error), (2, None))
+        self.assertEqual(launchbox_utils.find_dangling_entries()["total"], 1)
+        launchbox_utils.remove_dangling_entries()
+        self.assertEqual([(p["name"], p["gameIds"]) for p in launchbox_utils.get_playlists_data()],
+                         [("Clean", ["a1"]), ("Favorites", ["a1"]), ("Shooters", ["a2"])])
+        self.assertEqual(os.stat(os.path.join(self.playlists_dir, "Clean.xml")).st_mtime, 1000)
+
+    def test_cleanup_refuses_an_empty_catalog(self):
+        self.write_playlist("Favorites.xml", "Favorites", ["a1"])
+        result, error = launchbox_utils.remove_dangling_entries()
+        self.assertIsNone(result)
+        self.assertIn("empty", error)
+
+
+class TestETags(LaunchBoxTestCase):
+
+    def test_catalog_etag_follows_generation(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1")], mtime=1000)
+        etag = self.catalog.current_etag()
+        self.assertEqual(self.catalog.current_etag(), etag)
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1"), ("Galaga", "a2")], mtime=2000)
+        self.assertNotEqual(self.catalog.current_etag(), etag)
+        self.assertNotEqual(GameCatalog(self.platforms_dir).current_etag(), etag)
+
+    def test_playlists_etag_changes_only_with_playlist_files(self):
+        path = self.write_playlist("Favorites.xml", "Favorites", ["a1"], mtime=1000)
+        etag = launchbox_utils.get_playlists_etag()
+        self.assertEqual(launchbox_utils.get_playlists_etag(), etag)
+        with patch('playlist_catalog.ET.fromstring') as mock_parse:
+            launchbox_utils.get_playlists_etag()
+            mock_parse.assert_not_called()
+
+        self.write_playlist("Favorites.xml", "Favorites", ["a1", "a2"], mtime=2000)
+        changed = launchbox_utils.get_playlists_etag()
+        self.assertNotEqual(changed, etag)
+        os.remove(path)
+        self.assertNotEqual(launchbox_utils.get_playlists_etag(), changed)
+
+    def test_playlists_etag_covers_queued_adds(self):
+        self.write_playlist("Favorites.xml", "Favorites", ["a1"], mtime=1000)
+        etag = launchbox_utils.get_playlists_etag()
+        launchbox_utils.add_games_to_playlist("Favorites", ["a2"])
+        self.assertNotEqual(launchbox_utils.get_playlists_etag(), etag)
+
+
+class TestChanges(LaunchBoxTestCase):
+
+    def test_game_and_playlist_deltas(self):
+        arcade = os.path.join(self.platforms_dir, "Arcade.xml")
+        write_platform(arcade, [("Zaxxon", "a1"), ("Galaga", "a2")], mtime=1000)
+        self.write_playlist("Favorites.xml", "Favorites", ["a1"], mtime=1000)
+        start = launchbox_utils.get_changes()
+        self.assertTrue(start["resync"])
+        self.assertEqual(launchbox_utils.get_changes(start["generation"], start["instance"])["changes"], [])
+
+        write_platform(arcade, [("Zaxxon 2", "a1"), ("Pac-Man", "a3")], mtime=2000)
+        self.write_playlist("Favorites.xml", "Favorites", ["a3"], mtime=2000)
+        self.write_playlist("Shooters.xml", "Shooters", [], mtime=2000)
+        result = launchbox_utils.get_changes(start["generation"], start["instance"])
+        self.assertFalse(result["resync"])
+        self.assertEqual([{k: v for k, v in c.items() if k != "generation"} for c in result["changes"]], [
+            {"type": "game", "action": "changed", "id": "a1"},
+            {"type": "game", "action": "removed", "id": "a2"},
+            {"type": "game", "action": "added", "id": "a3"},
+            {"type": "playlist_games", "action": "added", "name": "Favorites", "ids": ["a3"]},
+            {"type": "playlist_games", "action": "removed", "name": "Favorites", "ids": ["a1"]},
+            {"type": "playlist", "action": "added", "name": "Shooters"},
+        ])
+        self.assertEqual(launchbox_utils.get_changes(result["generation"], result["instance"])["changes"], [])
+
+    def test_resync_for_other_instance_or_aged_out_generation(self):
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), [("Zaxxon", "a1")])
+        start = launchbox_utils.get_changes()
+        self.assertTrue(launchbox_utils.get_changes(start["generation"], "another-agent")["resync"])
+        self.assertTrue(launchbox_utils.get_changes(start["generation"] + 5)["resync"])
+
+
+if __name__ == '__main__':
+    unittest.main()
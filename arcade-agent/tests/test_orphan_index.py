@@ -0,0 +1,59 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+
+# Assuming orphan_index.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from orphan_index import OrphanIndex
+from playlist_catalog import PlaylistCatalog
+from platform_reader import GameRecord
+from test_playlist_catalog import playlist_xml
+
+GAMES = [
+    GameRecord("Asteroids", "a1", "Arcade", ""),
+    GameRecord("Mario", "n1", "Nintendo", ""),
+    GameRecord("No ID", "", "Arcade", ""),
+    GameRecord("Sonic", "s1", "Sega Genesis", ""),
+]
+
+
+class TestOrphanIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.playlists_dir = tempfile.mkdtemp()
+        self.catalog = PlaylistCatalog(self.playlists_dir, self.playlists_dir)
+        self.index = OrphanIndex(GAMES)
+
+    def tearDown(self):
+        shutil.rmtree(self.playlists_dir, ignore_errors=True)
+
+    def write(self, filename, name, game_ids, mtime):
+        path = os.path.join(self.playlists_dir, filename)
+        with open(path, "wb") as f:
+            f.write(playlist_xml(name, game_ids))
+        os.utime(path, (mtime, mtime))
+
+    def ids(self):
+        return [game.id for game in self.index.get_orphans(self.catalog)]
+
+    def test_incremental_updates_match_a_full_scan(self):
+        self.write("Favorites.xml", "Favorites", ["n1", "zz"], mtime=1000)
+        self.assertEqual(self.ids(), ["a1", "s1"])
+        self.write("Favorites.xml", "Favorites", ["a1", "s1"], mtime=2000)
+        self.write("Other.xml", "Other", ["s1"], mtime=2000)
+        self.assertEqual(self.ids(), ["n1"])
+        os.remove(os.path.join(self.playlists_dir, "Favorites.xml"))
+        self.assertEqual(self.ids(), ["a1", "n1"])
+        self.assertEqual(self.ids(), [g.id for g in OrphanIndex(GAMES).get_orphans(self.catalog)])
+
+    def test_full_scan_hook(self):
+        self.write("Favorites.xml", "Favorites", ["n1"], mtime=1000)
+        orphans = self.index.get_orphans(self.catalog, full_scan=lambda games, referenced: [3])
+        self.assertEqual([g.id for g in orphans], ["s1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import os
+import sys
+import tempfile
+import pickle
+import xml.etree.ElementTree as ET
+
+# Assuming platform_reader.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from platform_reader import iter_platform_games, read_game_element, GameRecord
+
+SAMPLE_PLATFORM = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'Samples', 'GameList', 'Arcade.xml'))
+
+
+def legacy_parse(filepath):
+    """The original ET.parse based extraction from get_all_games()."""
+    platform_name = os.path.splitext(os.path.basename(filepath))[0]
+    root = ET.parse(filepath).getroot()
+    return [
+        {
+            "title": game.findtext("Title", ""),
+            "id": game.findtext("ID", ""),
+            "platform": game.findtext("Platform", platform_name),
+            "path": game.findtext("ApplicationPath", "")
+        }
+        for game in root.findall("Game")
+    ]
+
+
+class TestPlatformReader(unittest.TestCase):
+
+    def write_temp(self, content):
+        fd, path = tempfile.mkstemp(suffix=".xml")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_PLATFORM), "Sample platform file not available")
+    def test_matches_legacy_parser_on_sample(self):
+        records = [r.to_dict() for r in iter_platform_games(SAMPLE_PLATFORM)]
+        legacy_fields = ("title", "id", "platform", "path")
+        self.assertEqual([{f: r[f] for f in legacy_fields} for r in records], legacy_parse(SAMPLE_PLATFORM))
+        self.assertEqual(len(records), 94)
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_PLATFORM), "Sample platform file not available")
+    def test_reads_facet_fields(self):
+        record = next(r for r in iter_platform_games(SAMPLE_PLATFORM) if r.id == "0adb079d-06f5-421e-820b-69907f53bd29")
+        self.assertEqual(record.developer, "Data East")
+        self.assertTrue(record.release_date.startswith("1991"))
+
+    @unittest.skipUnless(os.path.exists(SAMPLE_PLATFORM), "Sample platform file not available")
+    def test_byte_ranges_point_at_each_game(self):
+        for record in iter_platform_games(SAMPLE_PLATFORM):
+            element = read_game_element(SAMPLE_PLATFORM, record.offset, record.length)
+            self.assertEqual(element.findtext("ID"), record.id)
+            self.assertEqual(record.source, "Arcade.xml")
+
+    def test_byte_ranges_with_multibyte_text_and_odd_end_tags(self):
+        path = self.write_temp(
+            "<LaunchBox>\n<Game><Title>Pokémon ☕</Title><ID>1</ID><Notes>a &amp; b</Notes></Game >\n"
+            "<Game>\n  <ID>2</ID>\n  <Rating>E</Rating>\n</Game></LaunchBox>"
+        )
+        first, second = iter_platform_games(path)
+        self.assertEqual(first.title, "Pokémon ☕")
+        self.assertEqual(read_game_element(path, first.offset, first.length).findtext("Notes"), "a & b")
+        self.assertEqual(read_game_element(path, second.offset, second.length).findtext("Rating"), "E")
+        with self.assertRaises(ET.ParseError):
+            read_game_element(path, first.offset + 1, first.length)
+
+    def test_only_top_level_games_and_defaults(self):
+        path = self.write_temp(
+            "<LaunchBox>"
+            "<Game><Title>A</Title><ID>1</ID></Game>"
+            "<AdditionalApplication><Game><Title>nested</Title></Game></AdditionalApplication>"
+            "<Game><ID>2</ID><Platform /></Game>"
+            "</LaunchBox>"
+        )
+        records = list(iter_platform_games(path))
+        platform_name = os.path.splitext(os.path.basename(path))[0]
+        self.assertEqual(records, [
+            GameRecord("A", "1", platform_name, ""),
+            GameRecord("", "2", "", ""),
+        ])
+        self.assertEqual([{f: r.to_dict()[f] for f in ("title", "id", "platform", "path")} for r in records], legacy_parse(path))
+
+    def test_repeated_strings_are_shared(self):
+        first = GameRecord("A", "1", "".join(["Arc", "ade"]), "roms\\a.zip", "Action")
+        second = GameRecord("B", "2", "".join(["Arc", "ade"]), "roms\\b.zip", "".join(["Act", "ion"]))
+        self.assertIs(first.platform, second.platform)
+        self.assertIs(first.genre, second.genre)
+        self.assertEqual((first.path, second.path), ("roms\\a.zip", "roms\\b.zip"))
+        self.assertEqual(GameRecord("C", "3", "Arcade", "c.zip").path, "c.zip")
+
+        # Records coming back from a parse worker process are interned again
+        copy = pickle.loads(pickle.dumps(second))
+        self.assertEqual(copy, second)
+        self.assertIs(copy.platform, first.platform)
+
+    def test_to_dict_projection(self):
+        record = GameRecord("A", "1", "Arcade", "roms/a.zip")
+        self.assertEqual(record.to_dict(("id", "path")), {"id": "1", "path": "roms/a.zip"})
+        self.assertEqual(tuple(record.to_dict()), GameRecord.FIELDS)
+
+    def test_parse_error_is_raised(self):
+        path = self.write_temp("<LaunchBox><Game><Title>oops</Game>")
+        with self.assertRaises(ET.ParseError):
+            list(iter_platform_games(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import shutil
+import xml.etree.ElementTree as ET
+
+# Assuming playlist_catalog.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import playlist_catalog
+from playlist_catalog import PlaylistCatalog, PlaylistEdit, parse_playlist_bytes, append_playlist_games, banner_path
+
+BROKEN = (b'<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n  <Playlist>\n    <Name>Broken</Name>\n'
+          b'  </Playlist><PlaylistGame>\n    <GameId>b1</GameId>\n  </PlaylistGame>\n</LaunchBox>')
+
+
+def playlist_xml(name, game_ids):
+    games = "".join(f"  <PlaylistGame>\n    <GameId>{gid}</GameId>\n  </PlaylistGame>\n" for gid in game_ids)
+    return f'<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n  <Playlist>\n    <Name>{name}</Name>\n  </Playlist>\n{games}</LaunchBox>'.encode("utf-8")
+
+
+class TestPlaylistCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.launchbox_dir = tempfile.mkdtemp()
+        self.playlists_dir = os.path.join(self.launchbox_dir, "Data", "Playlists")
+        self.images_dir = os.path.join(self.launchbox_dir, "Images", "Playlists")
+        os.makedirs(self.playlists_dir)
+        self.catalog = PlaylistCatalog(self.playlists_dir, self.images_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.launchbox_dir, ignore_errors=True)
+
+    def write(self, filename, data, mtime=None):
+        path = os.path.join(self.playlists_dir, filename)
+        with open(path, "wb") as f:
+            f.write(data)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_unchanged_files_are_not_read_again(self):
+        self.write("Favorites.xml", playlist_xml("Favorites", ["a1", "a2"]), mtime=1000)
+        self.write("Shooters.xml", playlist_xml("Shooters", []), mtime=1000)
+        self.assertEqual([(p["name"], p["gameIds"]) for p in self.catalog.get_playlists()],
+                         [("Favorites", ["a1", "a2"]), ("Shooters", [])])
+
+        with patch('playlist_catalog.ET.fromstring', wraps=ET.fromstring) as mock_parse:
+            self.catalog.get_playlists()
+            mock_parse.assert_not_called()
+            self.write("Shooters.xml", playlist_xml("Shooters", ["s1"]), mtime=2000)
+            self.assertEqual(self.catalog.get_playlists()[1]["gameIds"], ["s1"])
+            mock_parse.assert_called_once()
+
+        os.remove(os.path.join(self.playlists_dir, "Favorites.xml"))
+        self.assertEqual([p["name"] for p in self.catalog.get_playlists()], ["Shooters"])
+
+    def test_repair_check_uses_the_parsed_buffer(self):
+        root, repaired = parse_playlist_bytes(playlist_xml("Fine", ["a1"]))
+        self.assertIsNone(repaired)
+        root, repaired = parse_playlist_bytes(BROKEN)
+        self.assertEqual(root.findtext("PlaylistGame/GameId"), "b1")
+        self.assertNotIn(playlist_catalog.REPAIR_MARKER, repaired)
+
+        path = self.write("Broken.xml", BROKEN)
+        with patch('playlist_catalog.open', wraps=open, create=True) as mock_open:
+            self.assertEqual(self.catalog.get_playlists()[0]["gameIds"], ["b1"])
+        # Reading never writes: the file is read once and left as it is
+        self.assertEqual([c.args[1] for c in mock_open.call_args_list], ["rb"])
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), BROKEN)
+        self.assertEqual(self.catalog.get_repair_status()["pending"], ["Broken.xml"])
+
+    def test_repair_rewrites_flagged_files_atomically(self):
+        path = self.write("Broken.xml", BROKEN)
+        self.write("Good.xml", playlist_xml("Good", ["g1"]))
+        self.write("Bad.xml", b"<LaunchBox><Playlist>")
+        with patch('playlist_catalog.os.replace', wraps=os.replace) as mock_replace:
+            report = self.catalog.repair()
+        mock_replace.assert_called_once_with(f"{path}.tmp", path)
+        self.assertEqual((report["checked"], report["repaired"], report["failed"]), (3, ["Broken.xml"], []))
+        self.assertEqual([u["file"] for u in report["unparseable"]], ["Bad.xml"])
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), parse_playlist_bytes(BROKEN)[1])
+
+        with patch('playlist_catalog.ET.fromstring') as mock_parse:
+            self.assertEqual(self.catalog.get_playlists()[0]["gameIds"], ["b1"])
+            mock_parse.assert_not_called()
+        self.assertEqual(self.catalog.get_repair_status()["pending"], [])
+        self.assertEqual(self.catalog.repair()["repaired"], [])
+
+    def test_playlists_are_found_by_name_not_file_name(self):
+        self.write("fav_2024.xml", playlist_xml("Favorites", ["a1"]))
+        self.write("zz_copy.xml", playlist_xml("Favorites", ["a2"]))
+        self.write("Shooters.xml", playlist_xml("Shooters", []))
+        self.assertEqual(self.catalog.find_file("Favorites"), os.path.join(self.playlists_dir, "fav_2024.xml"))
+        self.assertIsNone(self.catalog.find_file("fav_2024"))
+        self.assertEqual(self.catalog.get_playlist("Shooters")["gameIds"], [])
+
+        self.write("Shooters.xml", playlist_xml("Run and Gun", []), mtime=2000)
+        self.assertIsNone(self.catalog.find_file("Shooters"))
+        self.assertEqual(self.catalog.find_file("Run and Gun"), os.path.join(self.playlists_dir, "Shooters.xml"))
+
+    def test_append_keeps_existing_bytes_and_formatting(self):
+        data = playlist_xml("Favorites", ["a1"]).replace(b"\n", b"\r\n")
+        appended = append_playlist_games(data, ["a2", "R&D"])
+        end = data.index(b"</LaunchBox>")
+        self.assertEqual(appended[:end], data[:end])
+        self.assertEqual(appended[end:], b"  <PlaylistGame>\r\n    <GameId>a2</GameId>\r\n  </PlaylistGame>\r\n"
+                                         b"  <PlaylistGame>\r\n    <GameId>R&amp;D</GameId>\r\n  </PlaylistGame>\r\n</LaunchBox>")
+        root, _ = parse_playlist_bytes(append_playlist_games(b"<LaunchBox><Playlist><Name>X</Name></Playlist></LaunchBox>", ["x1"]))
+        self.assertEqual(root.findtext("PlaylistGame/GameId"), "x1")
+
+    def test_append_games_writes_only_new_ids(self):
+        path = self.write("favs.xml", playlist_xml("Favorites", ["a1"]), mtime=1000)
+        self.assertEqual(self.catalog.append_games("Favorites", ["a1", "a2", "a2"]), ["a2"])
+        self.assertEqual(self.catalog.append_games("Favorites", ["a2"]), [])
+        self.assertIsNone(self.catalog.append_games("Missing", ["a1"]))
+        with patch('playlist_catalog.ET.fromstring') as mock_parse:
+            self.assertEqual(self.catalog.get_playlist("Favorites")["gameIds"], ["a1", "a2"])
+            mock_parse.assert_not_called()
+
+        # An edit made behind the catalog's back is read from the file, not the stale cache
+        self.write("favs.xml", playlist_xml("Favorites", ["b1"]), mtime=2000)
+        with patch.object(self.catalog, "refresh"):
+            self.assertEqual(self.catalog.append_games("Favorites", ["a1"]), ["a1"])
+        with open(path, "rb") as f:
+            self.assertEqual([g.text for g in ET.fromstring(f.read()).iter("GameId")], ["b1", "a1"])
+
+    def test_playlist_edit_keeps_formatting(self):
+        data = playlist_xml("Favorites", ["a1", "a2", "a3"]).replace(b"\n", b"\r\n")
+        edit = PlaylistEdit(data)
+        self.assertEqual(edit.remove(["a3", "zz"]), ["a3"])
+        self.assertEqual(edit.add(["a3"]), ["a3"])
+        self.assertEqual(edit.to_bytes(), data)
+        edit.remove(["a1", "a2", "a3"])
+        self.assertEqual(edit.to_bytes(), playlist_xml("Favorites", []).replace(b"\n", b"\r\n"))
+
+    def test_batch_reads_and_writes_each_file_once(self):
+        self.write("favs.xml", playlist_xml("Favorites", ["a1", "a2"]))
+        self.write("Shooters.xml", playlist_xml("Shooters", ["s1"]))
+        self.write("Old.xml", playlist_xml("Old", []))
+        self.catalog.refresh()
+        with patch('playlist_catalog.open', wraps=open, create=True) as mock_open:
+            results = self.catalog.apply_batch([
+                {"op": "add", "playlist": "Favorites", "games": ["a3"]},
+                {"op": "remove", "playlist": "Favorites", "games": ["a1"]},
+                {"op": "rename", "playlist": "Favorites", "new_name": "Best"},
+                {"op": "add", "playlist": "Best", "games": ["a4"]},
+                {"op": "create", "playlist": "New", "games": ["n1"]},
+                {"op": "delete", "playlist": "Old"},
+            ])
+        self.assertEqual([r["status"] for r in results], ["ok"] * 6)
+        self.assertEqual(results[4]["file"], "New.xml")
+        opened = sorted((os.path.basename(c.args[0]), c.args[1]) for c in mock_open.call_args_list)
+        self.assertEqual(opened, [("New.xml.tmp", "wb"), ("favs.xml", "rb"), ("favs.xml.tmp", "wb")])
+        self.assertFalse(os.path.exists(os.path.join(self.playlists_dir, "Old.xml")))
+        self.catalog = PlaylistCatalog(self.playlists_dir, self.images_dir)
+        self.assertEqual([(p["name"], p["gameIds"]) for p in self.catalog.get_playlists()],
+                         [("New", ["n1"]), ("Shooters", ["s1"]), ("Best", ["a2", "a3", "a4"])])
+
+    def test_batch_is_all_or_nothing_per_file(self):
+        path = self.write("favs.xml", playlist_xml("Favorites", ["a1"]), mtime=1000)
+        self.write("Shooters.xml", playlist_xml("Shooters", []))
+        results = self.catalog.apply_batch([
+            {"op": "add", "playlist": "Favorites", "games": ["a2"]},
+            {"op": "add", "playlist": "Shooters", "games": ["s1"]},
+            {"op": "rename", "playlist": "Favorites", "new_name": "Shooters"},
+            {"op": "delete", "playlist": "Missing"},
+            {"op": "explode", "playlist": "Favorites"},
+        ])
+        self.assertEqual([r["status"] for r in results], ["rolled_back", "ok", "error", "error", "error"])
+        self.assertEqual(os.stat(path).st_mtime, 1000)
+        self.assertEqual(self.catalog.get_playlist("Shooters")["gameIds"], ["s1"])
+
+    def test_validation_errors_roll_back_the_named_file(self):
+        classics = self.write("Classics.xml", playlist_xml("Classics", ["c1"]), mtime=1000)
+        racing = self.write("Racing.xml", playlist_xml("Racing", []), mtime=1000)
+        results = self.catalog.apply_batch([
+            {"op": "remove", "playlist": "Classics", "games": ["c1"]},
+            {"op": "add", "playlist": "Classics", "games": [""]},
+            {"op": "add", "playlist": "Classics", "games": ["c2"]},
+            {"op": "add", "playlist": "Racing", "games": ["r1"]},
+            {"op": "explode", "playlist": "Racing"},
+        ])
+        self.assertEqual([r["status"] for r in results], ["rolled_back", "error", "rolled_back", "rolled_back", "error"])
+        self.assertEqual((os.stat(classics).st_mtime, os.stat(racing).st_mtime), (1000, 1000))
+        self.assertEqual(self.catalog.get_playlist("Classics")["gameIds"], ["c1"])
+
+    def test_names_freed_by_a_rolled_back_file_stay_taken(self):
+        self.write("A.xml", playlist_xml("A", ["a1"]), mtime=1000)
+        results = self.catalog.apply_batch([
+            {"op": "rename", "playlist": "A", "new_name": "B"},
+            {"op": "add", "playlist": "B", "games": [""]},
+            {"op": "create", "playlist": "A", "games": ["a2"]},
+        ])
+        self.assertEqual([r["status"] for r in results], ["rolled_back", "error", "error"])
+        self.assertIn("still used by A.xml", results[2]["message"])
+        self.assertEqual(sorted(os.listdir(self.playlists_dir)), ["A.xml"])
+        self.assertEqual(self.catalog.get_playlist("A")["gameIds"], ["a1"])
+
+    def test_reverse_index_and_membership_changes(self):
+        self.write("favs.xml", playlist_xml("Favorites", ["a1", "a2"]), mtime=1000)
+        self.write("Shooters.xml", playlist_xml("Shooters", ["a2"]), mtime=1000)
+        generation, referenced, unreferenced = self.catalog.membership_since(None)
+        self.assertEqual((referenced, unreferenced), ({"a1", "a2"}, None))
+        self.assertEqual(self.catalog.get_game_playlists("a2"), ["Favorites", "Shooters"])
+
+        self.write("favs.xml", playlist_xml("Favorites", ["a3"]), mtime=2000)
+        self.catalog.append_games("Shooters", ["a4"])
+        self.assertEqual(self.catalog.membership_since(generation)[1:], ({"a3", "a4"}, {"a1"}))
+        self.assertEqual(self.catalog.changed_since(generation)[1], {"a1", "a2", "a3", "a4"})
+        self.assertIsNone(self.catalog.changed_since(None)[1])
+        self.assertEqual(self.catalog.referenced_ids(exclude=["Shooters"]), {"a3"})
+        self.assertEqual(self.catalog.referenced_ids(game_ids=["a2", "a3", "a9"], exclude=["Favorites"]), {"a2"})
+        self.assertEqual(self.catalog.get_game_playlists("a2"), ["Shooters"])
+        self.assertEqual(self.catalog.get_game_playlists("a1"), [])
+        self.assertEqual(self.catalog.membership_since(self.catalog.membership_generation)[1:], (set(), set()))
+
+    def test_unparseable_files_are_skipped(self):
+        self.write("Bad.xml", b"<LaunchBox><Playlist>")
+        self.write("Good.xml", playlist_xml("Good", ["g1"]))
+        self.assertEqual([p["name"] for p in self.catalog.get_playlists()], ["Good"])
+
+    def test_banner_lookups_are_cached_until_a_banner_changes(self):
+        self.write("Favorites.xml", playlist_xml("Favorites", []))
+        self.assertNotIn("bannerImagePath", self.catalog.get_playlists()[0])
+        banner = banner_path(self.images_dir, "Favorites")
+        os.makedirs(os.path.dirname(banner))
+        open(banner, "wb").close()
+        with patch('playlist_catalog.os.path.exists') as mock_exists:
+            self.catalog.get_playlists()
+            mock_exists.assert_not_called()
+
+        self.catalog.banner_changed()
+        self.assertEqual(self.catalog.get_playlists()[0]["bannerImagePath"], banner)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import time
+import tempfile
+import shutil
+
+# Assuming playlist_queue.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from playlist_queue import PlaylistWriteQueue
+from playlist_catalog import PlaylistCatalog
+from test_playlist_catalog import playlist_xml
+
+
+class TestPlaylistWriteQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.playlists_dir = tempfile.mkdtemp()
+        for filename, name in (("favs.xml", "Favorites"), ("Shooters.xml", "Shooters")):
+            with open(os.path.join(self.playlists_dir, filename), "wb") as f:
+                f.write(playlist_xml(name, ["a1"]))
+        self.catalog = PlaylistCatalog(self.playlists_dir, self.playlists_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.playlists_dir, ignore_errors=True)
+
+    def test_adds_are_answered_at_once_and_written_together(self):
+        queue = PlaylistWriteQueue(self.catalog, delay=3600)
+        with patch.object(self.catalog, "append_games", wraps=self.catalog.append_games) as mock_append:
+            self.assertEqual(queue.add_games("Favorites", ["a1", "a2"]), ["a2"])
+            self.assertEqual(queue.add_games("Favorites", ["a2", "a3"]), ["a3"])
+            self.assertEqual(queue.add_games("Shooters", ["s1"]), ["s1"])
+            self.assertIsNone(queue.add_games("Missing", ["a1"]))
+            mock_append.assert_not_called()
+            self.assertEqual(queue.pending_games(), {"Favorites": ["a2", "a3"], "Shooters": ["s1"]})
+
+            self.assertEqual(queue.flush(), ({"Favorites": ["a2", "a3"], "Shooters": ["s1"]}, {}))
+            self.assertEqual(mock_append.call_count, 2)
+        self.assertEqual(queue.pending_games(), {})
+        self.assertEqual(self.catalog.get_playlist("Favorites")["gameIds"], ["a1", "a2", "a3"])
+
+    def test_background_writer_flushes_after_the_delay(self):
+        queue = PlaylistWriteQueue(self.catalog, delay=0.05)
+        queue.add_games("Favorites", ["a2"])
+        queue.add_games("Favorites", ["a3"])
+        deadline = time.monotonic() + 5
+        while queue.pending_games() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual(PlaylistCatalog(self.playlists_dir, self.playlists_dir).get_playlist("Favorites")["gameIds"], ["a1", "a2", "a3"])
+
+    def test_failed_writes_stay_queued_and_are_reported(self):
+        queue = PlaylistWriteQueue(self.catalog, delay=3600, retry_delay=3600)
+        queue.add_games("Favorites", ["a2"])
+        with patch.object(self.catalog, "append_games", side_effect=OSError("disk full")):
+            self.assertEqual(queue.flush(), ({}, {"Favorites": "disk full"}))
+        queue.add_games("Favorites", ["a3"])
+        self.assertEqual(queue.pending_games(), {"Favorites": ["a2", "a3"]})
+        self.assertEqual(queue.get_errors(), {"Favorites": "disk full"})
+
+        self.assertEqual(queue.flush(), ({"Favorites": ["a2", "a3"]}, {}))
+        self.assertEqual(queue.get_errors(), {})
+        self.assertEqual(self.catalog.get_playlist("Favorites")["gameIds"], ["a1", "a2", "a3"])
+
+    def test_games_of_a_missing_playlist_are_dropped_without_a_lasting_error(self):
+        queue = PlaylistWriteQueue(self.catalog, delay=3600, retry_delay=3600)
+        queue.add_games("Favorites", ["a2"])
+        with patch.object(self.catalog, "append_games", side_effect=OSError("disk full")):
+            queue.flush()
+        with patch.object(self.catalog, "append_games", return_value=None):
+            self.assertEqual(queue.flush(), ({}, {"Favorites": "Playlist not found"}))
+        self.assertEqual((queue.pending_games(), queue.get_errors()), ({}, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import zlib
+import hashlib
+import tempfile
+import shutil
+import threading
+
+# Assuming rom_hasher.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import rom_hasher
+from rom_hasher import RomHasher, hash_file
+from rom_verifier import RomVerifier
+from platform_reader import GameRecord
+
+
+class TestRomHasher(unittest.TestCase):
+
+    def setUp(self):
+        self.launchbox_dir = tempfile.mkdtemp()
+        self.roms_dir = os.path.join(self.launchbox_dir, "Games", "Arcade")
+        os.makedirs(self.roms_dir)
+        self.contents = {"pacman.zip": b"pacman" * 1000, "galaga.zip": b"galaga", "shared.zip": b""}
+        for name, data in self.contents.items():
+            with open(os.path.join(self.roms_dir, name), "wb") as f:
+                f.write(data)
+        self.cache_path = os.path.join(self.launchbox_dir, "rom_hashes.jsonl")
+        self.resolve = RomVerifier(self.launchbox_dir).resolve
+        self.games = [
+            GameRecord("Pac-Man", "a1", "Arcade", "Games\\Arcade\\pacman.zip"),
+            GameRecord("Galaga", "a2", "Arcade", "Games\\Arcade\\galaga.zip"),
+            GameRecord("Shared 1", "a3", "Arcade", "Games\\Arcade\\shared.zip"),
+            GameRecord("Shared 2", "a4", "Arcade", "Games\\Arcade\\shared.zip"),
+            GameRecord("Missing", "a5", "Arcade", "Games\\Arcade\\missing.zip"),
+            GameRecord("Steam", "s1", "Windows", "steam://rungameid/1"),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.launchbox_dir, ignore_errors=True)
+
+    def hasher(self):
+        hasher = RomHasher(self.cache_path, self.resolve, workers=2, rate_limit=0)
+        hasher.load_cache()
+        return hasher
+
+    def rom(self, name):
+        return os.path.join(self.roms_dir, name)
+
+    def test_hash_file_matches_zlib_and_hashlib(self):
+        data = self.contents["pacman.zip"]
+        self.assertEqual(hash_file(self.rom("pacman.zip"), chunk_size=7),
+                         (len(data), f"{zlib.crc32(data):08x}", hashlib.sha1(data).hexdigest()))
+
+    def test_run_hashes_each_file_once_and_pages_by_path(self):
+        hasher = self.hasher()
+        progress = hasher.run(self.games)
+        self.assertEqual((progress["files_total"], progress["files_done"], progress["errors"]), (3, 3, 0))
+
+        page, total = hasher.get_page(2)
+        self.assertEqual(total, 3)
+        self.assertEqual([entry["path"] for entry in page], [self.rom("galaga.zip"), self.rom("pacman.zip")])
+        self.assertEqual(page[0]["sha1"], hashlib.sha1(b"galaga").hexdigest())
+        page, _ = hasher.get_page(2, after=page[-1]["path"])
+        self.assertEqual(page[0]["game_ids"], ["a3", "a4"])
+
+    def test_cache_survives_restarts_and_only_changed_files_are_hashed(self):
+        self.hasher().run(self.games)
+        with open(self.rom("galaga.zip"), "wb") as f:
+            f.write(b"galaga 2")
+        os.utime(self.rom("galaga.zip"), ns=(0, os.stat(self.rom("galaga.zip")).st_mtime_ns + 10**9))
+
+        hasher = self.hasher()
+        with patch('rom_hasher.hash_file', wraps=hash_file) as mock_hash:
+            progress = hasher.run(self.games)
+        mock_hash.assert_called_once()
+        self.assertEqual(progress["files_cached"], 2)
+        page, _ = hasher.get_page(1)
+        self.assertEqual(page[0]["sha1"], hashlib.sha1(b"galaga 2").hexdigest())
+
+    def test_cache_is_compacted_to_live_files(self):
+        hasher = self.hasher()
+        hasher.run(self.games)
+        hasher.run(self.games[:1])
+        with open(self.cache_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(self.hasher().get_page(10)[1], 1)
+
+    def test_pages_read_during_compaction_only_list_cached_paths(self):
+        hasher = self.hasher()
+        hasher.run(self.games)
+        compact = hasher._compact_cache
+        pages = []
+
+        def compact_and_read(live_paths):
+            compact(live_paths)
+            # A request arriving right after the compaction must not see the paths it dropped
+            reader = threading.Thread(target=lambda: pages.append(hasher.get_page(10)))
+            reader.start()
+            reader.join(0.2)
+            readers.append(reader)
+
+        readers = []
+        with patch.object(hasher, "_compact_cache", side_effect=compact_and_read):
+            hasher.run(self.games[:1])
+        readers[0].join()
+        self.assertEqual([[entry["path"] for entry in page] for page, _ in pages], [[self.rom("pacman.zip")]])
+
+
+if __name__ == '__main__':
+    unittest.main()
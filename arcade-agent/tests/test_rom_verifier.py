@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import tempfile
+import shutil
+
+# Assuming rom_verifier.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import rom_verifier
+from rom_verifier import RomVerifier
+from platform_reader import GameRecord
+
+
+class TestRomVerifier(unittest.TestCase):
+
+    def setUp(self):
+        self.launchbox_dir = tempfile.mkdtemp()
+        self.roms_dir = os.path.join(self.launchbox_dir, "Games", "Arcade")
+        os.makedirs(self.roms_dir)
+        for name in ("pacman.zip", "galaga.zip"):
+            open(os.path.join(self.roms_dir, name), "w").close()
+        self.verifier = RomVerifier(self.launchbox_dir, workers=2)
+        self.games = [
+            GameRecord("Pac-Man", "a1", "Arcade", "Games\\Arcade\\pacman.zip"),
+            GameRecord("Galaga", "a2", "Arcade", os.path.join(self.roms_dir, "galaga.zip")),
+            GameRecord("Zaxxon", "a3", "Arcade", "Games\\Arcade\\zaxxon.zip"),
+            GameRecord("Gone", "a4", "Arcade", "Games\\Deleted\\gone.zip"),
+            GameRecord("Steam", "s1", "Windows", "steam://rungameid/1"),
+            GameRecord("No path", "n1", "Arcade", ""),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.launchbox_dir, ignore_errors=True)
+
+    def test_relative_absolute_and_unchecked_paths(self):
+        stats = self.verifier.verify(self.games)
+        self.assertEqual({g.id: self.verifier.rom_exists(g.id) for g in self.games},
+                         {"a1": True, "a2": True, "a3": False, "a4": False, "s1": None, "n1": None})
+        self.assertEqual((stats["games_checked"], stats["missing"], stats["folders"]), (4, 2, 2))
+
+    def test_only_changed_folders_are_relisted(self):
+        self.verifier.verify(self.games)
+        generation = self.verifier.generation
+        with patch('rom_verifier.os.listdir', wraps=os.listdir) as mock_listdir:
+            stats = self.verifier.verify(self.games)
+            mock_listdir.assert_not_called()
+        self.assertEqual(stats["folders_relisted"], 0)
+        self.assertEqual(self.verifier.generation, generation)
+
+        open(os.path.join(self.roms_dir, "zaxxon.zip"), "w").close()
+        os.utime(self.roms_dir, ns=(0, os.stat(self.roms_dir).st_mtime_ns + 10**9))
+        stats = self.verifier.verify(self.games)
+        self.assertEqual(stats["folders_relisted"], 1)
+        self.assertTrue(self.verifier.rom_exists("a3"))
+        self.assertGreater(self.verifier.generation, generation)
+
+
+if __name__ == '__main__':
+    unittest.main()
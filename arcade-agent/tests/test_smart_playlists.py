@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import patch
+import os
+import sys
+import json
+import tempfile
+import shutil
+
+# Assuming smart_playlists.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from smart_playlists import SmartPlaylists, SmartRule
+from game_catalog import GameCatalog
+from change_log import ChangeLog
+from playlist_catalog import PlaylistCatalog
+from test_playlist_catalog import playlist_xml
+
+
+def write_platform(path, platform, games, mtime):
+    """Writes a LaunchBox platform XML file containing (title, id, genre) games."""
+    body = "".join(
+        f"  <Game>\n    <Title>{title}</Title>\n    <ID>{game_id}</ID>\n    <Platform>{platform}</Platform>\n"
+        f"    <ApplicationPath>roms\\{game_id}.zip</ApplicationPath>\n    <Genre>{genre}</Genre>\n  </Game>\n"
+        for title, game_id, genre in games
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'<?xml version="1.0" standalone="yes"?>\n<LaunchBox>\n{body}</LaunchBox>')
+    os.utime(path, (mtime, mtime))
+
+
+class TestSmartPlaylists(unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.platforms_dir = os.path.join(self.base_dir, "Platforms")
+        self.playlists_dir = os.path.join(self.base_dir, "Playlists")
+        os.makedirs(self.platforms_dir)
+        os.makedirs(self.playlists_dir)
+        self.rules_path = os.path.join(self.base_dir, "smart_playlists.json")
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), "Arcade",
+                       [("Zaxxon", "a1", "Shooter"), ("Asteroids", "a2", "Shooter; Classic"), ("Pac-Man", "a3", "Maze")], 1000)
+        write_platform(os.path.join(self.platforms_dir, "Nintendo.xml"), "Nintendo", [("Gradius", "n1", "Shooter")], 1000)
+        self.game_catalog = GameCatalog(self.platforms_dir, stat_check_interval=0, change_log=ChangeLog())
+        self.playlist_catalog = PlaylistCatalog(self.playlists_dir, self.playlists_dir)
+        self.smart = SmartPlaylists(self.rules_path, self.game_catalog, self.playlist_catalog)
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+    def playlist_ids(self, name):
+        return PlaylistCatalog(self.playlists_dir, self.playlists_dir).get_playlist(name)["gameIds"]
+
+    def test_invalid_rules_are_rejected(self):
+        for rule in ({}, {"genre": "Shooter"}, {"title": "("}, {"facets": {"color": ["red"]}}, {"orphan": "yes"},
+                     {"platform": []}, {"platform": "Arcade", "facets": {"platform": ["Arcade"]}}):
+            result, error = self.smart.set_rule("Bad", rule)
+            self.assertIsNone(result)
+            self.assertTrue(error)
+        self.assertEqual(self.smart.get_rules(), [])
+        self.assertEqual(os.listdir(self.playlists_dir), [])
+
+    def test_playlist_is_written_and_only_changed_games_are_tested_again(self):
+        result, error = self.smart.set_rule("Arcade Shooters", {"platform": "arcade", "facets": {"genre": ["shooter"]}, "title": "^[A-Z]"})
+        self.assertIsNone(error)
+        self.assertEqual((result["game_count"], result["added"], result["removed"]), (2, 2, 0))
+        self.assertEqual(self.playlist_ids("Arcade Shooters"), ["a2", "a1"])  # Catalog (title) order
+
+        # Pac-Man turns into a shooter, Zaxxon into a maze game, and a new shooter appears
+        write_platform(os.path.join(self.platforms_dir, "Arcade.xml"), "Arcade",
+                       [("Zaxxon", "a1", "Maze"), ("Asteroids", "a2", "Shooter; Classic"), ("Pac-Man", "a3", "Shooter"),
+                        ("Defender", "a4", "Shooter")], 2000)
+        with patch.object(SmartRule, "matches", autospec=True, side_effect=SmartRule.matches) as mock_matches:
+            self.assertEqual(self.smart.update(), {"Arcade Shooters": {"added": 2, "removed": 1}})
+        self.assertEqual(sorted(call.args[1].id for call in mock_matches.call_args_list), ["a1", "a3", "a4"])
+        self.assertEqual(self.playlist_ids("Arcade Shooters"), ["a2", "a4", "a3"])
+        self.assertEqual(self.smart.update(), {})
+
+    def test_regular_playlists_are_only_taken_over_on_request(self):
+        path = os.path.join(self.playlists_dir, "Favorites.xml")
+        with open(path, "wb") as f:
+            f.write(playlist_xml("Favorites", ["a1", "a2"]))
+        result, error = self.smart.set_rule("Favorites", {"title": "^Zax"})
+        self.assertIn("not a smart playlist", error)
+        self.assertEqual(result, {"name": "Favorites", "would_remove": ["a2"]})
+        self.assertEqual(self.smart.get_rules(), [])
+        self.assertEqual(self.playlist_ids("Favorites"), ["a1", "a2"])
+
+        result, error = self.smart.set_rule("Favorites", {"title": "^Zax"}, replace=True)
+        self.assertIsNone(error)
+        self.assertEqual((result["added"], result["removed"]), (0, 1))
+        self.assertEqual(self.playlist_ids("Favorites"), ["a1"])
+        # Once it is a smart playlist, its rule can be changed without replace
+        self.assertIsNone(self.smart.set_rule("Favorites", {"title": "^Ast"})[1])
+        self.assertEqual(self.playlist_ids("Favorites"), ["a2"])
+
+    def test_orphan_rules_ignore_the_smart_playlists(self):
+        with open(os.path.join(self.playlists_dir, "Favorites.xml"), "wb") as f:
+            f.write(playlist_xml("Favorites", ["a1"]))
+        self.smart.set_rule("Unlisted", {"orphan": True})
+        self.assertEqual(self.playlist_ids("Unlisted"), ["a2", "n1", "a3"])
+        self.assertEqual(self.smart.update(), {})
+
+        self.playlist_catalog.append_games("Favorites", ["n1"])
+        self.assertEqual(self.smart.update(), {"Unlisted": {"added": 0, "removed": 1}})
+        self.assertEqual(self.playlist_ids("Unlisted"), ["a2", "a3"])
+
+    def test_rules_are_stored_and_deleting_a_rule_keeps_the_playlist(self):
+        self.smart.set_rule("Nintendo", {"platform": ["Nintendo"]})
+        with open(self.rules_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"Nintendo": {"platform": ["Nintendo"]}})
+
+        reloaded = SmartPlaylists(self.rules_path, self.game_catalog, self.playlist_catalog)
+        self.assertEqual(reloaded.load_rules(), 1)
+        self.assertEqual(reloaded.get_rules(), [{"name": "Nintendo", "rule": {"platform": ["Nintendo"]}, "game_count": None}])
+        reloaded.update()
+        self.assertEqual(reloaded.get_rules()[0]["game_count"], 1)
+
+        self.assertTrue(reloaded.delete_rule("Nintendo"))
+        self.assertFalse(reloaded.delete_rule("Nintendo"))
+        self.assertEqual(reloaded.get_rules(), [])
+        self.assertEqual(self.playlist_ids("Nintendo"), ["n1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import os
+import sys
+
+# Assuming title_search.py is in the parent directory of tests
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from title_search import TitleSearchIndex, tokenize, within_edit_distance
+from platform_reader import GameRecord
+
+TITLES = [
+    "Street Fighter II: The World Warrior",
+    "Street Fighter Alpha 3",
+    "Final Fight",
+    "Pokémon Stadium",
+    "Ms. Pac-Man",
+    "Pac-Man",
+    "Super Street Fighter II Turbo",
+    "Spider-Man: The Videogame",
+]
+
+
+class TestTitleSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.games = [GameRecord(title, str(i), "Arcade", "") for i, title in enumerate(TITLES)]
+        self.index = TitleSearchIndex(self.games)
+
+    def titles(self, query, limit=50):
+        results, _ = self.index.search(query, limit=limit)
+        return [game.title for game, _ in results]
+
+    def test_tokenize_normalizes(self):
+        self.assertEqual(tokenize("Pokémon: Ms. Pac-Man!"), ["pokemon", "ms", "pac", "man"])
+
+    def test_exact_and_prefix(self):
+        self.assertEqual(self.titles("pac-man"), ["Pac-Man", "Ms. Pac-Man"])
+        self.assertEqual(set(self.titles("fig")), {"Street Fighter II: The World Warrior", "Street Fighter Alpha 3", "Final Fight", "Super Street Fighter II Turbo"})
+
+    def test_all_query_words_must_match_and_ranking(self):
+        self.assertEqual(self.titles("street fighter"), [
+            "Street Fighter Alpha 3",
+            "Street Fighter II: The World Warrior",
+            "Super Street Fighter II Turbo",
+        ])
+        self.assertEqual(self.titles("final pokemon"), [])
+
+    def test_substring(self):
+        self.assertEqual(self.titles("ighte"), ["Street Fighter Alpha 3", "Super Street Fighter II Turbo", "Street Fighter II: The World Warrior"])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.titles("stadum"), ["Pokémon Stadium"])
+        self.assertIn("Spider-Man: The Videogame", self.titles("spidr"))
+        self.assertEqual(self.titles("pokemon"), ["Pokémon Stadium"])
+
+    def test_limit_and_total(self):
+        results, total = self.index.search("street", limit=1)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(total, 3)
+        self.assertEqual(self.index.search("   ", limit=5), ([], 0))
+
+    def test_within_edit_distance(self):
+        self.assertTrue(within_edit_distance("kitten", "sitting", 3))
+        self.assertFalse(within_edit_distance("kitten", "sitting", 2))
+        self.assertTrue(within_edit_distance("mario", "maro", 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
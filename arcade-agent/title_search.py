@@ -0,0 +1,163 @@
+import re
+import bisect
+import unicodedata
+
+# Weight of each kind of token match; a game's score is the sum over the query tokens
+EXACT_WEIGHT = 4
+PREFIX_WEIGHT = 3
+SUBSTRING_WEIGHT = 2
+FUZZY_WEIGHT = 1
+TITLE_PREFIX_BONUS = 2  # Whole normalized title starts with the normalized query
+
+MIN_SUBSTRING_LENGTH = 3  # Shorter query tokens only match as exact/prefix
+MIN_FUZZY_LENGTH = 4  # Shorter query tokens are not typo-corrected
+FUZZY_MIN_SIMILARITY = 0.3  # Shared padded trigrams / trigrams of the longer token
+
+_TOKEN_SPLIT = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    """Lowercases and strips accents, so 'Pokémon' and 'pokemon' compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_SPLIT.split(normalize(text)) if t]
+
+
+def padded_trigrams(token):
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_edit_distance(a, b, max_distance):
+    """Levenshtein distance check that gives up as soon as max_distance is exceeded."""
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > max_distance:
+            return False
+        previous = current
+    return previous[-1] <= max_distance
+
+
+class TitleSearchIndex:
+    """Inverted index over game titles: token postings plus a trigram index over the tokens.
+
+    Supports exact, prefix, substring (within a word) and typo-tolerant matching. Every query
+    token has to match the title somehow; results are ranked by how well they matched.
+    """
+
+    def __init__(self, games):
+        self.games = games
+        self._titles = []  # Normalized titles (tokens joined by spaces), by game position
+        postings = {}
+        for position, game in enumerate(games):
+            tokens = tokenize(game.title)
+            self._titles.append(" ".join(tokens))
+            for token in set(tokens):
+                postings.setdefault(token, []).append(position)
+
+        titles = self._titles
+        # Tie-break rank of each game (shorter titles first), so ranking never needs a Python sort key
+        self._rank = [0] * len(games)
+        for rank, position in enumerate(sorted(range(len(games)), key=lambda p: (len(titles[p]), titles[p]))):
+            self._rank[position] = rank
+        # Positions ordered by normalized title, to find titles starting with the query with bisect
+        self._by_title = sorted(range(len(games)), key=titles.__getitem__)
+        self._sorted_titles = [titles[p] for p in self._by_title]
+
+        self._tokens = sorted(postings)  # Sorted for prefix lookups with bisect
+        self._postings = [postings[token] for token in self._tokens]
+        trigrams = {}
+        for token_id, token in enumerate(self._tokens):
+            for trigram in padded_trigrams(token):
+                trigrams.setdefault(trigram, []).append(token_id)
+        self._trigrams = trigrams
+
+    def _prefix_token_ids(self, prefix):
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + "\uffff")
+        return range(start, end)
+
+    def _substring_token_ids(self, query_token):
+        plain = [query_token[i:i + 3] for i in range(len(query_token) - 2)]
+        candidates = None
+        for trigram in sorted(plain, key=lambda t: len(self._trigrams.get(t, ()))):
+            ids = self._trigrams.get(trigram)
+            if not ids:
+                return []
+            candidates = set(ids) if candidates is None else candidates.intersection(ids)
+            if not candidates:
+                return []
+        return [i for i in candidates if query_token in self._tokens[i]]
+
+    def _fuzzy_token_ids(self, query_token):
+        query_trigrams = padded_trigrams(query_token)
+        shared = {}
+        for trigram in query_trigrams:
+            for token_id in self._trigrams.get(trigram, ()):
+                shared[token_id] = shared.get(token_id, 0) + 1
+        max_distance = 1 if len(query_token) <= 5 else 2
+        matches = []
+        for token_id, count in shared.items():
+            token = self._tokens[token_id]
+            similarity = count / max(len(query_trigrams), len(token))
+            if similarity >= FUZZY_MIN_SIMILARITY and within_edit_distance(query_token, token, max_distance):
+                matches.append(token_id)
+        return matches
+
+    def _match_token(self, query_token):
+        """Returns {game position: weight} for the games matching one query token."""
+        prefix_ids = self._prefix_token_ids(query_token)
+        kinds = [
+            ([i for i in prefix_ids if self._tokens[i] == query_token], EXACT_WEIGHT),
+            ([i for i in prefix_ids if self._tokens[i] != query_token], PREFIX_WEIGHT),
+        ]
+        if len(query_token) >= MIN_SUBSTRING_LENGTH:
+            kinds.append((self._substring_token_ids(query_token), SUBSTRING_WEIGHT))
+        if len(query_token) >= MIN_FUZZY_LENGTH:
+            kinds.append((self._fuzzy_token_ids(query_token), FUZZY_WEIGHT))
+
+        # Apply the weakest kind of match first so each game ends up with its best weight
+        weights = {}
+        for token_ids, weight in sorted(kinds, key=lambda kind: kind[1]):
+            for token_id in token_ids:
+                weights.update(dict.fromkeys(self._postings[token_id], weight))
+        return weights
+
+    def search(self, query, limit=50):
+        """Returns (ranked [(game, score)], total number of matching games)."""
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return [], 0
+
+        # Start from the query token with the fewest matching games to keep the intersections small
+        per_token = sorted((self._match_token(t) for t in query_tokens), key=len)
+        scores = dict(per_token[0])
+        for weights in per_token[1:]:
+            scores = {p: s + weights[p] for p, s in scores.items() if p in weights}
+            if not scores:
+                return [], 0
+
+        normalized_query = " ".join(query_tokens)
+        start = bisect.bisect_left(self._sorted_titles, normalized_query)
+        end = bisect.bisect_left(self._sorted_titles, normalized_query + "\uffff")
+        for position in self._by_title[start:end]:
+            if position in scores:
+                scores[position] += TITLE_PREFIX_BONUS
+
+        # Scores are small integers: take whole score buckets, best first, until the limit is reached
+        ranked = []
+        for score in sorted(set(scores.values()), reverse=True):
+            bucket = [p for p, s in scores.items() if s == score]
+            bucket.sort(key=self._rank.__getitem__)
+            ranked.extend((self.games[p], score) for p in bucket[:limit - len(ranked)])
+            if len(ranked) >= limit:
+                break
+        return ranked, len(scores)
@@ -145,20 +145,58 @@ def get_layout(hostname):
         print(f"Error getting layout for {hostname}: {e}")
         return None
 
+GAMES_PAGE_SIZE = 5000 # Games requested per page from the agent
+GAMES_FIELDS = "id,title,platform" # Only the fields the controller displays
+agent_response_cache = {} # {(hostname, endpoint): (etag, data)} for If-None-Match revalidation
+
+def get_cached_json(hostname, endpoint, params=None):
+    """GETs an agent endpoint, reusing the last response when the agent answers 304 Not Modified.
+
+    Returns (data, etag, not_modified). Only the first request of a paged listing is conditional: the agent's
+    ETag covers the whole catalog, so a 304 there means every page is unchanged.
+    """
+    key = (hostname, endpoint)
+    headers = {}
+    if key in agent_response_cache:
+        headers["If-None-Match"] = agent_response_cache[key][0]
+    r = requests.get(f"http://{hostname}:5151{endpoint}", params=params, headers=headers, timeout=5)
+    if r.status_code == 304 and key in agent_response_cache:
+        print(f"{endpoint} not modified on {hostname}, reusing cached data")
+        return agent_response_cache[key][1], agent_response_cache[key][0], True
+    r.raise_for_status()
+    return r.json(), r.headers.get("ETag"), False
+
 def get_games(hostname):
+    """Fetches the game list page by page, without the ApplicationPath of each game."""
+    endpoint = "/api/launchbox/games"
+    games = []
+    params = {"limit": GAMES_PAGE_SIZE, "fields": GAMES_FIELDS}
     try:
-        r = requests.get(f"http://{hostname}:5151/api/launchbox/games", timeout=5)
-        r.raise_for_status()
-        return r.json()
+        page, etag, not_modified = get_cached_json(hostname, endpoint, params)
+        if not_modified:
+            return page # The cached full list
+        while True:
+            games.extend(page.get("games", []))
+            if not page.get("next_cursor"):
+                break
+            params["cursor"] = page["next_cursor"]
+            r = requests.get(f"http://{hostname}:5151{endpoint}", params=params, timeout=5)
+            r.raise_for_status()
+            page = r.json()
+        if etag:
+            agent_response_cache[(hostname, endpoint)] = (etag, games)
+        return games
     except Exception as e:
         print(f"Error getting games for {hostname}: {e}")
         return []
 
 def get_playlists(hostname):
+    endpoint = "/api/launchbox/playlists"
     try:
-        r = requests.get(f"http://{hostname}:5151/api/launchbox/playlists", timeout=5)
-        r.raise_for_status()
-        return r.json()
+        playlists, etag, not_modified = get_cached_json(hostname, endpoint)
+        if etag and not not_modified:
+            agent_response_cache[(hostname, endpoint)] = (etag, playlists)
+        return playlists
     except Exception as e:
         print(f"Error getting playlists for {hostname}: {e}")
         return []